@@ -1,4 +1,4 @@
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 from datetime import timedelta
 import os
@@ -37,6 +37,11 @@ CSRF_TRUSTED_ORIGINS = [
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
+# Addresses or networks (e.g. "10.0.0.0/8") of the reverse proxies in
+# front of the app. X-Forwarded-For is only read from these; anyone
+# else could put any value in it.
+TRUSTED_PROXIES = config("TRUSTED_PROXIES", default="", cast=Csv())
+
 if DEBUG:
     CSRF_COOKIE_SECURE = False
     SESSION_COOKIE_SECURE = False
@@ -46,6 +51,7 @@ else:
 
 
 INSTALLED_APPS = [
+    "daphne",
     "drf_spectacular",
     'jazzmin',
     "leave",
@@ -62,6 +68,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'rest_framework.authtoken',
     'corsheaders',
+    'channels',
 
     'sales',
     'accounts',
@@ -91,8 +98,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 
-    "core.middleware.CurrentRequestMiddleware",
-    "auditt.middleware.CurrentUserMiddleware",
+    "core.middleware.RequestContextMiddleware",
 ]
 
 CSRF_TRUSTED_ORIGINS = [
@@ -115,9 +121,45 @@ AUTH_USER_MODEL = 'accounts.User'
 
 ROOT_URLCONF = 'Erp.urls'
 
+ASGI_APPLICATION = "Erp.asgi.application"
+
+# In-memory layer is per process: fine for local runs and tests,
+# swap for a shared (e.g. Redis) layer when running several workers.
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+    },
+}
+
+# Token revocations, permission contexts and period locks are only
+# cached when every worker sees the same cache (Redis, via REDIS_URL).
+# Without it each process keeps its own memory cache and those paths
+# read the database instead; see cores.utils.cache.cache_is_shared.
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+# Derive DailyInventory opening balances from the previous day's closing
+# and post every record to the StockMovement ledger. Off by default: it
+# replaces the openings that were entered; run rebuild_stock_ledger when
+# turning it on for existing data.
+WAREHOUSE_LEDGER_MODE = config("WAREHOUSE_LEDGER_MODE", default=False, cast=bool)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -146,10 +188,15 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Served through ASGI (uvicorn workers), where every request runs its
+# sync code in a thread of its own: a persistent connection would be
+# left behind with that thread rather than reused, so connections are
+# closed after each request. Reuse them through a pooler (PgBouncer,
+# the Neon -pooler host) instead.
 DATABASES = {
     "default": dj_database_url.config(
         default=config("DATABASE_URL"),
-        conn_max_age=600,
+        conn_max_age=config("CONN_MAX_AGE", default=0, cast=int),
     )
 }
 
@@ -35,6 +35,7 @@ urlpatterns = [
     path("api/dashboards/",include('dashboards.urls')),
     path("api/milling/",include("milling.urls")),
     path("api/leave/",include("leave.urls")),
+    path("api/notifications/",include("notifications.urls")),
 
 ]
 
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.context import set_current_user
+from cores.utils.cache import cache_is_shared
+from .models import User
+
+# Columns kept for the request principal; anything else loads lazily on access
+PRINCIPAL_FIELDS = (
+    "id",
+    "username",
+    "role",
+    "company_id",
+    "branch_id",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "token_version",
+)
+
+TOKEN_VERSION_CLAIM = "token_version"
+
+PRINCIPAL_TIMEOUT = 60 * 15
+
+
+def principal_key(user_id):
+    return f"auth:principal:{user_id}"
+
+
+def invalidate_principal(user_id):
+    cache.delete(principal_key(user_id))
+
+
+def _principal_row(user_id, token_version):
+    """
+    Cached slim row for a user. Reloaded when the token is newer than
+    the cached version (the cache missed a bump).
+    """
+    if not cache_is_shared():
+        # a per-process cache would keep accepting a deactivated user or
+        # a revoked token in every worker but the one that saw the change
+        return User.objects.filter(id=user_id).values(*PRINCIPAL_FIELDS).first()
+
+    key = principal_key(user_id)
+
+    row = cache.get(key)
+    if row is None or row["token_version"] < token_version:
+        row = User.objects.filter(id=user_id).values(*PRINCIPAL_FIELDS).first()
+        if row is None:
+            return None
+        cache.set(key, row, PRINCIPAL_TIMEOUT)
+
+    return row
+
+
+def get_principal(validated_token):
+    """
+    User for a validated access token without a query on cache hits.
+    The instance is built with User.from_db, so fields outside
+    PRINCIPAL_FIELDS are deferred and load on first access.
+    """
+    try:
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    token_version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+
+    row = _principal_row(user_id, token_version)
+    if row is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    if token_version != row["token_version"]:
+        raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+    if not row["is_active"]:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+    # from_db expects values in model field order
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in row]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [row[name] for name in field_names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from a cached principal
+    (see get_principal) and publishes it for audit logging.
+    """
+
+    def get_user(self, validated_token):
+        user = get_principal(validated_token)
+        set_current_user(user)
+        return user
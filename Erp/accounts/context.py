@@ -0,0 +1,178 @@
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from cores.utils.cache import cache_is_shared
+
+# Module -> roles that may write to it (everyone authenticated may read)
+MODULE_ROLES = {
+    "transport": ["admin", "transporter"],
+    "warehouse": ["admin", "warehouse"],
+    "sales": ["admin", "sales"],
+    "marketing": ["admin", "marketing"],
+    "milling": ["admin", "milling"],
+    "production": ["admin", "production"],
+    "leave": ["admin", "hr"],
+}
+
+PLAN_FEATURES = ("transport", "warehouse", "sales", "marketing")
+
+# subscription statuses that grant the plan (Subscription.is_valid)
+ACTIVE_SUBSCRIPTION_STATUSES = ("trial", "active")
+
+CONTEXT_TIMEOUT = 60 * 60
+
+
+@dataclass(frozen=True)
+class PermissionContext:
+    """
+    Everything the permission classes and RoleAwareSerializer need about
+    the current user, compiled once and cached per user.
+    """
+    user_id: int
+    role: str
+    company_id: int
+    branch_id: int
+    is_superuser: bool
+    features: frozenset
+    writable_modules: frozenset
+    max_users: int = None
+    max_branches: int = None
+
+    @property
+    def is_admin(self):
+        return self.is_superuser or self.role == "admin"
+
+    def can_write(self, module):
+        return self.is_admin or module in self.writable_modules
+
+    def has_feature(self, feature):
+        return feature in self.features
+
+
+def _new_version():
+    # time based, so a lost version key never brings back an old entry
+    return int(time.time() * 1000)
+
+
+def _user_version_key(user_id):
+    return f"permctx:version:user:{user_id}"
+
+
+def _company_version_key(company_id):
+    return f"permctx:version:company:{company_id}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def invalidate_user(user_id):
+    _bump(_user_version_key(user_id))
+
+
+def invalidate_company(company_id):
+    """
+    Plan or subscription changed: every user of the company recompiles.
+    """
+    if company_id is not None:
+        _bump(_company_version_key(company_id))
+
+
+def current_plan(company_id):
+    """
+    Plan of the company's trial or active subscription that ends last,
+    or None; past due, suspended and cancelled ones grant nothing.
+    """
+    from billing.models import Subscription
+
+    if company_id is None:
+        return None
+
+    subscription = (
+        Subscription.objects
+        .filter(company_id=company_id, status__in=ACTIVE_SUBSCRIPTION_STATUSES)
+        .select_related("plan")
+        .order_by("-end_date", "-id")
+        .first()
+    )
+    return subscription.plan if subscription else None
+
+
+def compile_context(user):
+    plan = current_plan(user.company_id)
+
+    features = frozenset(
+        feature for feature in PLAN_FEATURES
+        if plan is not None and getattr(plan, f"enable_{feature}", False)
+    )
+
+    return PermissionContext(
+        user_id=user.pk,
+        role=user.role,
+        company_id=user.company_id,
+        branch_id=user.branch_id,
+        is_superuser=user.is_superuser,
+        features=features,
+        writable_modules=frozenset(
+            module for module, roles in MODULE_ROLES.items() if user.role in roles
+        ),
+        max_users=plan.max_users if plan else None,
+        max_branches=plan.max_branches if plan else None,
+    )
+
+
+def get_user_context(user):
+    """
+    Cached PermissionContext for a user, keyed by the user's and the
+    company's versions so role or plan changes take effect at once.
+    Compiled per request when the cache is not shared between workers,
+    where a bump would only reach the process that made it.
+    """
+    if not cache_is_shared():
+        return compile_context(user)
+
+    key = "permctx:{}:{}:{}".format(
+        user.pk,
+        _get_version(_user_version_key(user.pk)),
+        _get_version(_company_version_key(user.company_id)) if user.company_id else 0,
+    )
+
+    context = cache.get(key)
+    if context is None:
+        context = compile_context(user)
+        cache.set(key, context, CONTEXT_TIMEOUT)
+
+    return context
+
+
+def get_permission_context(request):
+    """
+    PermissionContext of the request's user, resolved once per request
+    and shared by every permission class and serializer that asks.
+    None for anonymous requests.
+    """
+    # DRF's Request wraps the HttpRequest; store on the inner one so
+    # every Request built around it sees the same context
+    http_request = getattr(request, "_request", request)
+
+    if not hasattr(http_request, "_permission_context"):
+        user = getattr(request, "user", None)
+        http_request._permission_context = (
+            get_user_context(user)
+            if user is not None and user.is_authenticated else None
+        )
+
+    return http_request._permission_context
@@ -28,10 +28,32 @@ class User(AbstractUser):
     is_deleted =models.BooleanField(default=False)
     company=models.ForeignKey(Company,on_delete=models.CASCADE,null=True,blank=True)
     branch=models.ForeignKey(Branch,on_delete=models.CASCADE,null=True,blank=True)
+
+    # bumped to revoke every token issued so far (deactivation, password change)
+    token_version=models.PositiveIntegerField(default=0)
     
     
     def __str__(self):
         return f"{self.username} ({self.role})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.__dict__.get("is_active")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # deactivation and a password change revoke outstanding tokens;
+        # set_password leaves the raw password in _password until saved,
+        # a hasher upgrade on login clears it first and keeps the tokens
+        deactivated = getattr(self, "_loaded_is_active", None) and not self.is_active
+        password_changed = self._password is not None and not self._state.adding
+        if deactivated or password_changed:
+            self.token_version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "token_version"}
+        super().save(*args, **kwargs)
+        self._loaded_is_active = self.is_active
     
     def is_company_admin(self):
         return self.role == "admin"
@@ -1,37 +1,28 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.permissions import BasePermission, SAFE_METHODS
-from rest_framework.exceptions import PermissionDenied
+
+from .context import MODULE_ROLES, get_permission_context
+
 
 class ModulePermission(BasePermission):
-    MODULE_ROLES = {
-        "transport": ["admin", "transporter"],
-        "warehouse": ["admin", "warehouse"],
-        "sales": ["admin", "sales"],
-        "marketing": ["admin", "marketing"],
-        "milling": ["admin", "milling"],   
-        "production": ["admin", "production"],
-        "leave":["admin","hr"],
-    }
+    MODULE_ROLES = MODULE_ROLES
 
     def has_permission(self, request, view):
-        user = request.user
+        context = get_permission_context(request)
 
         # 🔐 Authentication check → 401
-        if not user or user.is_anonymous:
+        if context is None:
             return False
 
         # 👑 Admin full access
-        if user.is_superuser or user.role == "admin":
+        if context.is_admin:
             return True
 
         module = getattr(view, "module_name", None)
         if not module:
             raise PermissionDenied("Module not defined")
 
-        allowed_roles = self.MODULE_ROLES.get(module)
-
-        if allowed_roles is None:
+        if module not in self.MODULE_ROLES:
             raise PermissionDenied(f"No permissions configured for module '{module}'")
 
         # 👀 Read-only allowed
@@ -43,7 +34,7 @@ class ModulePermission(BasePermission):
             raise PermissionDenied("Only admins can delete")
 
         # ✍️ Write permission
-        if user.role not in allowed_roles:
+        if not context.can_write(module):
             raise PermissionDenied("You do not have permission to modify this module")
 
         return True
@@ -56,14 +47,17 @@ class IsownerOrAdmin(BasePermission):
     Others: read-only   
     """
     def has_object_permission(self,request,view,obj):
-        user=request.user
+        context = get_permission_context(request)
         
-        if user.is_superuser or user.role =="admin":
+        if context is not None and context.is_admin:
             return True
         if request.method in SAFE_METHODS:
             return True
         
-        return hasattr(obj,"created_by") and obj.created_by ==user
+        return (
+            context is not None and
+            getattr(obj, "created_by_id", None) == context.user_id
+        )
 
 
 
@@ -74,14 +68,11 @@ class AdminDeleteOnly(BasePermission):
 
     def has_permission(self, request, view):
         if request.method == "DELETE":
-            return request.user.is_authenticated and (
-                request.user.is_superuser or request.user.role == "admin"
-            )
+            context = get_permission_context(request)
+            return context is not None and context.is_admin
         return True
 
 
-from rest_framework.permissions import BasePermission, SAFE_METHODS
-
 class ApprovalWorkflowPermission(BasePermission):
     """
     - Draft: owner can edit
@@ -90,10 +81,10 @@ class ApprovalWorkflowPermission(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
+        context = get_permission_context(request)
 
         # Admin override
-        if user.is_superuser or user.role == "admin":
+        if context is not None and context.is_admin:
             return True
 
         # Read-only always allowed
@@ -102,7 +93,10 @@ class ApprovalWorkflowPermission(BasePermission):
 
         # Draft → owner can edit
         if obj.status == "draft":
-            return obj.created_by == user
+            return (
+                context is not None and
+                getattr(obj, "created_by_id", None) == context.user_id
+            )
 
         # Pending or Approved → no edits
         return False
@@ -119,24 +113,17 @@ class BaseModulePermission(BasePermission):
     - NEVER returns 401 for permission errors
     """
 
-    MODULE_ROLES = {
-        "sales": ["admin", "sales"],
-        "warehouse": ["admin", "warehouse"],
-        "production": ["admin", "production"],
-        "milling": ["admin", "milling"],
-        "transport": ["admin", "transporter"],
-        "marketing": ["admin", "marketing"],
-    }
+    MODULE_ROLES = MODULE_ROLES
 
     def has_permission(self, request, view):
-        user = request.user
+        context = get_permission_context(request)
 
         # 🔐 Authentication check → 401
-        if not user or user.is_anonymous:
+        if context is None:
             return False
 
         # 👑 Admin override
-        if user.is_superuser or user.role == "admin":
+        if context.is_admin:
             return True
 
         # 🔍 Auto-detect module
@@ -146,9 +133,7 @@ class BaseModulePermission(BasePermission):
             # Missing module should NEVER break auth
             raise PermissionDenied("Module not specified for this endpoint")
 
-        allowed_roles = self.MODULE_ROLES.get(module)
-
-        if not allowed_roles:
+        if module not in self.MODULE_ROLES:
             # Module not configured → safe failure
             raise PermissionDenied(
                 f"Access rules not configured for module '{module}'"
@@ -163,9 +148,9 @@ class BaseModulePermission(BasePermission):
             raise PermissionDenied("Only admins may delete records")
 
         # ✍️ Write access
-        if user.role not in allowed_roles:
+        if not context.can_write(module):
             raise PermissionDenied(
-                f"Role '{user.role}' cannot modify '{module}' module"
+                f"Role '{context.role}' cannot modify '{module}' module"
             )
 
         return True
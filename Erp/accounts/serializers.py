@@ -35,6 +35,13 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # checked by CachedJWTAuthentication; refreshed access tokens keep it
+        token["token_version"] = user.token_version
+        return token
+
     def validate(self, attrs):
         username_or_email = attrs.get('username')
         password = attrs.get('password')
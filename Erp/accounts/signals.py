@@ -1,13 +1,50 @@
 from django.core.exceptions import PermissionDenied
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from billing.models import Plan, Subscription
+from .authentication import invalidate_principal
+from .context import current_plan, invalidate_company, invalidate_user
+from .models import User
 
 def check_user_limit(company):
-    subscription= company.subscription
-    max_users= subscription.plan.max_users
+    plan = current_plan(company.pk)
+    if plan is None:
+        return
 
-    if company.users.count() >= max_users:
+    if User.objects.filter(company=company).count() >= plan.max_users:
         raise PermissionDenied("User limit reached for you plan")
     
 
 def check_branch_limit(company):
-    if company.branches.count() >= company.subscription.plan.max_branches:
+    plan = current_plan(company.pk)
+    if plan is None:
+        return
+
+    if company.branches.count() >= plan.max_branches:
         raise PermissionDenied("Branch limit reached.")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_context(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+    invalidate_principal(instance.pk)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_subscription_context(sender, instance, **kwargs):
+    invalidate_company(instance.company_id)
+
+
+@receiver(post_save, sender=Plan)
+def invalidate_plan_context(sender, instance, **kwargs):
+    company_ids = (
+        Subscription.objects
+        .filter(plan=instance)
+        .values_list("company_id", flat=True)
+        .distinct()
+    )
+    for company_id in company_ids:
+        invalidate_company(company_id)
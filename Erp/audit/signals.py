@@ -4,7 +4,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 
 from auditt.models import AuditLog
-from auditt.middleware import get_current_user
+from core.context import get_request_context
 
 AUDITED_APPS = {
     "transport",
@@ -46,9 +46,8 @@ def audit_post_save(sender, instance, created, **kwargs):
     if sender._meta.app_label not in AUDITED_APPS:
         return
 
-    user = get_current_user()
-    if user and not user.is_authenticated:
-        user = None
+    context = get_request_context()
+    user = context.user if context else None
 
     ct = ContentType.objects.get_for_model(
         sender,
@@ -74,6 +73,8 @@ def audit_post_save(sender, instance, created, **kwargs):
             content_type=ct,
             object_id=instance.pk,
             changes=changes,
+            ip_address=context.ip_address if context else None,
+            user_agent=context.user_agent if context else None,
         )
 
 
@@ -88,9 +89,8 @@ def audit_post_delete(sender, instance, **kwargs):
         for_concrete_model=False,
     )
 
-    user = get_current_user()
-    if user and not user.is_authenticated:
-        user = None
+    context = get_request_context()
+    user = context.user if context else None
 
     with transaction.atomic():
         AuditLog.objects.create(
@@ -100,4 +100,6 @@ def audit_post_delete(sender, instance, **kwargs):
             content_type=ct,
             object_id=instance.pk,
             changes=serialize_instance(instance),
+            ip_address=context.ip_address if context else None,
+            user_agent=context.user_agent if context else None,
         )
@@ -36,6 +36,7 @@ class Subscription(models.Model):
     )
 
     company=models.ForeignKey(Company,on_delete=models.CASCADE)
+    plan=models.ForeignKey(Plan,on_delete=models.PROTECT,null=True,blank=True,related_name="subscriptions")
     status=models.CharField(max_length=20,choices=STATUS_CHOICE)
 
     start_date=models.DateField()
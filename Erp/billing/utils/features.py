@@ -1,3 +1,13 @@
-def is_feature_enabled(company, feature):
-    plan = company.subscription.plan
-    return getattr(plan, f"enable_{feature}", False)
+from accounts.context import get_user_context, current_plan, PLAN_FEATURES
+
+
+def is_feature_enabled(company, feature, user=None):
+    """
+    Pass `user` to read the flag from their cached permission context
+    instead of loading the plan.
+    """
+    if user is not None and user.is_authenticated:
+        return get_user_context(user).has_feature(feature)
+
+    plan = current_plan(getattr(company, "pk", company))
+    return feature in PLAN_FEATURES and getattr(plan, f"enable_{feature}", False)
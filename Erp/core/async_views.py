@@ -0,0 +1,78 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from rest_framework.views import APIView
+
+
+async def run_query(func, *args):
+    """
+    Run a blocking ORM call off the event loop, in the request's sync
+    thread (thread_sensitive), so it uses the request's connection
+    instead of opening one of its own.
+    """
+    return await sync_to_async(func)(*args)
+
+
+def _run_all(calls):
+    return [func(*args) for func, *args in calls]
+
+
+async def run_queries(*calls):
+    """
+    run_queries((func, arg, ...), ...) -> results in the same order.
+
+    The calls run sequentially, in a single thread hop on the request's
+    connection: one hop instead of one per call, not concurrency.
+    """
+    return await sync_to_async(_run_all)(calls)
+
+
+def _run_all_cached(key, timeout, calls):
+    results = cache.get(key)
+    if results is None:
+        results = _run_all(calls)
+        cache.set(key, results, timeout)
+    return results
+
+
+async def run_cached_queries(key, timeout, *calls):
+    """
+    run_queries with the results cached under `key` for `timeout`. The
+    cache is read in the same thread hop as the queries.
+    """
+    return await sync_to_async(_run_all_cached)(key, timeout, calls)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines.
+
+    Authentication, permissions and throttling (APIView.initial) still run
+    in a sync thread because they touch the database; only the handler
+    itself runs on the event loop. Serve through Erp.asgi to benefit.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,12 +1,28 @@
 from django.contrib.contenttypes.models import ContentType
 from auditt.models import AuditLog
 
+from .context import get_client_ip, get_request_context
+
 
 def log_action(request, action, instance, old_data=None, new_data=None):
+    """
+    `request` may be None (tasks, signals); user and client details
+    then come from the current request context, if any.
+    """
     content_type = ContentType.objects.get_for_model(instance.__class__)
 
+    if request is not None:
+        user = request.user if request.user.is_authenticated else None
+        ip_address = get_client_ip(request)
+        user_agent = request.META.get("HTTP_USER_AGENT")
+    else:
+        context = get_request_context()
+        user = context.user if context else None
+        ip_address = context.ip_address if context else None
+        user_agent = context.user_agent if context else None
+
     AuditLog.objects.create(
-        user=request.user if request.user.is_authenticated else None,
+        user=user,
         action=action.lower(),  # enforce consistency
         module=instance._meta.app_label,
         model_name=instance.__class__.__name__,
@@ -15,12 +31,6 @@ def log_action(request, action, instance, old_data=None, new_data=None):
         object_name=str(instance),
         old_data=old_data,
         new_data=new_data,
-        ip_address=get_client_ip(request),
-        user_agent=request.META.get("HTTP_USER_AGENT"),
+        ip_address=ip_address,
+        user_agent=user_agent,
     )
-
-def get_client_ip(request):
-    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-    if x_forwarded_for:
-        return x_forwarded_for.split(",")[0]
-    return request.META.get("REMOTE_ADDR")
@@ -0,0 +1,126 @@
+# core/context.py
+import ipaddress
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """
+    Who/where of the request being served. Set by RequestContextMiddleware,
+    the user is filled in once authentication has run.
+    """
+    request_id: str
+    ip_address: str = None
+    user_agent: str = None
+    user: object = None
+    company_id: int = None
+
+
+# ContextVar rather than threading.local: isolated per request under
+# both WSGI threads and ASGI tasks, and gone once the request ends
+_request_context = ContextVar("request_context", default=None)
+
+
+def get_request_context():
+    return _request_context.get()
+
+
+def get_current_user():
+    context = _request_context.get()
+    return context.user if context else None
+
+
+def get_current_company_id():
+    context = _request_context.get()
+    return context.company_id if context else None
+
+
+def get_current_request_id():
+    context = _request_context.get()
+    return context.request_id if context else None
+
+
+def set_current_user(user):
+    """
+    Attach the authenticated user to the current request context.
+    """
+    context = _request_context.get()
+    if context is None:
+        return
+
+    if user is None or not user.is_authenticated:
+        user = None
+
+    _request_context.set(replace(
+        context,
+        user=user,
+        company_id=user.company_id if user is not None else None,
+    ))
+
+
+def _parse_ip(value):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies):
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False) for proxy in proxies if proxy.strip())
+
+
+def _is_trusted_proxy(address):
+    return any(address in network for network in _trusted_networks(tuple(settings.TRUSTED_PROXIES)))
+
+
+def get_client_ip(request):
+    """
+    Address of the client, always a valid IP or None. X-Forwarded-For
+    is only followed when the request comes from a TRUSTED_PROXIES
+    address: its entries are walked from the right, past the trusted
+    proxies, to the first address they did not add themselves.
+    """
+    remote = _parse_ip(request.META.get("REMOTE_ADDR"))
+    if remote is None:
+        return None
+
+    client = remote
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for and _is_trusted_proxy(remote):
+        for entry in reversed(x_forwarded_for.split(",")):
+            address = _parse_ip(entry)
+            if address is None:
+                # not an address ("unknown", garbage): keep the last proxy's
+                break
+            client = address
+            if not _is_trusted_proxy(address):
+                break
+
+    return str(client)
+
+
+def context_from_request(request):
+    return RequestContext(
+        request_id=request.META.get("HTTP_X_REQUEST_ID") or uuid.uuid4().hex,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get("HTTP_USER_AGENT"),
+    )
+
+
+@contextmanager
+def request_context(context):
+    """
+    Run a block under `context`, restoring the previous one afterwards.
+    """
+    token = _request_context.set(context)
+    try:
+        yield context
+    finally:
+        _request_context.reset(token)
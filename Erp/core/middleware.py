@@ -1,15 +1,38 @@
 # core/middleware.py
-import threading
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
-_thread_locals = threading.local()
+from .context import context_from_request, request_context, set_current_user
 
-def get_current_request():
-    return getattr(_thread_locals, "request", None)
 
-class CurrentRequestMiddleware:
+class RequestContextMiddleware:
+    """
+    Opens a RequestContext for each request and clears it afterwards.
+    Session users are attached here; API users are attached by
+    accounts.authentication.CachedJWTAuthentication.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        _thread_locals.request = request
-        return self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with request_context(context_from_request(request)) as context:
+            set_current_user(request.user)
+            response = self.get_response(request)
+
+        response["X-Request-ID"] = context.request_id
+        return response
+
+    async def __acall__(self, request):
+        with request_context(context_from_request(request)) as context:
+            set_current_user(await request.auser())
+            response = await self.get_response(request)
+
+        response["X-Request-ID"] = context.request_id
+        return response
@@ -1,4 +1,22 @@
+import copy
+
 from rest_framework import serializers
+from rest_framework.fields import Field
+from rest_framework.relations import PKOnlyObject, RelatedField
+
+from accounts.context import get_permission_context
+from cores.utils.periods import locked_periods
+
+# Field types whose to_representation returns a value of this type unchanged
+SCALAR_FIELD_TYPES = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.BooleanField: bool,
+    serializers.FloatField: float,
+}
+
+ANY_VALUE = object()
+
 
 class RoleAwareSerializer(serializers.ModelSerializer):
     """
@@ -6,6 +24,12 @@ class RoleAwareSerializer(serializers.ModelSerializer):
     - Hide fields
     - Make fields read-only
     - Enforce write protection
+
+    `read_only` may be a list of field names or "__all__".
+
+    Model field introspection runs once per serializer class and the
+    role rules once per (class, role, create/update); instances get a
+    deep copy of the prepared fields.
     """
 
     role_field_permissions = {
@@ -20,17 +44,25 @@ class RoleAwareSerializer(serializers.ModelSerializer):
         # }
     }
 
+    # serializer class -> prototype fields,
+    # (serializer class, role, mode) -> (excluded, read-only) names
+    _field_set_cache = {}
+
     def get_user(self):
         request = self.context.get("request")
         return request.user if request and request.user.is_authenticated else None
 
+    def get_permission_context(self):
+        request = self.context.get("request")
+        return get_permission_context(request) if request else None
+
     def get_user_role(self):
-        user = self.get_user()
-        return user.role if user else None
+        context = self.get_permission_context()
+        return context.role if context else None
 
     def is_admin(self):
-        user = self.get_user()
-        return user and user.role == "admin"
+        context = self.get_permission_context()
+        return context is not None and context.role == "admin"
 
     def get_role_config(self):
         if self.is_admin():
@@ -43,38 +75,72 @@ class RoleAwareSerializer(serializers.ModelSerializer):
             or {}
         )
 
-    def get_fields(self):
-        fields = super().get_fields()
+    def get_field_set_key(self):
+        role = "__admin__" if self.is_admin() else self.get_user_role()
+        mode = "update" if self.instance is not None else "create"
+        return type(self), role, mode
 
+    def get_protected_fields(self, field_names):
+        """
+        Names the current role may not write, "__all__" expanded.
+        """
         config = self.get_role_config()
 
+        names = []
+        for option in ("read_only", "read_only_on_update"):
+            if option == "read_only_on_update" and self.instance is None:
+                continue
+
+            value = config.get(option, [])
+            names.extend(field_names if value == "__all__" else value)
+
+        return set(names)
+
+    def get_base_fields(self):
+        """
+        ModelSerializer's field introspection, done once per class.
+        """
+        cls = type(self)
+        prototype = self._field_set_cache.get(cls)
+        if prototype is None:
+            prototype = super().get_fields()
+            self._field_set_cache[cls] = prototype
+        return copy.deepcopy(prototype)
+
+    def get_field_set(self, field_names):
+        """
+        (fields to drop, fields to make read-only) for this role and mode.
+        """
+        key = self.get_field_set_key()
+
+        field_set = self._field_set_cache.get(key)
+        if field_set is None:
+            config = self.get_role_config()
+            excluded = set(config.get("exclude", []))
+            read_only = self.get_protected_fields(field_names) - excluded
+            field_set = (frozenset(excluded), frozenset(read_only))
+            self._field_set_cache[key] = field_set
+
+        return field_set
+
+    def get_fields(self):
+        fields = self.get_base_fields()
+
+        excluded, read_only = self.get_field_set(list(fields))
+
         # ❌ Remove fields
-        for field in config.get("exclude", []):
+        for field in excluded:
             fields.pop(field, None)
 
-        # 🔒 Always read-only
-        for field in config.get("read_only", []):
+        # 🔒 Read-only (always, and on update)
+        for field in read_only:
             if field in fields:
                 fields[field].read_only = True
 
-        # 🔒 Read-only only on UPDATE
-        if self.instance is not None:
-            for field in config.get("read_only_on_update", []):
-                if field in fields:
-                    fields[field].read_only = True
-
         return fields
 
     def validate(self, attrs):
-        config = self.get_role_config()
-
-        forbidden_fields = set(
-            config.get("read_only", [])
-            + (
-                config.get("read_only_on_update", [])
-                if self.instance is not None else []
-            )
-        )
+        forbidden_fields = self.get_protected_fields(list(self.fields))
 
         for field in forbidden_fields:
             if field in attrs:
@@ -83,3 +149,117 @@ class RoleAwareSerializer(serializers.ModelSerializer):
                 })
 
         return attrs
+
+    # ---------------------------------------------------------
+    # Fast read path
+    # ---------------------------------------------------------
+
+    def _fast_attribute(self, field):
+        """
+        (attribute name, expected type) when `field` can be read straight
+        off the instance, else None.
+        """
+        if len(field.source_attrs) != 1:
+            return None
+
+        source = field.source_attrs[0]
+        field_class = type(field)
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None or \
+                    field_class.to_representation is not serializers.PrimaryKeyRelatedField.to_representation or \
+                    field_class.get_attribute is not RelatedField.get_attribute:
+                return None
+
+            try:
+                model_field = self.Meta.model._meta.get_field(source)
+            except Exception:
+                return None
+
+            if not getattr(model_field, "many_to_one", False) and \
+                    not getattr(model_field, "one_to_one", False):
+                return None
+
+            return model_field.attname, ANY_VALUE
+
+        if field_class.get_attribute is not Field.get_attribute:
+            return None
+
+        if isinstance(field, serializers.ChoiceField):
+            # only when choice keys come back unchanged
+            if field_class.to_representation is not serializers.ChoiceField.to_representation or \
+                    not all(isinstance(key, str) for key in field.choices):
+                return None
+            return source, str
+
+        expected = SCALAR_FIELD_TYPES.get(field_class)
+        if expected is None:
+            return None
+
+        return source, expected
+
+    def get_representation_plan(self):
+        """
+        Readable fields with a direct attribute name where the field's
+        own get_attribute/to_representation would not change the value.
+        Built once per serializer instance; with many=True the child
+        serializer, and so the plan, is shared by every row.
+        """
+        plan = getattr(self, "_representation_plan", None)
+        if plan is None:
+            plan = []
+            for field in self._readable_fields:
+                fast = self._fast_attribute(field)
+                plan.append((field, *(fast or (None, None))))
+            self._representation_plan = plan
+        return plan
+
+    def to_representation(self, instance):
+        ret = {}
+
+        for field, attname, expected in self.get_representation_plan():
+            if attname is not None:
+                value = getattr(instance, attname, ANY_VALUE)
+                if value is None or (
+                    value is not ANY_VALUE and
+                    (expected is ANY_VALUE or type(value) is expected)
+                ):
+                    ret[field.field_name] = value
+                    continue
+
+            try:
+                attribute = field.get_attribute(instance)
+            except serializers.SkipField:
+                continue
+
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field.field_name] = None
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+
+        return ret
+
+
+class PeriodLockMixin:
+    """
+    For serializers of records with company and date: refuses to edit a
+    record of a locked accounting period, or to move one into a locked
+    period (the model's clean(), which DRF never calls). Both periods
+    are checked with one locked_periods() lookup. New records are not
+    checked, as in clean().
+    """
+
+    period_locked_message = "This accounting period is locked."
+
+    def validate(self, attrs):
+        instance = self.instance
+        if instance is not None:
+            pairs = [
+                (instance.company_id, instance.date),
+                (attrs.get("company", instance.company_id), attrs.get("date", instance.date)),
+            ]
+            if locked_periods(pairs):
+                raise serializers.ValidationError(self.period_locked_message)
+
+        return super().validate(attrs)
@@ -0,0 +1,104 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from accounts.models import User
+from cores.services.benchmark_data import BENCH_PREFIX
+from cores.services.benchmarks import discover_endpoints, find_regressions, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every list and analytics GET endpoint through the DRF test client and "
+        "record query counts, p50/p95 latency and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=str, default=None,
+                            help="Username to request as (default: the latest benchmark company admin)")
+        parser.add_argument("--iterations", type=int, default=10)
+        parser.add_argument("--start-date", type=str, default=None)
+        parser.add_argument("--end-date", type=str, default=None)
+        parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                            help="Extra query parameter sent to every endpoint (repeatable)")
+        parser.add_argument("--only", action="append", default=[], help="Only paths containing this (repeatable)")
+        parser.add_argument("--cold", action="store_true",
+                            help="Clear the cache before each endpoint's first request")
+        parser.add_argument("--output", type=str, default=None, help="Write the JSON report here")
+        parser.add_argument("--baseline", type=str, default=None,
+                            help="Earlier report; fail on p95, query count or status regressions")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed p95 slowdown against the baseline (0.25 = 25%%)")
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"User not found: {username}")
+            return user
+
+        user = (
+            User.objects
+            .filter(username__startswith=f"{BENCH_PREFIX}-", role="admin", is_active=True)
+            .order_by("-date_joined", "-id")
+            .first()
+        )
+        if user is None:
+            raise CommandError("No benchmark data found: run seed_benchmark_data or pass --user")
+        return user
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+
+        endpoints = discover_endpoints()
+        if options["only"]:
+            endpoints = [path for path in endpoints if any(part in path for part in options["only"])]
+
+        params = {
+            key: options[option]
+            for key, option in (("start_date", "start_date"), ("end_date", "end_date"))
+            if options[option]
+        }
+        for param in options["param"]:
+            key, sep, value = param.partition("=")
+            if not sep:
+                raise CommandError(f"--param takes KEY=VALUE, got {param}")
+            params[key] = value
+
+        # 4xx responses are part of the report, not worth a log line per request
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            report = run_benchmarks(
+                user=user,
+                endpoints=endpoints,
+                params=params,
+                iterations=options["iterations"],
+                cold=options["cold"],
+                log=self.stdout.write,
+            )
+        finally:
+            request_logger.setLevel(level)
+
+        output = json.dumps(report, indent=2, cls=DjangoJSONEncoder)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"{len(endpoints)} endpoint(s) written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+            regressions = find_regressions(report, baseline, tolerance=options["tolerance"])
+            for path, reason in regressions:
+                self.stdout.write(self.style.ERROR(f"{path}: {reason}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
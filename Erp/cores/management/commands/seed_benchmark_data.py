@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from cores.services.benchmark_data import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic companies, branches and years of history for benchmarks. "
+        "Writes to the configured database: point it at a throwaway SQLite file or local Postgres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=2)
+        parser.add_argument("--branches", type=int, default=2, help="Branches per company")
+        parser.add_argument("--years", type=float, default=1)
+        parser.add_argument("--end", type=str, default=None, help="Last day of history (default today)")
+        parser.add_argument("--materials", type=int, default=5, help="Warehouse materials per branch")
+        parser.add_argument("--vehicles", type=int, default=2, help="Vehicles per branch")
+        parser.add_argument("--sales-per-day", type=int, default=10)
+        parser.add_argument("--audit-per-day", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        end = None
+        if options["end"]:
+            end = parse_date(options["end"])
+            if end is None:
+                raise CommandError(f"Invalid --end date: {options['end']}")
+
+        result = generate(
+            companies=options["companies"],
+            branches=options["branches"],
+            years=options["years"],
+            end=end,
+            materials=options["materials"],
+            vehicles=options["vehicles"],
+            sales_per_day=options["sales_per_day"],
+            audit_per_day=options["audit_per_day"],
+            seed=options["seed"],
+            log=self.stdout.write,
+        )
+
+        for model, count in sorted(result["rows"].items()):
+            self.stdout.write(f"{model}: {count}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['tag']}: {result['start']} to {result['end']}, "
+            f"benchmark as {result['users'][0] if result['users'] else '-'}"
+        ))
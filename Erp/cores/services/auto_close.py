@@ -1,32 +1,91 @@
+import calendar
+from datetime import date
+
+from django.db import transaction
 from django.utils.timezone import now
-from cores.models import AccountingPeriod
-from cores.services.period_closing import can_close_period
-from notifications.services import notify_role
-
-def auto_close_period(company, year, month):
-    period, _ = AccountingPeriod.objects.get_or_create(
-        company=company,
-        year=year,
-        month=month
+from cores.models import AccountingPeriod, Company
+from cores.services.period_closing import blocked_company_ids
+from cores.utils.periods import period_lock_cache
+from notifications.services import notify_users
+from accounts.models import User
+
+def auto_close_periods(year, month, company_ids=None):
+    """
+    Lock the (year, month) accounting period of many companies at once.
+
+    - creates missing periods with one bulk insert
+    - finds companies with pending records and their still-open periods
+      with two grouped queries
+    - locks every closable period with one UPDATE
+    - notifies all admins of the closed companies with one bulk insert
+
+    Returns the ids of the companies whose period was locked.
+    """
+    if company_ids is None:
+        company_ids = list(Company.objects.values_list("id", flat=True))
+    else:
+        company_ids = list(company_ids)
+
+    if not company_ids:
+        return []
+
+    AccountingPeriod.objects.bulk_create(
+        [
+            AccountingPeriod(company_id=company_id, year=year, month=month)
+            for company_id in company_ids
+        ],
+        ignore_conflicts=True,
     )
 
-    if period.is_locked:
-        return False
+    start = date(year, month, 1)
+    end = date(year, month, calendar.monthrange(year, month)[1])
 
-    if not can_close_period(company, year, month):
-        return False
+    blocked = blocked_company_ids(company_ids, start, end)
+    closable = [c for c in company_ids if c not in blocked]
 
-    period.is_locked = True
-    period.locked_at = now()
-    period.locked_by = None  # system
-    period.save()
+    if not closable:
+        return []
 
-    notify_role(
+    with transaction.atomic():
+        # skip_locked lets several workers run overlapping chunks safely
+        periods = list(
+            AccountingPeriod.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                company_id__in=closable,
+                year=year,
+                month=month,
+                is_locked=False,
+            )
+            .values_list("id", "company_id")
+        )
+
+        if not periods:
+            return []
+
+        AccountingPeriod.objects.filter(
+            id__in=[period_id for period_id, _ in periods]
+        ).update(
+            is_locked=True,
+            locked_at=now(),
+            locked_by=None,  # system
+        )
+
+    closed = [company_id for _, company_id in periods]
+
+    period_lock_cache.invalidate_many([(company_id, year, month) for company_id in closed])
+
+    admins = User.objects.filter(
         role="admin",
-        company=company,
+        company_id__in=closed,
+        is_active=True,
+    ).only("id", "company_id")
+
+    notify_users(
+        admins,
         title="Period closed automatically",
         message=f"The accounting period {year}-{month} has been automatically locked.",
-        module="accounting"
+        module="accounting",
     )
 
-    return True
+    return closed
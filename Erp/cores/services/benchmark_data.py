@@ -0,0 +1,343 @@
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from accounts.models import User
+from auditt.models import AuditLog
+from cores.models import Branch, Company
+from milling.models import MillingBatch
+from production.models import FlourOutput, RawMaterial
+from sales.models import Customer, Product, Sale, Salesperson
+from transport.models import TransportCostRollup, TransportRecord, Vehicle
+from warehouse.models import DailyInventory, Material, StockMovement, WarehouseAnalytics
+from warehouse.services.analytics import TOTAL_FIELDS, analytics_key, contribution
+
+# names of everything generated start with this, so a benchmark
+# database can be told apart from real data
+BENCH_PREFIX = "bench"
+
+SHIFTS = ("morning", "evening")
+AUDIT_ACTIONS = ("create", "update", "approve", "submit")
+BAG_KG = 25
+
+
+def _money(value):
+    return Decimal(value).quantize(Decimal("0.01"))
+
+
+class _Generator:
+    """
+    Builds one branch's history in memory and writes it with bulk_create.
+    bulk_create skips save() and signals, so the fields they would fill
+    (totals, efficiencies) and the rollups they would maintain
+    (WarehouseAnalytics, TransportCostRollup, the stock ledger) are
+    computed here.
+    """
+
+    def __init__(self, *, tag, days, rng, batch_size, materials, vehicles,
+                 sales_per_day, audit_per_day, products, customers):
+        self.tag = tag
+        self.days = days
+        self.rng = rng
+        self.batch_size = batch_size
+        self.materials = materials
+        self.vehicles = vehicles
+        self.sales_per_day = sales_per_day
+        self.audit_per_day = audit_per_day
+        self.products = products
+        self.customers = customers
+        self.audit_type = ContentType.objects.get_for_model(MillingBatch)
+        self.counts = Counter()
+
+    def _write(self, model, rows):
+        created = model.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.counts[model.__name__] += len(created)
+        return created
+
+    def branch(self, company, branch, admin, c, b):
+        rng = self.rng
+        name = f"{self.tag}-{c}-{b}"
+
+        materials = self._write(Material, [
+            Material(
+                name=f"{name}-material-{i}",
+                category="raw_material",
+                status="approved",
+                created_by=admin,
+                reorder_point=_money(200),
+                lead_time_days=3,
+            )
+            for i in range(self.materials)
+        ])
+        vehicles = self._write(Vehicle, [
+            Vehicle(
+                name=f"{name}-vehicle-{i}",
+                plate_number=f"{name}-{i}",
+                category=rng.choice(("lorry", "probox", "landcruiser")),
+                driver_name="Driver",
+            )
+            for i in range(self.vehicles)
+        ])
+        salesperson = Salesperson.objects.create(company=company, branch=branch, name=f"{name}-rep")
+
+        batches, raw, flour, inventory, transport, sales, audit = [], [], [], [], [], [], []
+        closing = {material.pk: _money(rng.uniform(400, 800)) for material in materials}
+
+        for day in self.days:
+            for shift in SHIFTS:
+                milled = rng.uniform(800, 1200)
+                bales = int(milled * rng.uniform(0.7, 0.8) / BAG_KG)
+                germ, chaffs, waste = rng.uniform(20, 60), rng.uniform(20, 60), rng.uniform(5, 20)
+                batches.append(MillingBatch(
+                    company=company,
+                    branch=branch,
+                    date=day,
+                    shift=shift,
+                    batch_no=f"{name}-{day:%Y%m%d}-{shift}",
+                    expiry_date=day + timedelta(days=180),
+                    premix_kg=rng.uniform(1, 5),
+                    maize_milled_kg=milled,
+                    maize_germ_kg=germ,
+                    maize_chaffs_kg=chaffs,
+                    waste_kg=waste,
+                    bales=bales,
+                    efficiency=bales * BAG_KG / milled * 100,
+                    total_output_kg=germ + chaffs + waste,
+                ))
+
+                inputs = [rng.uniform(300, 600), rng.uniform(50, 150), rng.uniform(10, 40), rng.uniform(20, 80), rng.uniform(1, 5)]
+                raw.append(RawMaterial(
+                    company=company,
+                    branch=branch,
+                    date=day,
+                    shift=shift,
+                    maize_kg=inputs[0],
+                    soya_kg=inputs[1],
+                    sugar_kg=inputs[2],
+                    sorghum_kg=inputs[3],
+                    premix_kg=inputs[4],
+                    total_raw_material=sum(inputs),
+                    supervisor=admin,
+                ))
+                total_bags = int(sum(inputs) * 0.9 / BAG_KG)
+                flour.append(FlourOutput(
+                    date=day,
+                    shift=shift,
+                    product_name=f"{self.tag} flour",
+                    total_bags=total_bags,
+                    spillage_kg=rng.uniform(0, 5),
+                    germ_kg=rng.uniform(5, 20),
+                    chaff_kg=rng.uniform(5, 20),
+                    waste_kg=rng.uniform(1, 10),
+                    supervisor=admin,
+                    efficiency=total_bags * BAG_KG / sum(inputs) * 100,
+                ))
+
+            for material in materials:
+                opening = closing[material.pk]
+                shifts = [_money(rng.uniform(20, 80)) for _ in range(3)]
+                output = sum(shifts)
+                raw_in = _money(rng.uniform(0.8, 1.2) * float(output))
+                closing[material.pk] = opening + raw_in - output
+                inventory.append(DailyInventory(
+                    company=company,
+                    branch=branch,
+                    material=material,
+                    date=day,
+                    opening_balance=opening,
+                    raw_in=raw_in,
+                    shift_1=shifts[0],
+                    shift_2=shifts[1],
+                    shift_3=shifts[2],
+                    total_shift_output=output,
+                    closing_balance=closing[material.pk],
+                ))
+
+            for vehicle in vehicles:
+                transport.append(TransportRecord(
+                    vehicle=vehicle,
+                    date=day,
+                    fuel_cost=_money(rng.uniform(20, 120)),
+                    service_cost=_money(rng.uniform(0, 50) if rng.random() < 0.1 else 0),
+                    company=company,
+                    branch=branch,
+                    created_by=admin,
+                    status="approved",
+                ))
+
+            for _ in range(self.sales_per_day):
+                product = rng.choice(self.products)
+                quantity = rng.randint(1, 50)
+                sales.append(Sale(
+                    date=day,
+                    salesperson=salesperson,
+                    customer=rng.choice(self.customers),
+                    product=product,
+                    quantity=quantity,
+                    unit_price=product.unit_price,
+                    total_amount=product.unit_price * quantity,
+                    location=branch.location,
+                ))
+
+            for _ in range(self.audit_per_day):
+                audit.append(AuditLog(
+                    user=admin,
+                    action=rng.choice(AUDIT_ACTIONS),
+                    module="milling",
+                    model_name="MillingBatch",
+                    content_type=self.audit_type,
+                    object_id=rng.randint(1, 10 ** 6),
+                    object_name=f"{name}-{day:%Y%m%d}",
+                ))
+
+        self._write(MillingBatch, batches)
+        self._write(RawMaterial, raw)
+        self._write(FlourOutput, flour)
+        self._write(Sale, sales)
+        self._write(AuditLog, audit)
+
+        inventory = self._write(DailyInventory, inventory)
+        self._inventory_rollups(inventory)
+
+        transport = self._write(TransportRecord, transport)
+        self._transport_rollups(transport)
+
+    def _transport_rollups(self, transport):
+        totals = {}
+        for record in transport:
+            row = totals.setdefault(
+                (record.company_id, record.branch_id, record.vehicle.category, record.date),
+                Counter(),
+            )
+            row.update(fuel_cost=record.fuel_cost, service_cost=record.service_cost, record_count=1)
+
+        self._write(TransportCostRollup, [
+            TransportCostRollup(
+                company_id=company_id,
+                branch_id=branch_id,
+                category=category,
+                date=day,
+                fuel_cost=row["fuel_cost"],
+                service_cost=row["service_cost"],
+                record_count=row["record_count"],
+            )
+            for (company_id, branch_id, category, day), row in totals.items()
+        ])
+
+    def _inventory_rollups(self, inventory):
+        totals = {}
+        for record in inventory:
+            row = totals.setdefault(analytics_key(record), Counter())
+            row.update(contribution(record))
+
+        self._write(WarehouseAnalytics, [
+            WarehouseAnalytics(
+                company_id=company_id,
+                branch_id=branch_id,
+                date=day,
+                efficiency_rate=(
+                    row["total_output"] / row["total_raw_in"] * 100 if row["total_raw_in"] else 0
+                ),
+                **{field: row[field] for field in TOTAL_FIELDS},
+            )
+            for (company_id, branch_id, day), row in totals.items()
+        ])
+
+        if not settings.WAREHOUSE_LEDGER_MODE:
+            return
+
+        movements = []
+        first_days = set()
+        for record in inventory:
+            if record.material_id not in first_days:
+                first_days.add(record.material_id)
+                movements.append(self._movement(record, "opening", record.opening_balance))
+            movements.append(self._movement(record, "in", record.raw_in))
+            movements.append(self._movement(record, "out", -record.total_shift_output))
+
+        self._write(StockMovement, movements)
+
+    def _movement(self, record, movement_type, quantity):
+        return StockMovement(
+            company_id=record.company_id,
+            branch_id=record.branch_id,
+            material_id=record.material_id,
+            daily_record=record,
+            date=record.date,
+            movement_type=movement_type,
+            quantity=quantity,
+        )
+
+
+def generate(*, companies=2, branches=2, years=1, end=None, materials=5, vehicles=2,
+             sales_per_day=10, audit_per_day=5, seed=0, batch_size=2000, log=None):
+    """
+    Synthetic history for benchmarking: `companies` x `branches`, each
+    with `years` of daily milling, production, sales, transport,
+    inventory and audit rows ending on `end` (default today). Every
+    branch is written in its own transaction with bulk_create.
+
+    Returns {"tag", "start", "end", "users", "rows"}; `users` are the
+    usernames of the company admins created, `rows` counts per model.
+    """
+    rng = random.Random(seed)
+    # keeps the names of repeated runs on one database apart
+    tag = f"{BENCH_PREFIX}-{int(time.time())}"
+
+    end = end or date.today()
+    start = end - timedelta(days=round(365 * years) - 1)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    products = Product.objects.bulk_create([
+        Product(name=f"{tag}-product-{i}", unit="bag", unit_price=_money(rng.uniform(500, 3000)))
+        for i in range(5)
+    ])
+    customers = Customer.objects.bulk_create([
+        Customer(
+            name=f"{tag}-customer-{i}",
+            shop_name=f"{tag}-shop-{i}",
+            phone="0700000000",
+            location=rng.choice(("North", "South", "East", "West")),
+        )
+        for i in range(20)
+    ])
+
+    generator = _Generator(
+        tag=tag,
+        days=days,
+        rng=rng,
+        batch_size=batch_size,
+        materials=materials,
+        vehicles=vehicles,
+        sales_per_day=sales_per_day,
+        audit_per_day=audit_per_day,
+        products=products,
+        customers=customers,
+    )
+
+    users = []
+    for c in range(companies):
+        company = Company.objects.create(name=f"{tag}-{c}")
+        admin = User.objects.create_user(username=f"{tag}-admin-{c}", password=None, role="admin", company=company)
+        users.append(admin.username)
+
+        for b in range(branches):
+            branch = Branch.objects.create(company=company, name=f"{tag}-{c}-{b}", location=f"Region {b}")
+            with transaction.atomic():
+                generator.branch(company, branch, admin, c, b)
+            if log:
+                log(f"{company.name} / {branch.name}: {sum(generator.counts.values())} rows so far")
+
+    return {
+        "tag": tag,
+        "start": start,
+        "end": end,
+        "users": users,
+        "rows": dict(generator.counts),
+    }
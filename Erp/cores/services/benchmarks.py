@@ -0,0 +1,217 @@
+import platform
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import django
+import numpy as np
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+from django.utils.timezone import now
+from rest_framework.routers import APIRootView
+from rest_framework.test import APIClient
+
+# API schema and docs pages, not application endpoints
+SKIPPED_MODULES = ("drf_spectacular.",)
+
+
+def _path(pattern):
+    """
+    Literal URL of a pattern without parameters.
+    """
+    if isinstance(pattern, RoutePattern):
+        return str(pattern)
+    return str(pattern).lstrip("^").replace("\\Z", "").rstrip("$").replace("\\", "")
+
+
+def _has_parameters(pattern):
+    if isinstance(pattern, RoutePattern):
+        return bool(pattern.converters)
+    return bool(pattern.regex.groups)
+
+
+def _is_get_endpoint(callback):
+    view_class = getattr(callback, "cls", None)
+    if view_class is None or view_class.__module__.startswith(SKIPPED_MODULES):
+        return False
+    if issubclass(view_class, APIRootView):
+        return False
+
+    actions = getattr(callback, "actions", None)
+    if actions is not None:
+        # viewset routes: list and detail=False actions
+        return "get" in actions
+
+    return hasattr(view_class, "get")
+
+
+def discover_endpoints(patterns=None, prefix="/"):
+    """
+    Every DRF GET endpoint without URL parameters (lists, analytics,
+    detail=False actions), in URLconf order.
+    """
+    patterns = get_resolver().url_patterns if patterns is None else patterns
+    found = []
+
+    for entry in patterns:
+        if _has_parameters(entry.pattern):
+            continue
+
+        path = prefix + _path(entry.pattern)
+
+        if isinstance(entry, URLResolver):
+            found.extend(discover_endpoints(entry.url_patterns, path))
+        elif isinstance(entry, URLPattern) and _is_get_endpoint(entry.callback):
+            if path.startswith("/api/") and path not in found:
+                found.append(path)
+
+    return found
+
+
+class _QueryCounter:
+    """
+    execute_wrapper counting queries; unlike connection.queries it does
+    not depend on DEBUG or on the size of the query log.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def _count_queries():
+    """
+    _QueryCounter on every connection used inside the block: this
+    thread's, and any opened meanwhile by another thread (async views'
+    sync_to_async hops, metric worker threads), through connection_created.
+    """
+    counter = _QueryCounter()
+    wrapped = []
+
+    def install(sender, connection, **kwargs):
+        if counter not in connection.execute_wrappers:
+            connection.execute_wrappers.append(counter)
+            wrapped.append(connection)
+
+    for open_connection in connections.all(initialized_only=True):
+        install(None, open_connection)
+    connection_created.connect(install, weak=False)
+
+    try:
+        yield counter
+    finally:
+        connection_created.disconnect(install)
+        for open_connection in wrapped:
+            if counter in open_connection.execute_wrappers:
+                open_connection.execute_wrappers.remove(counter)
+
+
+def _request(client, path, params):
+    started = time.perf_counter()
+    response = client.get(path, params, secure=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    return response, elapsed
+
+
+def benchmark_endpoint(client, path, params, *, iterations=10, cold=False):
+    """
+    Time `iterations` GETs of one endpoint after a first request, which
+    warms caches and is reported on its own. cold=True clears the cache
+    before that first request. Queries are counted on the last request,
+    peak memory is taken on an extra request under tracemalloc.
+    """
+    if cold:
+        cache.clear()
+
+    response, first_ms = _request(client, path, params)
+
+    timings = []
+    for _ in range(iterations):
+        with _count_queries() as queries:
+            response, elapsed = _request(client, path, params)
+        timings.append(elapsed)
+
+    tracemalloc.start()
+    try:
+        client.get(path, params, secure=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = np.asarray(timings)
+    return {
+        "status": response.status_code,
+        "queries": queries.count,
+        "first_ms": round(first_ms, 2),
+        "p50_ms": round(float(np.percentile(timings, 50)), 2),
+        "p95_ms": round(float(np.percentile(timings, 95)), 2),
+        "mean_ms": round(float(timings.mean()), 2),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "response_bytes": len(response.content),
+    }
+
+
+def run_benchmarks(*, user, endpoints=None, params=None, iterations=10, cold=False, log=None):
+    """
+    Benchmark `endpoints` (default: discover_endpoints()) as `user`
+    through the DRF test client, against the configured database.
+    Returns a JSON-serializable report.
+    """
+    endpoints = discover_endpoints() if endpoints is None else endpoints
+    params = params or {}
+
+    client = APIClient(SERVER_NAME="localhost")
+    client.force_authenticate(user)
+    # a failing view is reported with its status instead of stopping the run
+    client.raise_request_exception = False
+
+    results = {}
+    for path in endpoints:
+        results[path] = benchmark_endpoint(client, path, params, iterations=iterations, cold=cold)
+        if log:
+            log(f"{path}: {results[path]['status']} p95 {results[path]['p95_ms']} ms, {results[path]['queries']} queries")
+
+    return {
+        "generated_at": now().isoformat(),
+        "database": connection.vendor,
+        "django": django.get_version(),
+        "python": platform.python_version(),
+        "user": user.get_username(),
+        "params": params,
+        "iterations": iterations,
+        "cold": cold,
+        "endpoints": results,
+    }
+
+
+def find_regressions(report, baseline, *, tolerance=0.25):
+    """
+    Endpoints of `report` slower at p95 than `baseline` by more than
+    `tolerance`, running more queries, or newly failing.
+    Returns [(path, reason)].
+    """
+    regressions = []
+
+    for path, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(path)
+        if previous is None:
+            continue
+
+        if current["status"] >= 400 > previous["status"]:
+            regressions.append((path, f"status {previous['status']} -> {current['status']}"))
+        if current["queries"] > previous["queries"]:
+            regressions.append((path, f"queries {previous['queries']} -> {current['queries']}"))
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append((path, f"p95 {previous['p95_ms']} -> {current['p95_ms']} ms"))
+
+    return regressions
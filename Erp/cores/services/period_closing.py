@@ -1,25 +1,26 @@
 from transport.models import TransportRecord
-from warehouse.models import DailyInventory
 from notifications.services import notify_role
 
-def can_close_period(company,year,month):
-    pending_transport=TransportRecord.objects.filter(
-        company=company,
-        date__year=year,
-        date__month=month,
-        status__in=["draft","pending"]
-
-    ).exists()
-
-    pending_inventory = DailyInventory.objects.filter(
-        company=company,
-        date__year=year,
-        date__month=month,
-        status__in=["draft","pending"]
-    ).exists()
-
-
-    return not (pending_transport or pending_inventory)
+# Only transport records go through draft/pending approval;
+# DailyInventory has no status field, so it never blocks a close.
+PENDING_STATUSES = ["draft", "pending"]
+
+
+def blocked_company_ids(company_ids, start_date, end_date):
+    """
+    Companies that still have draft or pending records between the two
+    dates, in one grouped query.
+    """
+    return set(
+        TransportRecord.objects
+        .filter(
+            company_id__in=company_ids,
+            date__range=[start_date, end_date],
+            status__in=PENDING_STATUSES,
+        )
+        .values_list("company_id", flat=True)
+        .distinct()
+    )
 
 def notify_pre_close(company, year, month):
     notify_role(
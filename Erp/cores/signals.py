@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from cores.models import AccountingPeriod
+from cores.utils.periods import period_lock_cache
+
+
+@receiver(post_save, sender=AccountingPeriod)
+@receiver(post_delete, sender=AccountingPeriod)
+def invalidate_period_lock(sender, instance, **kwargs):
+    period_lock_cache.invalidate(instance.company_id, instance.year, instance.month)
@@ -1,7 +1,11 @@
-from celery import shared_task
+from celery import group, shared_task
 from datetime import date
 from cores.models import Company
-from cores.services.auto_close import auto_close_period
+from cores.services.auto_close import auto_close_periods
+
+# Companies handled by one worker task during month-end closing
+CLOSE_CHUNK_SIZE = 200
+
 
 @shared_task
 def auto_close_last_month():
@@ -11,5 +15,20 @@ def auto_close_last_month():
     if today.month == 1:
         year -= 1
 
-    for company in Company.objects.all():
-        auto_close_period(company, year, month)
+    company_ids = list(
+        Company.objects.order_by("id").values_list("id", flat=True)
+    )
+
+    chunks = [
+        company_ids[i:i + CLOSE_CHUNK_SIZE]
+        for i in range(0, len(company_ids), CLOSE_CHUNK_SIZE)
+    ]
+
+    group(
+        auto_close_companies.s(year, month, chunk) for chunk in chunks
+    ).apply_async()
+
+
+@shared_task
+def auto_close_companies(year, month, company_ids):
+    return auto_close_periods(year, month, company_ids=company_ids)
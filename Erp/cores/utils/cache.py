@@ -0,0 +1,19 @@
+from django.conf import settings
+
+# backends every worker reaches over the network; anything else (memory,
+# dummy, and the database cache, which costs a query per lookup) is not
+# worth caching cross-worker state in
+SHARED_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+
+
+def cache_is_shared(alias="default"):
+    """
+    True when every worker reads the same cache. Data that must not go
+    stale across workers (revocations, permissions) is read from the
+    database instead when it is not.
+    """
+    return settings.CACHES[alias]["BACKEND"] in SHARED_BACKENDS
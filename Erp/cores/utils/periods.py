@@ -1,13 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models import Q
+
 from cores.models import AccountingPeriod
 
-def is_period_locked(*,company,date):
 
-    period = AccountingPeriod.objects.filter(
-        company=company,
+class PeriodLockCache:
+    """
+    In-process LRU cache of (company_id, year, month) -> is_locked.
+
+    Saves in this process invalidate entries through signals; the TTL
+    bounds how long a lock changed by another worker (or by the
+    auto_close_periods command) can go unnoticed.
+    """
+
+    def __init__(self, maxsize=4096, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """
+        {key: is_locked} for the keys that are cached and not expired.
+        """
+        now = time.monotonic()
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+
+                is_locked, expires_at = entry
+                if expires_at < now:
+                    del self._entries[key]
+                    continue
+
+                self._entries.move_to_end(key)
+                found[key] = is_locked
+
+        return found
+
+    def set_many(self, values):
+        expires_at = time.monotonic() + self.ttl
+
+        with self._lock:
+            for key, is_locked in values.items():
+                self._entries[key] = (is_locked, expires_at)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns (hit, is_locked).
+        """
+        found = self.get_many([key])
+        return key in found, found.get(key)
+
+    def set(self, key, is_locked):
+        self.set_many({key: is_locked})
+
+    def invalidate(self, company_id, year, month):
+        self.invalidate_many([(company_id, year, month)])
+
+    def invalidate_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+period_lock_cache = PeriodLockCache()
+
+
+def _company_id(company):
+    return getattr(company, "pk", company)
+
+
+def is_period_locked(*, company, date):
+    company_id = _company_id(company)
+    if company_id is None:
+        return False
+
+    key = (company_id, date.year, date.month)
+
+    hit, is_locked = period_lock_cache.get(key)
+    if hit:
+        return is_locked
+
+    is_locked = AccountingPeriod.objects.filter(
+        company_id=company_id,
         year=date.year,
         month=date.month,
-        is_locked=True
+        is_locked=True,
+    ).exists()
+
+    period_lock_cache.set(key, is_locked)
+    return is_locked
+
+
+def locked_periods(pairs):
+    """
+    Bulk lock check for an iterable of (company, date) pairs.
+
+    Returns the set of (company_id, year, month) keys that are locked.
+    Cache misses are resolved together in a single query.
+    """
+    keys = {
+        (_company_id(company), date.year, date.month)
+        for company, date in pairs
+        if _company_id(company) is not None
+    }
+
+    cached = period_lock_cache.get_many(keys)
+    locked = {key for key, is_locked in cached.items() if is_locked}
+    missing = keys - cached.keys()
+
+    if not missing:
+        return locked
+
+    condition = Q()
+    for company_id, year, month in missing:
+        condition |= Q(company_id=company_id, year=year, month=month)
+
+    found = set(
+        AccountingPeriod.objects
+        .filter(condition, is_locked=True)
+        .values_list("company_id", "year", "month")
+    )
 
-    ).first()
+    period_lock_cache.set_many({key: key in found for key in missing})
 
-    return period is not None
\ No newline at end of file
+    return locked | found
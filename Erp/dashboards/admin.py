@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ExecutiveAlert
+
+
+@admin.register(ExecutiveAlert)
+class ExecutiveAlertAdmin(admin.ModelAdmin):
+    list_display = ("company", "rule", "alert_type", "message", "is_active", "updated_at")
+    list_filter = ("rule", "is_active")
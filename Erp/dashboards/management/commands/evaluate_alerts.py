@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from cores.models import Company
+from dashboards.services.alerts import ALERT_CHUNK_SIZE, evaluate_alerts
+
+
+class Command(BaseCommand):
+    help = "Evaluate the executive alert rules for every company and store the results; scheduled every 15 minutes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, default=None, help="Only this company id")
+
+    def handle(self, *args, **options):
+        company_ids = (
+            [options["company"]] if options["company"]
+            else list(Company.objects.order_by("id").values_list("id", flat=True))
+        )
+
+        active = 0
+        for i in range(0, len(company_ids), ALERT_CHUNK_SIZE):
+            active += evaluate_alerts(company_ids[i:i + ALERT_CHUNK_SIZE])
+
+        self.stdout.write(self.style.SUCCESS(f"{active} active alert(s) across {len(company_ids)} company(ies)"))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutiveAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(choices=[('user_limit', 'User limit'), ('subscription', 'Subscription status'), ('low_stock', 'Low stock'), ('cost_spike', 'Transport cost spike')], max_length=30)),
+                ('alert_type', models.CharField(choices=[('billing', 'Billing'), ('limit', 'Limit'), ('inventory', 'Inventory'), ('transport', 'Transport')], max_length=20)),
+                ('message', models.CharField(max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='executive_alerts', to='cores.company')),
+            ],
+            options={
+                'ordering': ['rule'],
+                'indexes': [models.Index(fields=['company', 'is_active'], name='dashboards__company_1069e6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('company', 'rule'), name='unique_executive_alert_rule')],
+            },
+        ),
+    ]
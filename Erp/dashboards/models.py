@@ -1,3 +1,46 @@
 from django.db import models
 
-# Create your models here.
+from cores.models import Company
+
+
+class ExecutiveAlert(models.Model):
+    """
+    An alert raised for a company by the periodic rule evaluation
+    (dashboards.services.alerts). One row per (company, rule); it is
+    switched off rather than deleted when the rule clears.
+    """
+
+    RULE_CHOICES = (
+        ("user_limit", "User limit"),
+        ("subscription", "Subscription status"),
+        ("low_stock", "Low stock"),
+        ("cost_spike", "Transport cost spike"),
+    )
+
+    TYPE_CHOICES = (
+        ("billing", "Billing"),
+        ("limit", "Limit"),
+        ("inventory", "Inventory"),
+        ("transport", "Transport"),
+    )
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="executive_alerts")
+    rule = models.CharField(max_length=30, choices=RULE_CHOICES)
+    alert_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    message = models.CharField(max_length=255)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["rule"]
+        constraints = [
+            models.UniqueConstraint(fields=["company", "rule"], name="unique_executive_alert_rule"),
+        ]
+        indexes = [
+            models.Index(fields=["company", "is_active"]),
+        ]
+
+    def __str__(self):
+        return f"{self.company} - {self.rule}"
@@ -1,26 +1,181 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.utils.timezone import now
+
+from accounts.models import User
+from billing.models import Subscription
+from transport.models import TransportCostRollup
+from warehouse.models import DailyInventory
+
+from ..models import ExecutiveAlert
+
+# Last week's transport cost above this multiple of the previous
+# four weeks' weekly average raises a cost spike alert
+COST_SPIKE_RATIO = 1.5
+COST_SPIKE_WEEKS = 4
+
+# companies evaluated together by one evaluate_alerts call
+ALERT_CHUNK_SIZE = 500
+
+
 def get_executive_alerts(company):
+    """
+    Active alerts of a company: {"type", "message"} as before, plus the
+    rule that raised them and when. One indexed read of the alerts the
+    periodic evaluation (the evaluate_alerts command) stored.
+    """
     if not company:
         return []
 
-    subscription = getattr(company, "subscription", None)
-    if not subscription:
-        return []
+    return list(
+        ExecutiveAlert.objects
+        .filter(company=company, is_active=True)
+        .values("rule", "message", "updated_at", type=F("alert_type"))
+    )
+
+
+def current_subscriptions(company_ids):
+    """
+    company_id -> the subscription ending last, with its plan.
+    """
+    subscriptions = (
+        Subscription.objects
+        .filter(company_id__in=company_ids)
+        .select_related("plan")
+        .order_by("company_id", "end_date", "id")
+    )
+    return {s.company_id: s for s in subscriptions}
+
+
+def subscription_alerts(company_ids, subscriptions):
+    for company_id, subscription in subscriptions.items():
+        if subscription.status != "active":
+            yield company_id, "subscription", "billing", "Subscription not active"
+
+
+def user_limit_alerts(company_ids, subscriptions):
+    user_counts = dict(
+        User.objects
+        .filter(company_id__in=company_ids, is_active=True)
+        .values("company_id")
+        .annotate(total=Count("id"))
+        .values_list("company_id", "total")
+    )
+
+    for company_id, subscription in subscriptions.items():
+        plan = subscription.plan
+        if plan is None:
+            continue
+
+        if user_counts.get(company_id, 0) > plan.max_users:
+            yield company_id, "user_limit", "limit", "User limit exceeded"
+
+
+def low_stock_alerts(company_ids, subscriptions):
+    latest_date = (
+        DailyInventory.objects
+        .filter(company_id=OuterRef("company_id"), material_id=OuterRef("material_id"))
+        .order_by("-date")
+        .values("date")[:1]
+    )
+
+    out_of_stock = (
+        DailyInventory.objects
+        .filter(company_id__in=company_ids, date=Subquery(latest_date), closing_balance__lte=0)
+        .values("company_id")
+        .annotate(materials=Count("material_id", distinct=True))
+        .values_list("company_id", "materials")
+    )
+
+    for company_id, materials in out_of_stock:
+        yield company_id, "low_stock", "inventory", f"{materials} material(s) out of stock"
+
+
+def cost_spike_alerts(company_ids, subscriptions):
+    today = now().date()
+    week_start = today - timedelta(days=7)
+    baseline_start = week_start - timedelta(weeks=COST_SPIKE_WEEKS)
+
+    costs = (
+        TransportCostRollup.objects
+        .filter(company_id__in=company_ids, date__gte=baseline_start, date__lt=today)
+        .values("company_id")
+        .annotate(
+            last_fuel=Sum("fuel_cost", filter=Q(date__gte=week_start)),
+            last_service=Sum("service_cost", filter=Q(date__gte=week_start)),
+            base_fuel=Sum("fuel_cost", filter=Q(date__lt=week_start)),
+            base_service=Sum("service_cost", filter=Q(date__lt=week_start)),
+        )
+    )
+
+    for row in costs:
+        last_week = float((row["last_fuel"] or 0) + (row["last_service"] or 0))
+        weekly_average = float((row["base_fuel"] or 0) + (row["base_service"] or 0)) / COST_SPIKE_WEEKS
+
+        if weekly_average and last_week > weekly_average * COST_SPIKE_RATIO:
+            yield (
+                row["company_id"], "cost_spike", "transport",
+                f"Transport cost last week is {last_week / weekly_average:.1f}x the recent average",
+            )
+
+
+RULES = [
+    subscription_alerts,
+    user_limit_alerts,
+    low_stock_alerts,
+    cost_spike_alerts,
+]
+
+
+def evaluate_alerts(company_ids):
+    """
+    Run every rule for a batch of companies and store the result:
+    raised alerts are upserted, alerts no longer raised are switched off.
+    Each rule is one grouped query over the whole batch.
+
+    Returns the number of active alerts.
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return 0
+
+    subscriptions = current_subscriptions(company_ids)
 
-    alerts = []  # ✅ MUST be defined
+    raised = {}
+    for rule in RULES:
+        for company_id, name, alert_type, message in rule(company_ids, subscriptions):
+            raised[(company_id, name)] = (alert_type, message)
 
-    if subscription.status != "active":
-        alerts.append({
-            "type": "billing",
-            "message": "Subscription not active"
-        })
+    if raised:
+        ExecutiveAlert.objects.bulk_create(
+            [
+                ExecutiveAlert(
+                    company_id=company_id,
+                    rule=name,
+                    alert_type=alert_type,
+                    message=message,
+                    is_active=True,
+                    updated_at=now(),
+                )
+                for (company_id, name), (alert_type, message) in raised.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["company", "rule"],
+            update_fields=["alert_type", "message", "is_active", "updated_at"],
+        )
 
-    # Guard against missing relation
-    user_count = company.users.count() if hasattr(company, "users") else 0
+    cleared = [
+        alert_id
+        for alert_id, company_id, name in (
+            ExecutiveAlert.objects
+            .filter(company_id__in=company_ids, is_active=True)
+            .values_list("id", "company_id", "rule")
+        )
+        if (company_id, name) not in raised
+    ]
 
-    if user_count > subscription.plan.max_users:
-        alerts.append({
-            "type": "limit",
-            "message": "User limit exceeded"
-        })
+    if cleared:
+        ExecutiveAlert.objects.filter(id__in=cleared).update(is_active=False, updated_at=now())
 
-    return alerts
+    return len(raised)
@@ -0,0 +1,56 @@
+import time
+
+from django.core.cache import cache
+
+VERSION_TIMEOUT = None  # versions never expire on their own
+
+
+def version_key(component, company_id):
+    return f"dashboard:version:{component}:{company_id}"
+
+
+def component_key(component, company_id, version, start_date, end_date):
+    return (
+        f"dashboard:{component}:{company_id}:{version}:"
+        f"{start_date.isoformat()}:{end_date.isoformat()}"
+    )
+
+
+def _new_version():
+    # time based, so a lost version key never brings back an old entry
+    return int(time.time() * 1000)
+
+
+def get_versions(company_id, components):
+    """
+    Current cache version of each component for one company.
+    """
+    keys = {version_key(c, company_id): c for c in components}
+    found = cache.get_many(keys)
+
+    versions = {}
+    for key, component in keys.items():
+        if key in found:
+            versions[component] = found[key]
+            continue
+
+        cache.add(key, _new_version(), VERSION_TIMEOUT)
+        versions[component] = cache.get(key)
+
+    return versions
+
+
+def bump_versions(company_id, *components):
+    """
+    Invalidate components for a company; old entries are never
+    read again and simply expire.
+    """
+    if company_id is None:
+        return
+
+    for component in components:
+        key = version_key(component, company_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), VERSION_TIMEOUT)
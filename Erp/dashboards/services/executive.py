@@ -0,0 +1,52 @@
+from core.async_views import run_queries
+
+from .alerts import get_executive_alerts
+from .kpis import COMPANY_KPIS
+from .metrics import evaluate
+from .trends import revenue_trend_rows
+
+
+def build_executive_dashboard(company, start_date, end_date):
+    """
+    Executive dashboard from independently cached components.
+
+    KPIs and the revenue trend come from the metric engine (one cached
+    aggregate per source table, cold ones queried one after another), versioned
+    per company and bumped by dashboards.signals when source data changes.
+    Alerts are the rows stored by the periodic evaluation.
+
+    Returns (data, cache) where cache maps component -> "hit"/"miss".
+    """
+    kpis, status = evaluate(company, start_date, end_date, COMPANY_KPIS)
+
+    trend, trend_status = evaluate(company, start_date, end_date, ["revenue"], series=True)
+    status.update(trend_status)
+
+    data = {
+        "kpis": kpis,
+        "revenue_trend": revenue_trend_rows(trend["revenue"]),
+        "alerts": get_executive_alerts(company),
+    }
+
+    return data, status
+
+
+async def abuild_executive_dashboard(company, start_date, end_date):
+    """
+    build_executive_dashboard for async views: the KPI, trend and alert
+    reads run off the event loop in one thread hop.
+    """
+    (kpis, status), (trend, trend_status), alerts = await run_queries(
+        (evaluate, company, start_date, end_date, COMPANY_KPIS),
+        (evaluate, company, start_date, end_date, ["revenue"], True),
+        (get_executive_alerts, company),
+    )
+    status.update(trend_status)
+
+    data = {
+        "kpis": kpis,
+        "revenue_trend": revenue_trend_rows(trend["revenue"]),
+        "alerts": alerts,
+    }
+
+    return data, status
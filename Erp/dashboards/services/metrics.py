@@ -0,0 +1,233 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable
+
+from django.core.cache import cache
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+
+from .cache import component_key, get_versions
+
+GRAINS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+# how long a cached total / series stays fresh when the metric does not say
+METRIC_TTL = 10 * 60
+SERIES_TTL = 30 * 60
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    A KPI read straight from one table.
+
+    `measure` is an aggregate expression over `model`; `source` names the
+    table for caching and invalidation (see dashboards.signals). Metrics
+    with the same source are fetched together in one aggregate query.
+    `ttl` and `series_ttl` bound how long totals and series are cached;
+    a group is kept for the shortest TTL of its metrics.
+    """
+    name: str
+    source: str
+    model: type
+    measure: object
+    company_field: str = "company"
+    date_field: str = "date"
+    grain: str = "month"
+    ttl: int = METRIC_TTL
+    series_ttl: int = SERIES_TTL
+
+
+@dataclass(frozen=True)
+class DerivedMetric:
+    """
+    A KPI computed from other metrics, e.g. profit = revenue - cost.
+    """
+    name: str
+    inputs: tuple
+    compute: Callable
+    grain: str = "month"
+
+
+REGISTRY = {}
+
+
+def register(metric):
+    REGISTRY[metric.name] = metric
+    return metric
+
+
+def _base_metrics(names):
+    """
+    Registered base metrics needed for `names`, derived inputs included.
+    """
+    needed = {}
+    pending = list(names)
+
+    while pending:
+        metric = REGISTRY[pending.pop()]
+        if isinstance(metric, DerivedMetric):
+            pending.extend(metric.inputs)
+        else:
+            needed[metric.name] = metric
+
+    return needed.values()
+
+
+def _group_metrics(metrics, series):
+    """
+    (source, grain) -> metrics that share one query.
+    grain is None for range totals.
+
+    A group always holds every registered metric of its source, so a
+    cached group answers any later request on that source.
+    """
+    sources = {metric.source for metric in metrics}
+    grains = {(metric.source, metric.grain if series else None) for metric in metrics}
+
+    groups = defaultdict(list)
+    for metric in REGISTRY.values():
+        if isinstance(metric, DerivedMetric) or metric.source not in sources:
+            continue
+
+        grain = metric.grain if series else None
+        if (metric.source, grain) in grains:
+            groups[(metric.source, grain)].append(metric)
+
+    return groups
+
+
+def _group_label(source, grain):
+    return f"{source}:{grain}" if grain else source
+
+
+def _query_group(metrics, company, start_date, end_date, grain):
+    first = metrics[0]
+
+    queryset = first.model.objects.filter(**{
+        first.company_field: company,
+        f"{first.date_field}__range": [start_date, end_date],
+    })
+
+    measures = {m.name: m.measure for m in metrics}
+
+    if grain is None:
+        totals = queryset.aggregate(**measures)
+        return {name: float(value or 0) for name, value in totals.items()}
+
+    rows = (
+        queryset
+        .annotate(period=GRAINS[grain](first.date_field))
+        .values("period")
+        .annotate(**measures)
+        .order_by("period")
+    )
+
+    return {
+        m.name: [(row["period"], float(row[m.name] or 0)) for row in rows]
+        for m in metrics
+    }
+
+
+def _group_ttl(metrics, grain):
+    return min(m.series_ttl if grain else m.ttl for m in metrics)
+
+
+def _check_metrics(metrics):
+    first = metrics[0]
+    for metric in metrics[1:]:
+        if (metric.model, metric.company_field, metric.date_field) != \
+                (first.model, first.company_field, first.date_field):
+            raise ValueError(
+                f"Metrics {first.name} and {metric.name} share source "
+                f"{first.source!r} but read different tables or fields."
+            )
+
+
+def _derive_totals(names, values):
+    for name in names:
+        metric = REGISTRY[name]
+        if isinstance(metric, DerivedMetric):
+            values[name] = metric.compute(*(values[i] for i in metric.inputs))
+    return values
+
+
+def _derive_series(names, values):
+    for name in names:
+        metric = REGISTRY[name]
+        if not isinstance(metric, DerivedMetric):
+            continue
+
+        inputs = [dict(values[i]) for i in metric.inputs]
+        periods = sorted(set().union(*inputs))
+
+        values[name] = [
+            (period, metric.compute(*(series.get(period, 0.0) for series in inputs)))
+            for period in periods
+        ]
+    return values
+
+
+def evaluate(company, start_date, end_date, names, series=False):
+    """
+    Evaluate registered metrics for one company over a date range.
+
+    Totals by default; with series=True each metric is bucketed by its
+    declared grain and returned as a list of (period, value).
+
+    One aggregate query per source table, cached per (company, period)
+    under the source's version. Returns (values, cache) where cache
+    maps each source group to "hit"/"miss".
+    """
+    names = list(names)
+    groups = _group_metrics(_base_metrics(names), series)
+
+    company_id = company.pk if company is not None else None
+    versions = get_versions(company_id, {source for source, _ in groups})
+
+    keys = {
+        group: component_key(
+            _group_label(*group), company_id, versions[group[0]], start_date, end_date
+        )
+        for group in groups
+    }
+
+    cached = cache.get_many(keys.values())
+    # an entry written before a metric was added to its source is stale
+    missing = [
+        group for group in groups
+        if not {m.name for m in groups[group]} <= cached.get(keys[group], {}).keys()
+    ]
+
+    results = {group: cached[keys[group]] for group in groups if group not in missing}
+
+    for group in missing:
+        _check_metrics(groups[group])
+
+    # one after another on this thread's connection: a thread per group
+    # would open a database connection per group
+    by_ttl = defaultdict(dict)
+    for group in missing:
+        results[group] = _query_group(groups[group], company, start_date, end_date, group[1])
+        by_ttl[_group_ttl(groups[group], group[1])][keys[group]] = results[group]
+
+    for ttl, entries in by_ttl.items():
+        cache.set_many(entries, ttl)
+
+    values = {}
+    for result in results.values():
+        values.update(result)
+
+    if series:
+        values = _derive_series(names, values)
+    else:
+        values = _derive_totals(names, values)
+
+    status = {
+        _group_label(*group): "miss" if group in missing else "hit"
+        for group in groups
+    }
+
+    return {name: values[name] for name in names}, status
@@ -1,20 +1,17 @@
-from django.db.models import Sum
-from django.db.models.functions import TruncMonth
-from sales.models import Sale
+from . import kpis  # noqa: F401  registers the metrics
+from .metrics import evaluate
+
+
+def revenue_trend_rows(points):
+    return [
+        {"month": month.strftime("%Y-%m"), "revenue": revenue}
+        for month, revenue in points
+    ]
+
 
 def monthly_revenue_trend(company, start_date, end_date):
     if not company:
         return []
-    qs = (
-        Sale.objects
-        .filter(salesperson__company=company, date__range=[start_date, end_date])
-        .annotate(month=TruncMonth("date"))
-        .values("month")
-        .annotate(total=Sum("total_amount"))
-        .order_by("month")
-    )
-    return [
-        {"month": r["month"].strftime("%Y-%m"), "revenue": float(r["total"] or 0)}
-        for r in qs
-    ]
 
+    series, _ = evaluate(company, start_date, end_date, ["revenue"], series=True)
+    return revenue_trend_rows(series["revenue"])
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from sales.models import Sale, Salesperson
+from transport.models import TransportRecord
+from warehouse.models import DailyInventory
+
+from .services.cache import bump_versions
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def invalidate_sales_components(sender, instance, **kwargs):
+    if instance.salesperson_id is None:
+        return
+
+    # the salesperson when the caller already loaded it, otherwise only
+    # its company_id rather than the whole row
+    if Sale.salesperson.is_cached(instance):
+        company_id = instance.salesperson.company_id
+    else:
+        company_id = (
+            Salesperson.objects
+            .filter(pk=instance.salesperson_id)
+            .values_list("company_id", flat=True)
+            .first()
+        )
+
+    bump_versions(company_id, "sales")
+
+
+@receiver(post_save, sender=TransportRecord)
+@receiver(post_delete, sender=TransportRecord)
+def invalidate_transport_components(sender, instance, **kwargs):
+    bump_versions(instance.company_id, "transport")
+
+
+@receiver(post_save, sender=DailyInventory)
+@receiver(post_delete, sender=DailyInventory)
+def invalidate_inventory_components(sender, instance, **kwargs):
+    bump_versions(instance.company_id, "inventory")
+
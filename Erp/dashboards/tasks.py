@@ -0,0 +1,25 @@
+from celery import group, shared_task
+
+from cores.models import Company
+from .services.alerts import ALERT_CHUNK_SIZE, evaluate_alerts
+
+
+@shared_task
+def evaluate_all_alerts():
+    company_ids = list(
+        Company.objects.order_by("id").values_list("id", flat=True)
+    )
+
+    chunks = [
+        company_ids[i:i + ALERT_CHUNK_SIZE]
+        for i in range(0, len(company_ids), ALERT_CHUNK_SIZE)
+    ]
+
+    group(
+        evaluate_company_alerts.s(chunk) for chunk in chunks
+    ).apply_async()
+
+
+@shared_task
+def evaluate_company_alerts(company_ids):
+    return evaluate_alerts(company_ids)
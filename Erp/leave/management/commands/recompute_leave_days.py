@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from cores.models import Company
+from leave.services.working_days import recompute_year
+
+
+class Command(BaseCommand):
+    help = "Recompute leave durations and used balances from the working calendars."
+
+    def add_arguments(self, parser):
+        parser.add_argument("year", type=int)
+        parser.add_argument("--company", type=int, default=None, help="Only this company id")
+
+    def handle(self, *args, **options):
+        year = options["year"]
+
+        company_ids = (
+            [options["company"]] if options["company"]
+            else Company.objects.values_list("id", flat=True)
+        )
+
+        changed = 0
+        for company_id in company_ids:
+            changed += recompute_year(company_id=company_id, year=year)
+
+        self.stdout.write(self.style.SUCCESS(f"{changed} leave request(s) updated for {year}"))
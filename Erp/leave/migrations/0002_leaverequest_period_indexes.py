@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+PERIOD_INDEX = "leave_leaverequest_period_gist"
+
+
+def create_period_index(apps, schema_editor):
+    # daterange + GiST only exist on Postgres; other backends use the
+    # btree index above and the in-memory interval tree
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {PERIOD_INDEX} ON leave_leaverequest "
+        "USING gist (daterange(start_date, end_date, '[]'))"
+    )
+
+
+def drop_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {PERIOD_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('leave', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['company', 'status', 'start_date', 'end_date'], name='leave_leave_company_61ebc3_idx'),
+        ),
+        migrations.RunPython(create_period_index, drop_period_index),
+    ]
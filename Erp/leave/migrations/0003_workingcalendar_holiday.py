@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('leave', '0002_leaverequest_period_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkingCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('working_weekdays', models.PositiveSmallIntegerField(default=31)),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='working_calendar', to='cores.company')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(max_length=100)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='cores.company')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('company', 'date'), name='unique_holiday_company_date')],
+            },
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from cores.models import Company
 
@@ -17,6 +17,43 @@ class LeaveType(models.Model):
         return f"{self.name} ({self.company.name})"
 
 
+class WorkingCalendar(models.Model):
+    """
+    Weekly working pattern of a company. Bit n of `working_weekdays`
+    is set when weekday n (Monday = 0) is a working day.
+    Companies without a calendar work Monday to Friday.
+    """
+    DEFAULT_WORKING_WEEKDAYS = 0b0011111
+
+    company=models.OneToOneField(Company,on_delete=models.CASCADE,related_name="working_calendar")
+    working_weekdays=models.PositiveSmallIntegerField(default=DEFAULT_WORKING_WEEKDAYS)
+
+    def is_working_weekday(self,weekday):
+        return bool(self.working_weekdays >> weekday & 1)
+
+    def __str__(self):
+        return f"Working calendar ({self.company.name})"
+
+
+class Holiday(models.Model):
+    company=models.ForeignKey(Company,on_delete=models.CASCADE,related_name="holidays")
+    date=models.DateField()
+    name=models.CharField(max_length=100)
+
+    class Meta:
+        ordering=["date"]
+        constraints=[
+            models.UniqueConstraint(fields=["company","date"],name="unique_holiday_company_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+
+# what LeaveRequest.save compares against the stored request
+BALANCE_STATE_FIELDS = ("status", "company_id", "start_date", "end_date", "leave_type_id", "total_days")
+
+
 class LeaveRequest(models.Model):
     STATUS_CHOICES=(
         ("draft","Draft"),
@@ -53,9 +90,44 @@ class LeaveRequest(models.Model):
 
     created_at=models.DateTimeField(auto_now_add=True) 
 
-    
+    class Meta:
+        indexes = [
+            # calendar / overlap lookups; Postgres also gets a GiST
+            # index on daterange(start_date, end_date) (migration 0002)
+            models.Index(fields=["company", "status", "start_date", "end_date"]),
+        ]
+
     def save(self,*args,**kwargs):
-        super().save(*args,**kwargs)
+        from .services.balances import apply_status_change
+        from .services.working_days import working_days
+
+        # the status change and the balance update commit together
+        with transaction.atomic():
+            # read under a lock: of two concurrent approvals of one
+            # request, the second sees it approved and consumes nothing
+            stored = None
+            if not self._state.adding:
+                stored = (
+                    LeaveRequest.objects
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values(*BALANCE_STATE_FIELDS)
+                    .first()
+                )
+
+            # a calendar change after approval must not alter what was
+            # consumed; recompute_year resyncs totals and balances together
+            dates = (self.company_id, self.start_date, self.end_date)
+            if stored is None or dates != tuple(stored[field] for field in ("company_id", "start_date", "end_date")):
+                if self.start_date and self.end_date:
+                    self.total_days = working_days(
+                        company_id=self.company_id,
+                        start=self.start_date,
+                        end=self.end_date,
+                    )
+
+            super().save(*args,**kwargs)
+            apply_status_change(self, stored)
 
     def __str__(self):
         return f"{self.user} - {self.leave_type.name} ({self.status})"
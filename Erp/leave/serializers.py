@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import LeaveType,LeaveRequest,LeaveBalance
+from .services.working_days import working_days
 
 class LeaveTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -50,7 +51,16 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
                 "You already have a leave during this period"
             )
 
-        total_days = (end - start).days + 1
+        total_days = working_days(
+            company_id=user.company_id,
+            start=start,
+            end=end,
+        )
+
+        if total_days == 0:
+            raise serializers.ValidationError(
+                "The selected period has no working days"
+            )
 
         if leave_type.requires_balance:
             balance = LeaveBalance.objects.filter(
@@ -68,7 +78,7 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
                     "Insufficient leave balance"
                 )
 
-                return data
+        return data
 
 
 class LeaveBalanceSerializer(serializers.ModelSerializer):
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.utils.timezone import now
+
+from leave.models import LeaveBalance, LeaveRequest
+from notifications.models import Notification
+from notifications.services import send_notifications
+
+MAX_BULK_DECISIONS = 500
+
+# decision -> statuses a request may be in to receive it
+DECIDABLE_STATUSES = {
+    "approved": ("pending",),
+    "rejected": ("pending", "approved"),
+}
+
+
+def _decision_notification(leave_request):
+    approved = leave_request.status == "approved"
+    period = f"{leave_request.start_date} to {leave_request.end_date}"
+
+    return Notification(
+        user_id=leave_request.user_id,
+        company_id=leave_request.company_id,
+        title="Leave approved" if approved else "Leave rejected",
+        message=(
+            f"Your {leave_request.leave_type.name} leave from {period} "
+            f"has been {leave_request.status}."
+        ),
+        notification_type="success" if approved else "warning",
+        module="leave",
+        object_id=leave_request.pk,
+    )
+
+
+def decide_leave_requests(*, company_id, ids, decision, decided_by, comment=""):
+    """
+    Approve or reject many leave requests in one transaction.
+
+    The requests and every balance they touch are locked with one
+    select_for_update each; deductions and releases are applied in
+    memory (oldest leave first) and written back with bulk_update.
+    Requests in the wrong status, or whose balance would go negative,
+    are left unchanged and reported.
+
+    Returns {request id: "approved" | "rejected" | reason not decided}.
+    """
+    allowed = DECIDABLE_STATUSES[decision]
+    ids = set(ids)
+    results = {}
+    decided = []
+
+    with transaction.atomic():
+        requests = list(
+            LeaveRequest.objects
+            .select_for_update(of=("self",))
+            .select_related("leave_type")
+            .filter(company_id=company_id, id__in=ids)
+            .order_by("start_date", "id")
+        )
+
+        for missing in ids - {r.pk for r in requests}:
+            results[missing] = "not found"
+
+        balances = {
+            (b.user_id, b.leave_type_id): b
+            for b in (
+                LeaveBalance.objects
+                .select_for_update()
+                .filter(
+                    company_id=company_id,
+                    user_id__in={r.user_id for r in requests},
+                    leave_type_id__in={r.leave_type_id for r in requests},
+                )
+            )
+        }
+
+        changed_balances = {}
+        decided_at = now()
+
+        for leave_request in requests:
+            if leave_request.status not in allowed:
+                results[leave_request.pk] = f"cannot be {decision} while {leave_request.status}"
+                continue
+
+            if leave_request.leave_type.requires_balance:
+                key = (leave_request.user_id, leave_request.leave_type_id)
+                balance = balances.get(key)
+
+                if decision == "approved":
+                    if balance is None:
+                        results[leave_request.pk] = "leave balance not initialized"
+                        continue
+                    if balance.remaining_days < leave_request.total_days:
+                        results[leave_request.pk] = "insufficient leave balance"
+                        continue
+                    balance.used_days += leave_request.total_days
+                    changed_balances[key] = balance
+
+                elif leave_request.status == "approved" and balance is not None:
+                    balance.used_days = max(balance.used_days - leave_request.total_days, 0)
+                    changed_balances[key] = balance
+
+            leave_request.status = decision
+            leave_request.decision_by = decided_by
+            leave_request.decision_at = decided_at
+            leave_request.decision_comment = comment
+            decided.append(leave_request)
+            results[leave_request.pk] = decision
+
+        # bulk_update skips LeaveRequest.save, the balances are handled above
+        LeaveRequest.objects.bulk_update(
+            decided,
+            ["status", "decision_by", "decision_at", "decision_comment"],
+            batch_size=500,
+        )
+        LeaveBalance.objects.bulk_update(
+            changed_balances.values(),
+            ["used_days"],
+            batch_size=500,
+        )
+
+        send_notifications(
+            [_decision_notification(r) for r in decided],
+            dedupe_window=None,
+        )
+
+    return results
@@ -0,0 +1,104 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from leave.models import LeaveBalance, LeaveType
+
+
+def provision_balances(*, company, users=None, leave_types=None):
+    """
+    Create the missing LeaveBalance rows for every (user, leave type)
+    pair of a company in one INSERT. Existing balances are left alone.
+    """
+    from accounts.models import User
+
+    if users is None:
+        users = User.objects.filter(company=company)
+    if leave_types is None:
+        leave_types = LeaveType.objects.filter(company=company)
+
+    user_ids = [getattr(user, "pk", user) for user in users]
+    leave_types = list(leave_types)
+
+    return LeaveBalance.objects.bulk_create(
+        [
+            LeaveBalance(
+                company=company,
+                user_id=user_id,
+                leave_type=leave_type,
+                earned_days=leave_type.max_days_per_year,
+            )
+            for user_id in user_ids
+            for leave_type in leave_types
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def consume_balance(leave_request):
+    """
+    Deduct an approved request's days from its balance.
+    The balance row is locked so concurrent approvals cannot overdraw it.
+    """
+    if not leave_request.leave_type.requires_balance:
+        return
+
+    with transaction.atomic():
+        balance = (
+            LeaveBalance.objects
+            .select_for_update()
+            .filter(user_id=leave_request.user_id, leave_type_id=leave_request.leave_type_id)
+            .first()
+        )
+
+        if balance is None:
+            raise ValidationError("Leave balance not initialized. Contact admin.")
+
+        if balance.remaining_days < leave_request.total_days:
+            raise ValidationError("Insufficient leave balance")
+
+        LeaveBalance.objects.filter(pk=balance.pk).update(
+            used_days=F("used_days") + leave_request.total_days
+        )
+
+
+def release_balance(*, user_id, leave_type_id, days):
+    """
+    Give back `days` of a request that is no longer approved.
+    """
+    with transaction.atomic():
+        LeaveBalance.objects.select_for_update().filter(
+            user_id=user_id,
+            leave_type_id=leave_type_id,
+            leave_type__requires_balance=True,
+            used_days__gte=days,
+        ).update(
+            used_days=F("used_days") - days
+        )
+
+
+def apply_status_change(leave_request, stored):
+    """
+    Balance effect of a save; `stored` holds the request's status,
+    leave type and total_days as stored before it (None for a new
+    request). The days consumed on the way into "approved" are the ones
+    released on the way out, whatever the calendar says by then; an
+    approved request whose days or type change is re-consumed.
+    """
+    was_approved = stored is not None and stored["status"] == "approved"
+    is_approved = leave_request.status == "approved"
+
+    if was_approved and is_approved and (
+        stored["leave_type_id"], stored["total_days"]
+    ) == (leave_request.leave_type_id, leave_request.total_days):
+        return
+
+    if was_approved:
+        release_balance(
+            user_id=leave_request.user_id,
+            leave_type_id=stored["leave_type_id"],
+            days=stored["total_days"],
+        )
+    if is_approved:
+        consume_balance(leave_request)
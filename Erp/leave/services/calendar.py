@@ -0,0 +1,180 @@
+from datetime import timedelta
+
+from django.db import connection
+
+from leave.models import LeaveRequest
+
+# Statuses that take someone off the team for the day
+BLOCKING_STATUSES = ("approved",)
+PLANNED_STATUSES = ("pending", "approved")
+
+MAX_WINDOW_DAYS = 366
+
+
+class IntervalTree:
+    """
+    Centered interval tree over closed intervals (start, end, value).
+
+    Each node keeps the intervals containing its center twice, sorted by
+    start and by end, so a point query only walks one side of the tree
+    and stops scanning a node as soon as no further interval can match.
+    """
+
+    def __init__(self, intervals):
+        self.root = self._build(sorted(intervals, key=lambda iv: iv[0]))
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+
+        # median start: the interval it comes from always stays at this node
+        center = intervals[len(intervals) // 2][0]
+
+        left, here, right = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        return (
+            center,
+            here,  # already sorted by start
+            sorted(here, key=lambda iv: iv[1], reverse=True),
+            self._build(left),
+            self._build(right),
+        )
+
+    def at(self, point):
+        """
+        Values of every interval containing `point`.
+        """
+        values = []
+        node = self.root
+
+        while node is not None:
+            center, by_start, by_end, left, right = node
+
+            if point < center:
+                for start, _, value in by_start:
+                    if start > point:
+                        break
+                    values.append(value)
+                node = left
+            elif point > center:
+                for _, end, value in by_end:
+                    if end < point:
+                        break
+                    values.append(value)
+                node = right
+            else:
+                values.extend(value for _, _, value in by_start)
+                node = None
+
+        return values
+
+
+def _days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _leave_queryset(company_id, statuses, branch_id=None):
+    qs = LeaveRequest.objects.filter(company_id=company_id, status__in=statuses)
+    if branch_id is not None:
+        qs = qs.filter(user__branch_id=branch_id)
+    return qs
+
+
+def _headcount_postgres(company_id, start, end, statuses, branch_id=None):
+    """
+    One query: generate_series over the window joined against the
+    requests' dateranges. The && filter is served by the GiST index
+    on daterange(start_date, end_date, '[]').
+    """
+    from accounts.models import User
+
+    params = [start, end, company_id, list(statuses), start, end]
+    branch_sql = ""
+    if branch_id is not None:
+        branch_sql = f"AND lr.user_id IN (SELECT id FROM {User._meta.db_table} WHERE branch_id = %s)"
+        params.append(branch_id)
+
+    sql = f"""
+        SELECT day::date, COUNT(DISTINCT lr.user_id)
+        FROM generate_series(%s::date, %s::date, interval '1 day') AS day
+        LEFT JOIN {LeaveRequest._meta.db_table} lr
+          ON lr.company_id = %s
+         AND lr.status = ANY(%s)
+         AND daterange(lr.start_date, lr.end_date, '[]') && daterange(%s::date, %s::date, '[]')
+         AND daterange(lr.start_date, lr.end_date, '[]') @> day::date
+         {branch_sql}
+        GROUP BY day
+        ORDER BY day
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
+
+
+def _headcount_interval_tree(company_id, start, end, statuses, branch_id=None):
+    """
+    One query for the requests overlapping the window, then an
+    in-memory interval tree answers the per-day lookups.
+    """
+    rows = (
+        _leave_queryset(company_id, statuses, branch_id)
+        .filter(start_date__lte=end, end_date__gte=start)
+        .values_list("start_date", "end_date", "user_id")
+    )
+
+    tree = IntervalTree(rows)
+    return {day: len(set(tree.at(day))) for day in _days(start, end)}
+
+
+def leave_headcount(*, company_id, start, end, statuses=BLOCKING_STATUSES, branch_id=None):
+    """
+    {date: number of people on leave} for every day of [start, end].
+    """
+    if connection.vendor == "postgresql":
+        counts = _headcount_postgres(company_id, start, end, statuses, branch_id)
+    else:
+        counts = _headcount_interval_tree(company_id, start, end, statuses, branch_id)
+
+    return {day: counts.get(day, 0) for day in _days(start, end)}
+
+
+def team_calendar(*, company_id, start, end, statuses=BLOCKING_STATUSES, branch_id=None):
+    """
+    Per-day team availability for a company (or one of its branches).
+    """
+    from accounts.models import User
+
+    team = User.objects.filter(company_id=company_id, is_active=True)
+    if branch_id is not None:
+        team = team.filter(branch_id=branch_id)
+    team_size = team.count()
+
+    headcount = leave_headcount(
+        company_id=company_id,
+        start=start,
+        end=end,
+        statuses=statuses,
+        branch_id=branch_id,
+    )
+
+    return {
+        "start": start,
+        "end": end,
+        "team_size": team_size,
+        "days": [
+            {
+                "date": day,
+                "on_leave": on_leave,
+                "available": max(team_size - on_leave, 0),
+            }
+            for day, on_leave in headcount.items()
+        ],
+    }
@@ -0,0 +1,197 @@
+import calendar
+import time
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from cores.utils.cache import cache_is_shared
+from leave.models import Holiday, LeaveBalance, LeaveRequest, WorkingCalendar
+
+CALENDAR_TIMEOUT = 60 * 60 * 24
+
+# without a shared cache a version bump only reaches the worker that made
+# it, so the others rebuild their years at least this often
+LOCAL_CALENDAR_TTL = 300
+
+
+def _version_key(company_id):
+    return f"leave:calendar:version:{company_id}"
+
+
+def _year_key(company_id, year, version):
+    return f"leave:calendar:{company_id}:{year}:{version}"
+
+
+def calendar_version(company_id):
+    if not cache_is_shared():
+        return f"{cache.get(_version_key(company_id), 0)}.{int(time.time() // LOCAL_CALENDAR_TTL)}"
+
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        # time based, so a lost version key never brings back an old entry
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_calendar(company_id):
+    """
+    Weekly pattern or holidays changed: every year is rebuilt on next use.
+    """
+    try:
+        cache.incr(_version_key(company_id))
+    except ValueError:
+        cache.set(_version_key(company_id), int(time.time() * 1000), None)
+
+
+def build_year_mask(company_id, year):
+    """
+    Boolean array with one entry per day of `year`, True on working days.
+    """
+    working_weekdays = (
+        WorkingCalendar.objects
+        .filter(company_id=company_id)
+        .values_list("working_weekdays", flat=True)
+        .first()
+    )
+    if working_weekdays is None:
+        working_weekdays = WorkingCalendar.DEFAULT_WORKING_WEEKDAYS
+
+    jan1 = date(year, 1, 1)
+    days = 366 if calendar.isleap(year) else 365
+
+    weekdays = (jan1.weekday() + np.arange(days)) % 7
+    mask = (working_weekdays >> weekdays) & 1 == 1
+
+    holidays = Holiday.objects.filter(company_id=company_id, date__year=year).values_list("date", flat=True)
+    mask[[(day - jan1).days for day in holidays]] = False
+
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def _load_year(company_id, year, version):
+    """
+    (mask, prefix) for one company year. The packed bitset is shared
+    through the cache; each process keeps the unpacked arrays here.
+    prefix[i] is the number of working days before day i.
+    """
+    days = 366 if calendar.isleap(year) else 365
+
+    key = _year_key(company_id, year, version)
+    packed = cache.get(key)
+
+    if packed is None:
+        mask = build_year_mask(company_id, year)
+        cache.set(key, np.packbits(mask).tobytes(), CALENDAR_TIMEOUT)
+    else:
+        mask = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=days).astype(bool)
+
+    prefix = np.zeros(days + 1, dtype=np.int32)
+    np.cumsum(mask, out=prefix[1:])
+
+    mask.flags.writeable = False
+    prefix.flags.writeable = False
+    return mask, prefix
+
+
+def year_calendar(company_id, year):
+    return _load_year(company_id, year, calendar_version(company_id))
+
+
+def working_days(*, company_id, start, end):
+    """
+    Working days in [start, end], both included: one prefix-sum
+    difference per calendar year the range touches.
+    """
+    if start > end:
+        return 0
+
+    total = 0
+    for year in range(start.year, end.year + 1):
+        _, prefix = year_calendar(company_id, year)
+        jan1 = date(year, 1, 1)
+
+        first = (max(start, jan1) - jan1).days
+        last = (min(end, date(year, 12, 31)) - jan1).days
+
+        total += int(prefix[last + 1] - prefix[first])
+
+    return total
+
+
+def recompute_year(*, company_id, year):
+    """
+    Re-derive total_days of every request touching `year` from the
+    current calendar, then resync used_days of the company's balances
+    from their approved requests. Run after holidays or the weekly
+    pattern change. Returns the number of requests whose total changed.
+    """
+    rows = list(
+        LeaveRequest.objects
+        .filter(
+            company_id=company_id,
+            start_date__lte=date(year, 12, 31),
+            end_date__gte=date(year, 1, 1),
+        )
+        .values_list("id", "start_date", "end_date", "total_days")
+    )
+
+    if rows:
+        ids, starts, ends, totals = zip(*rows)
+        first_year = min(starts).year
+
+        # one prefix array over every year the requests span
+        masks = [
+            year_calendar(company_id, y)[0]
+            for y in range(first_year, max(ends).year + 1)
+        ]
+        prefix = np.concatenate(([0], np.cumsum(np.concatenate(masks), dtype=np.int64)))
+
+        origin = date(first_year, 1, 1).toordinal()
+        first = np.fromiter((d.toordinal() for d in starts), dtype=np.int64, count=len(rows)) - origin
+        last = np.fromiter((d.toordinal() for d in ends), dtype=np.int64, count=len(rows)) - origin
+
+        counts = prefix[last + 1] - prefix[first]
+        changed = np.flatnonzero(counts != np.asarray(totals))
+
+        LeaveRequest.objects.bulk_update(
+            [LeaveRequest(id=ids[i], total_days=int(counts[i])) for i in changed],
+            ["total_days"],
+            batch_size=1000,
+        )
+    else:
+        changed = ()
+
+    with transaction.atomic():
+        balances = list(
+            LeaveBalance.objects
+            .select_for_update()
+            .filter(company_id=company_id)
+        )
+
+        used = {
+            (row["user_id"], row["leave_type_id"]): row["used"]
+            for row in (
+                LeaveRequest.objects
+                .filter(company_id=company_id, status="approved", leave_type__requires_balance=True)
+                .values("user_id", "leave_type_id")
+                .annotate(used=Sum("total_days"))
+            )
+        }
+
+        stale = []
+        for balance in balances:
+            used_days = used.get((balance.user_id, balance.leave_type_id), 0)
+            if balance.used_days != used_days:
+                balance.used_days = used_days
+                stale.append(balance)
+
+        LeaveBalance.objects.bulk_update(stale, ["used_days"], batch_size=1000)
+
+    return len(changed)
@@ -1,21 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from cores.models import Company
 from django.dispatch import receiver
-from .models import LeaveBalance,LeaveRequest,LeaveType
+from .models import Holiday, LeaveType, WorkingCalendar
+from .services.balances import provision_balances
+from .services.working_days import invalidate_calendar
 from django.contrib.auth import get_user_model
 
-@receiver(post_save,sender=LeaveRequest)
-def update_leave_balance(sender,instance,created,**kwargs):
-    if instance.status =="approved":
-        balance = LeaveBalance.objects.get(
-            user=instance.user,
-            leave_type=instance.leave_type
-        )
-
-        if balance.used_days + instance.total_days <= balance.earned_days:
-            balance.used_days+=instance.total_days
-            balance.save()
-
 @receiver(post_save,sender=Company)
 def create_default_leave_types(sender,instance,created,**kwargs):
     if not created:
@@ -52,15 +42,11 @@ def create_balances_for_leave_type(sender, instance, created, **kwargs):
     if not created:
         return
 
-    users = User.objects.filter(company=instance.company)
-
-    for user in users:
-        LeaveBalance.objects.get_or_create(
-            user=user,
-            company=instance.company,
-            leave_type=instance,
-            defaults={"earned_days": instance.max_days_per_year}
-        )
+    provision_balances(
+        company=instance.company,
+        users=User.objects.filter(company=instance.company).values_list("id", flat=True),
+        leave_types=[instance],
+    )
 
 
 @receiver(post_save, sender=User)
@@ -68,12 +54,15 @@ def create_balances_for_user(sender, instance, created, **kwargs):
     if not created or not instance.company:
         return
 
-    leave_types = LeaveType.objects.filter(company=instance.company)
+    provision_balances(
+        company=instance.company,
+        users=[instance],
+    )
+
 
-    for lt in leave_types:
-        LeaveBalance.objects.get_or_create(
-            user=instance,
-            company=instance.company,
-            leave_type=lt,
-            defaults={"earned_days": lt.max_days_per_year}
-        )
+@receiver(post_save, sender=WorkingCalendar)
+@receiver(post_delete, sender=WorkingCalendar)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def invalidate_working_calendar(sender, instance, **kwargs):
+    invalidate_calendar(instance.company_id)
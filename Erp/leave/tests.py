@@ -1,3 +1,94 @@
+from datetime import date
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from cores.models import Company
+from leave.models import LeaveBalance, LeaveRequest, LeaveType
+
+
+class LeaveBalanceTransitionTests(TestCase):
+    """
+    used_days follows the approved requests through every status and
+    date change made on a LeaveRequest.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Leave Co")
+        self.user = User.objects.create_user(username="hr", password="x", role="hr", company=self.company)
+        self.admin = User.objects.create_user(username="boss", password="x", role="admin", company=self.company)
+        self.leave_type = LeaveType.objects.get(company=self.company, name="Annual Leave")
+
+    def make_request(self, **kwargs):
+        # Monday to Friday: five working days
+        return LeaveRequest.objects.create(
+            company=self.company,
+            user=self.user,
+            leave_type=self.leave_type,
+            start_date=date(2026, 3, 9),
+            end_date=date(2026, 3, 13),
+            reason="holiday",
+            **kwargs,
+        )
+
+    def used_days(self):
+        return LeaveBalance.objects.get(user=self.user, leave_type=self.leave_type).used_days
+
+    def test_approving_consumes_the_working_days(self):
+        request = self.make_request(status="pending")
+        self.assertEqual(self.used_days(), 0)
+
+        request.status = "approved"
+        request.save()
+
+        self.assertEqual(request.total_days, 5)
+        self.assertEqual(self.used_days(), 5)
+
+    def test_rejecting_an_approved_request_releases_it(self):
+        request = self.make_request(status="approved")
+
+        request.status = "rejected"
+        request.save()
+
+        self.assertEqual(self.used_days(), 0)
+
+    def test_stale_copies_apply_each_transition_once(self):
+        request = self.make_request(status="pending")
+        first = LeaveRequest.objects.get(pk=request.pk)
+        second = LeaveRequest.objects.get(pk=request.pk)
+
+        first.status = "approved"
+        first.save()
+        second.status = "approved"
+        second.save()
+        self.assertEqual(self.used_days(), 5)
+
+        second.status = "rejected"
+        second.save()
+        first.status = "rejected"
+        first.save()
+        self.assertEqual(self.used_days(), 0)
+
+    def test_changing_the_dates_of_an_approved_request_rebalances(self):
+        request = self.make_request(status="approved")
+
+        request = LeaveRequest.objects.get(pk=request.pk)
+        request.end_date = date(2026, 3, 10)
+        request.save()
+
+        self.assertEqual(request.total_days, 2)
+        self.assertEqual(self.used_days(), 2)
+
+    def test_approve_and_reject_endpoints(self):
+        request = self.make_request(status="pending")
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.post(f"/api/leave/leave-requests/{request.pk}/approve/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.used_days(), 5)
 
-# Create your tests here.
+        response = client.post(f"/api/leave/leave-requests/{request.pk}/reject/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.used_days(), 0)
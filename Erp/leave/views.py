@@ -1,10 +1,19 @@
 from rest_framework import viewsets,permissions,status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_date
 from django.utils.timezone import now
 
 from .models import LeaveRequest,LeaveBalance,LeaveType
 from .serializers import LeaveBalanceSerializer,LeaveRequestSerializer,LeaveTypeSerializer
+from .services.approvals import MAX_BULK_DECISIONS, decide_leave_requests
+from .services.calendar import (BLOCKING_STATUSES,
+                                PLANNED_STATUSES,
+                                MAX_WINDOW_DAYS,
+                                team_calendar)
 from accounts.permissions import (BaseModulePermission,
                                   IsownerOrAdmin,
                                   ApprovalWorkflowPermission)
@@ -49,7 +58,11 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         leave.status="approved"
         leave.decision_by= request.user
         leave.decision_at =now()
-        leave.save()
+
+        try:
+            leave.save()
+        except ValidationError as exc:
+            return Response({"detail": exc.messages}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({"status":"approved"})
     
@@ -72,6 +85,87 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
 
         return Response({"status":"rejected"})
     
+    @action(detail=False,
+            methods=["post"],
+            url_path="bulk-decision",
+            permission_classes=[BaseModulePermission],
+            )
+    def bulk_decision(self,request):
+        """
+        {"ids": [...], "decision": "approve" | "reject", "comment": ""}
+        """
+        if request.user.role not in ["admin","hr"] and not request.user.is_superuser:
+            return Response(
+                {"detail":"Only HR or Admin can approve or reject leave"},
+                status=403,
+            )
+
+        decision={"approve":"approved","reject":"rejected"}.get(request.data.get("decision"))
+        if decision is None:
+            return Response({"detail":"decision must be 'approve' or 'reject'"},status=400)
+
+        ids=request.data.get("ids")
+        if not isinstance(ids,list) or not ids or not all(isinstance(i,int) for i in ids):
+            return Response({"detail":"ids must be a non-empty list of ids"},status=400)
+        if len(ids)>MAX_BULK_DECISIONS:
+            return Response(
+                {"detail":f"At most {MAX_BULK_DECISIONS} requests per call"},
+                status=400,
+            )
+
+        results=decide_leave_requests(
+            company_id=request.user.company_id,
+            ids=ids,
+            decision=decision,
+            decided_by=request.user,
+            comment=request.data.get("comment",""),
+        )
+
+        return Response({
+            "decided":sorted(pk for pk,result in results.items() if result==decision),
+            "failed":{pk:result for pk,result in results.items() if result!=decision},
+        })
+
+    @action(detail=False,
+            methods=["get"],
+            permission_classes=[BaseModulePermission],
+            )
+    def calendar(self,request):
+        """
+        Per-day headcount on leave for the user's company.
+        ?start_date=&end_date= (default: the next 30 days),
+        ?branch=<id>, ?include_pending=true
+        """
+        user=request.user
+        if not user.company_id:
+            return Response({"detail":"User has no company"},status=400)
+
+        today=now().date()
+        start=parse_date(request.GET.get("start_date") or "") or today
+        end=parse_date(request.GET.get("end_date") or "") or start+timedelta(days=29)
+
+        if start>end:
+            return Response({"detail":"end_date cannot be before start_date"},status=400)
+        if (end-start).days>=MAX_WINDOW_DAYS:
+            return Response(
+                {"detail":f"Window is limited to {MAX_WINDOW_DAYS} days"},
+                status=400,
+            )
+
+        branch=request.GET.get("branch")
+        if branch is not None and not branch.isdigit():
+            return Response({"detail":"branch must be an id"},status=400)
+
+        include_pending=request.GET.get("include_pending","").lower()=="true"
+
+        return Response(team_calendar(
+            company_id=user.company_id,
+            start=start,
+            end=end,
+            statuses=PLANNED_STATUSES if include_pending else BLOCKING_STATUSES,
+            branch_id=int(branch) if branch else None,
+        ))
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=False)
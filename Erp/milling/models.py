@@ -1,8 +1,10 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.core.exceptions import ValidationError
 from cores.models import Company,Branch
 from cores.querysets import CompanyQuerySet
+from cores.utils.periods import is_period_locked
 
 
 User=get_user_model()
@@ -46,6 +48,10 @@ class MillingBatch(models.Model):
     total_output_kg =models.FloatField(default=0,editable=False)
     objects= CompanyQuerySet.as_manager()
 
+    def clean(self):
+        if self.pk and is_period_locked(company=self.company, date=self.date):
+            raise ValidationError("This accounting period is locked.")
+
     def save(self, *args, **kwargs):
         """
         Auto-calculate total output and efficiency.
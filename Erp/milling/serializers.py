@@ -1,8 +1,8 @@
 from rest_framework import serializers
-from core.serializers import RoleAwareSerializer
+from core.serializers import PeriodLockMixin, RoleAwareSerializer
 from .models import MillingBatch
 
-class MillingBatchSerializer(RoleAwareSerializer):
+class MillingBatchSerializer(PeriodLockMixin, RoleAwareSerializer):
     class Meta:
         model = MillingBatch
         fields= "__all__"
@@ -26,6 +26,7 @@ from .serializers import (
 
 from accounts.permissions import ModulePermission, AdminDeleteOnly
 from core.audit import log_action
+from core.async_views import AsyncAPIView, run_queries
 
 
 # =====================================================
@@ -520,152 +521,153 @@ class MillingShiftRankingView(APIView):
 # MILLING DASHBOARD (COMBINED API)
 # =====================================================
 
-class MillingDashboardView(APIView):
-    """
-    Combined dashboard API for all charts & KPIs
-    """
-    permission_classes = [ModulePermission]
-    module_name = "milling"
+def dashboard_summary(qs):
+    totals = qs.aggregate(
+        total_maize=Sum("maize_milled_kg"),
+        total_output=Sum("total_output_kg"),
+        total_waste=Sum("waste_kg"),
 
-    def get(self, request):
-        today = datetime.today().date()
+        
+    )
 
+    total_maize = totals["total_maize"] or 0
+    total_output = totals.get("total_output") or 0
+    total_waste = totals["total_waste"] or 0
 
-        start_param = request.GET.get("start_date")
-        end_param = request.GET.get("end_date")
+    waste_ratio = (
+        (total_waste / total_maize) * 100 if total_maize else 0
+    )
 
-        start_date = parse_date(start_param) if isinstance(start_param, str) else None
-        end_date = parse_date(end_param) if isinstance(end_param, str) else None
+    efficiency = round((total_output / total_maize) * 100, 2) if total_maize else 0
 
-        # Default range → last 30 days
-        if not start_date:
-            start_date = date.today() - timedelta(days=30)
+    return {
+        "total_maize": total_maize,
+        "total_output": totals["total_output"] or 0,
+        "efficiency": efficiency,
+        "total_waste": total_waste,
+        "waste_ratio": round(waste_ratio, 2),
+    
+    }
 
-        if not end_date:
-            end_date = date.today()
 
+def dashboard_daily_efficiency(qs):
+    daily_efficiency = qs.annotate(
+        day=TruncDay("date")
+    ).values("day").annotate(
+        avg_efficiency=Avg(EFFICIENCY_EXPR)
+    ).order_by("day")
 
-        qs = MillingBatch.objects.filter(date__range=[start_date, end_date])
-
-        # =====================================================
-        # SUMMARY KPI
-        # =====================================================
-        totals = qs.aggregate(
-            total_maize=Sum("maize_milled_kg"),
-            total_output=Sum("total_output_kg"),
-            total_waste=Sum("waste_kg"),
+    return [
+        {
+            "date": d["day"].strftime("%Y-%m-%d"),
+            "efficiency": round(d["avg_efficiency"] or 0, 2)
+        }
+        for d in daily_efficiency
+    ]
+
+
+def dashboard_monthly_trends(qs):
+    monthly = qs.annotate(
+        month=TruncMonth("date")
+    ).values("month").annotate(
+        total_maize=Sum("maize_milled_kg"),
+        avg_efficiency=Avg(EFFICIENCY_EXPR),
+    ).order_by("month")
+
+    return [
+        {
+            "month": m["month"].strftime("%Y-%m"),
+            "total_maize": m["total_maize"] or 0,
+            "avg_efficiency": round(m["avg_efficiency"] or 0, 2),
+        }
+        for m in monthly
+    ]
+
+
+def dashboard_waste_chart(qs):
+    waste_chart = qs.annotate(
+        day=TruncDay("date")
+    ).values("day").annotate(
+        total_waste=Sum("waste_kg"),
+        total_maize=Sum("maize_milled_kg"),
+    ).order_by("day")
+
+    return [
+        {
+            "date": w["day"].strftime("%Y-%m-%d"),
+            "waste_ratio": round(
+                ((w["total_waste"] or 0) / (w["total_maize"] or 1)) * 100,
+                2
+            ),
+        }
+        for w in waste_chart
+    ]
 
-            
-        )
 
-        total_maize = totals["total_maize"] or 0
-        total_output = totals.get("total_output") or 0
-        total_waste = totals["total_waste"] or 0
+def dashboard_shift_ranking(qs):
+    shift_stats = list(qs.values("shift").annotate(
+        avg_efficiency=Avg(EFFICIENCY_EXPR),
+        total_maize=Sum("maize_milled_kg"),
+        total_waste=Sum("waste_kg"),
+    ))
 
-        waste_ratio = (
-            (total_waste / total_maize) * 100 if total_maize else 0
+    if shift_stats:
+        best_shift = max(
+            shift_stats, key=lambda x: x["avg_efficiency"] or 0
         )
+        worst_shift = min(
+            shift_stats, key=lambda x: x["avg_efficiency"] or 0
+        )
+    else:
+        best_shift = None
+        worst_shift = None
 
-        efficiency = round((total_output / total_maize) * 100, 2) if total_maize else 0
-
-        summary = {
-            "total_maize": total_maize,
-            "total_output": totals["total_output"] or 0,
-            "efficiency": efficiency,
-            "total_waste": total_waste,
-            "waste_ratio": round(waste_ratio, 2),
-        
-        }
+    return {
+        "best_shift": best_shift,
+        "worst_shift": worst_shift,
+    }
 
-        # =====================================================
-        # DAILY EFFICIENCY CHART
-        # =====================================================
-        daily_efficiency = qs.annotate(
-            day=TruncDay("date")
-        ).values("day").annotate(
-            avg_efficiency=Avg(EFFICIENCY_EXPR)
-        ).order_by("day")
 
-        daily_efficiency_data = [
-            {
-                "date": d["day"].strftime("%Y-%m-%d"),
-                "efficiency": round(d["avg_efficiency"] or 0, 2)
-            }
-            for d in daily_efficiency
-        ]
+class MillingDashboardView(AsyncAPIView):
+    """
+    Combined dashboard API for all charts & KPIs.
+    The five section queries run off the event loop in one thread hop.
+    """
+    permission_classes = [ModulePermission]
+    module_name = "milling"
 
-        # =====================================================
-        # MONTHLY TRENDS
-        # =====================================================
-        monthly = qs.annotate(
-            month=TruncMonth("date")
-        ).values("month").annotate(
-            total_maize=Sum("maize_milled_kg"),
-            avg_efficiency=Avg(EFFICIENCY_EXPR),
-        ).order_by("month")
+    async def get(self, request):
+        start_param = request.GET.get("start_date")
+        end_param = request.GET.get("end_date")
 
-        monthly_data = [
-            {
-                "month": m["month"].strftime("%Y-%m"),
-                "total_maize": m["total_maize"] or 0,
-                "avg_efficiency": round(m["avg_efficiency"] or 0, 2),
-            }
-            for m in monthly
-        ]
+        start_date = parse_date(start_param) if isinstance(start_param, str) else None
+        end_date = parse_date(end_param) if isinstance(end_param, str) else None
 
-        # =====================================================
-        # WASTE RATIO CHART
-        # =====================================================
-        waste_chart = qs.annotate(
-            day=TruncDay("date")
-        ).values("day").annotate(
-            total_waste=Sum("waste_kg"),
-            total_maize=Sum("maize_milled_kg"),
-        ).order_by("day")
+        # Default range → last 30 days
+        if not start_date:
+            start_date = date.today() - timedelta(days=30)
 
-        waste_chart_data = [
-            {
-                "date": w["day"].strftime("%Y-%m-%d"),
-                "waste_ratio": round(
-                    ((w["total_waste"] or 0) / (w["total_maize"] or 1)) * 100,
-                    2
-                ),
-            }
-            for w in waste_chart
-        ]
+        if not end_date:
+            end_date = date.today()
 
-        # =====================================================
-        # SHIFT RANKING
-        # =====================================================
-        shift_stats = qs.values("shift").annotate(
-            avg_efficiency=Avg(EFFICIENCY_EXPR),
-            total_maize=Sum("maize_milled_kg"),
-            total_waste=Sum("waste_kg"),
-        )
 
-        if shift_stats:
-            best_shift = max(
-                shift_stats, key=lambda x: x["avg_efficiency"] or 0
-            )
-            worst_shift = min(
-                shift_stats, key=lambda x: x["avg_efficiency"] or 0
-            )
-        else:
-            best_shift = None
-            worst_shift = None
+        qs = MillingBatch.objects.filter(date__range=[start_date, end_date])
 
-        shift_ranking = {
-            "best_shift": best_shift,
-            "worst_shift": worst_shift,
-        }
+        summary, daily_efficiency, monthly, waste_chart, shift_ranking = await run_queries(
+            (dashboard_summary, qs),
+            (dashboard_daily_efficiency, qs),
+            (dashboard_monthly_trends, qs),
+            (dashboard_waste_chart, qs),
+            (dashboard_shift_ranking, qs),
+        )
 
         # =====================================================
         # FINAL RESPONSE
         # =====================================================
         return Response({
             "summary": summary,
-            "daily_efficiency": daily_efficiency_data,
-            "monthly_trends": monthly_data,
-            "waste_ratio_chart": waste_chart_data,
+            "daily_efficiency": daily_efficiency,
+            "monthly_trends": monthly,
+            "waste_ratio_chart": waste_chart,
             "shift_ranking": shift_ranking,
         })
@@ -0,0 +1,39 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .services import get_unread_count, user_group
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    One socket per open tab. New notifications and unread count
+    changes are pushed to the user's group by notifications.services.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        count = await database_sync_to_async(get_unread_count)(user.id)
+        await self.send_json({"type": "unread_count", "count": count})
+
+    async def disconnect(self, code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notification_created(self, event):
+        await self.send_json({
+            "type": "notification",
+            "notification": event["notification"],
+            "unread_count": event["unread_count"],
+        })
+
+    async def unread_count(self, event):
+        await self.send_json({"type": "unread_count", "count": event["count"]})
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from notifications.services import reconcile_unread_counters
+
+
+class Command(BaseCommand):
+    help = "Reset stored unread counters to the real number of unread notifications; scheduled daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, default=None, help="Only this user id")
+
+    def handle(self, *args, **options):
+        user_ids = [options["user"]] if options["user"] else None
+
+        repaired = reconcile_unread_counters(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"{repaired} unread counter(s) repaired"))
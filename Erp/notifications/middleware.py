@@ -0,0 +1,41 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import get_principal
+
+
+@database_sync_to_async
+def get_user(token):
+    try:
+        return get_principal(token)
+    except (AuthenticationFailed, InvalidToken):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates websocket connections with the same access token
+    as the REST API, passed as ?token=<access>.
+    Browsers cannot set headers on a websocket handshake.
+    """
+
+    async def __call__(self, scope, receive, send):
+        scope["user"] = AnonymousUser()
+
+        query = parse_qs(scope.get("query_string", b"").decode())
+        token = query.get("token", [None])[0]
+
+        if token:
+            try:
+                access = AccessToken(token)
+            except TokenError:
+                pass
+            else:
+                scope["user"] = await get_user(access)
+
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='notification',
+            old_name='Company',
+            new_name='company',
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='dedupe_key',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['dedupe_key', 'created_at'], name='notificatio_dedupe__206985_idx'),
+        ),
+    ]
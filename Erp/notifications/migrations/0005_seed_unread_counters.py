@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    # counters are created at zero on first use, so users who already
+    # have unread notifications get theirs counted here
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadCounter = apps.get_model("notifications", "UnreadCounter")
+
+    counts = (
+        Notification.objects
+        .filter(is_read=False)
+        .values("user_id")
+        .annotate(count=Count("id"))
+        .values_list("user_id", "count")
+    )
+
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, count=count) for user_id, count in counts],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_unreadcounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -18,7 +18,7 @@ class Notification(models.Model):
 
     )
 
-    Company=models.ForeignKey(
+    company=models.ForeignKey(
         Company,on_delete=models.CASCADE,
     )
 
@@ -35,8 +35,75 @@ class Notification(models.Model):
 
     module= models.CharField(max_length=50,blank=True)
     object_id=models.PositiveIntegerField(null=True,blank=True)
+
+    # hash of (module, object_id, title), used to drop repeat sends
+    dedupe_key=models.CharField(max_length=40,blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["dedupe_key", "created_at"]),
+            # inbox: a user's (unread) notifications, newest first
+            models.Index(fields=["user", "is_read", "-created_at"]),
+            models.Index(fields=["user", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.title}"
+
+
+class UnreadCounter(models.Model):
+    """
+    A user's unread notification count, kept in step with F() updates
+    by the notification services and repaired by the
+    reconcile_unread_counters command.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_counter"
+    )
+
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} - {self.count}"
+
+
+class ArchivedNotification(models.Model):
+    """
+    Cold storage for read notifications moved out of the inbox table
+    by the archival task. Never shown in the inbox.
+    """
+
+    original_id = models.BigIntegerField(unique=True)
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications"
+    )
+
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE,
+    )
+
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=20)
+    module = models.CharField(max_length=50, blank=True)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.title}"
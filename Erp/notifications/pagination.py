@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InboxPagination(CursorPagination):
+    """
+    Keyset pagination on created_at, served by the
+    (user, is_read, -created_at) index; cost does not grow with
+    how deep the user scrolls. id breaks ties between notifications
+    created together (a bulk send), which a cursor on created_at
+    alone would skip or repeat.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
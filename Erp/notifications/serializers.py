@@ -4,9 +4,14 @@ from .models import Notification
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model=Notification
-        fields="__all__"
+        fields=[
+            "id",
+            "title",
+            "message",
+            "notification_type",
+            "module",
+            "object_id",
+            "is_read",
+            "created_at",
+        ]
         read_only_fields=fields
-
-    
-
-    
\ No newline at end of file
@@ -1,6 +1,310 @@
-from .models import Notification
+import hashlib
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils.timezone import now
+
+from core.context import get_current_company_id
+from .models import Notification, ArchivedNotification, UnreadCounter
 from accounts.models import User
 
+# Same (module, object_id, title) is not sent twice to a user within this
+# window; without an object_id the message must match as well
+DEDUPE_WINDOW = timedelta(minutes=10)
+
+# Read notifications older than this are moved to ArchivedNotification
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def user_group(user_id):
+    return f"notifications_user_{user_id}"
+
+
+def _count_unread(user_ids):
+    """
+    {user_id: unread notifications} straight from the table.
+    """
+    counts = dict(
+        Notification.objects
+        .filter(user_id__in=user_ids, is_read=False)
+        .values("user_id")
+        .annotate(count=Count("id"))
+        .values_list("user_id", "count")
+    )
+    return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+
+def get_unread_counts(user_ids):
+    """
+    {user_id: unread count} from the stored counters in one query.
+    Users without a counter yet are counted, without seeding one:
+    counters are only created where they are adjusted.
+    """
+    user_ids = set(user_ids)
+    counts = dict(
+        UnreadCounter.objects
+        .filter(user_id__in=user_ids)
+        .values_list("user_id", "count")
+    )
+
+    missing = user_ids - counts.keys()
+    if missing:
+        counts.update(_count_unread(missing))
+
+    return counts
+
+
+def get_unread_count(user_id):
+    return get_unread_counts([user_id])[user_id]
+
+
+def adjust_unread_count(user_ids, delta):
+    """
+    Shift the counters of `user_ids` by `delta`, in the transaction of
+    the change. Missing counters are created at zero first (a concurrent
+    insert of the same row is ignored, not raced), so every change is
+    applied by the one UPDATE. Existing backlogs were counted by the
+    seeding migration; reconcile_unread_counters repairs any drift.
+    """
+    if not delta:
+        return
+
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, count=0) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    UnreadCounter.objects.filter(user_id__in=user_ids).update(count=F("count") + delta)
+
+
+def reconcile_unread_counters(user_ids=None, *, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Reset stored counters to the real number of unread notifications,
+    creating the missing ones. All users with a counter or a
+    notification when `user_ids` is None. Returns the number repaired.
+    """
+    if user_ids is None:
+        user_ids = (
+            set(UnreadCounter.objects.values_list("user_id", flat=True))
+            | set(Notification.objects.filter(is_read=False).values_list("user_id", flat=True).distinct())
+        )
+
+    user_ids = sorted(user_ids)
+    repaired = 0
+
+    for i in range(0, len(user_ids), batch_size):
+        chunk = user_ids[i:i + batch_size]
+
+        with transaction.atomic():
+            stored = dict(
+                UnreadCounter.objects
+                .select_for_update()
+                .filter(user_id__in=chunk)
+                .values_list("user_id", "count")
+            )
+            actual = _count_unread(chunk)
+
+            stale = [
+                UnreadCounter(user_id=user_id, count=count)
+                for user_id, count in actual.items()
+                if user_id in stored and stored[user_id] != count
+            ]
+            UnreadCounter.objects.bulk_update(stale, ["count"])
+
+            UnreadCounter.objects.bulk_create(
+                [UnreadCounter(user_id=user_id, count=actual[user_id]) for user_id in chunk if user_id not in stored],
+                ignore_conflicts=True,
+            )
+
+        repaired += len(stale) + len(set(chunk) - stored.keys())
+
+    return repaired
+
+
+def push_to_user(user_id, event):
+    push_to_users([(user_id, event)])
+
+
+def push_to_users(events):
+    """
+    Send (user_id, event) pairs to each user's group, all in one hop
+    onto the event loop.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not events:
+        return
+
+    async def send_all():
+        for user_id, event in events:
+            await channel_layer.group_send(user_group(user_id), event)
+
+    async_to_sync(send_all)()
+
+
+def push_unread_count(user_id):
+    push_to_user(user_id, {
+        "type": "unread.count",
+        "count": get_unread_count(user_id),
+    })
+
+
+def _count_created(notifications):
+    """
+    One UPDATE per distinct number of notifications a user received
+    (usually one: everyone got one).
+    """
+    users_by_created = {}
+    for user_id, created in Counter(n.user_id for n in notifications).items():
+        users_by_created.setdefault(created, []).append(user_id)
+
+    for created, user_ids in users_by_created.items():
+        adjust_unread_count(user_ids, created)
+
+
+def _after_create(notifications):
+    from .serializers import NotificationSerializer
+
+    counts = get_unread_counts({n.user_id for n in notifications})
+
+    push_to_users([
+        (notification.user_id, {
+            "type": "notification.created",
+            "notification": NotificationSerializer(notification).data,
+            "unread_count": counts[notification.user_id],
+        })
+        for notification in notifications
+    ])
+
+
+def mark_read(user_id, ids=None, up_to_id=None):
+    """
+    Mark unread notifications as read with one UPDATE and keep
+    the stored counter in step. `ids` limits it to those rows,
+    `up_to_id` to everything up to and including that id.
+    Returns the number of rows changed.
+    """
+    qs = Notification.objects.filter(user_id=user_id, is_read=False)
+    if ids is not None:
+        qs = qs.filter(id__in=ids)
+    if up_to_id is not None:
+        qs = qs.filter(id__lte=up_to_id)
+
+    with transaction.atomic():
+        updated = qs.update(is_read=True)
+        adjust_unread_count([user_id], -updated)
+
+    if updated:
+        transaction.on_commit(lambda: push_unread_count(user_id))
+
+    return updated
+
+
+def make_dedupe_key(module, object_id, title, message=""):
+    """
+    Without an object_id the title alone does not say what the
+    notification is about (e.g. "Period closed automatically" for
+    different months), so the message is part of the key.
+    """
+    if object_id is None:
+        raw = f"{module}::{title}:{message}"
+    else:
+        raw = f"{module}:{object_id}:{title}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def send_notifications(notifications, *, dedupe_window=DEDUPE_WINDOW):
+    """
+    Write prebuilt Notification rows with a single bulk_create.
+
+    Rows whose (user, dedupe_key) was already sent inside `dedupe_window`,
+    or that repeat within the batch, are dropped. Pass dedupe_window=None
+    to send everything.
+    """
+    notifications = list(notifications)
+
+    for notification in notifications:
+        if not notification.dedupe_key:
+            notification.dedupe_key = make_dedupe_key(
+                notification.module,
+                notification.object_id,
+                notification.title,
+                notification.message,
+            )
+
+    seen = set()
+    if dedupe_window and notifications:
+        seen = set(
+            Notification.objects.filter(
+                user_id__in={n.user_id for n in notifications},
+                dedupe_key__in={n.dedupe_key for n in notifications},
+                created_at__gte=now() - dedupe_window,
+            ).values_list("user_id", "dedupe_key")
+        )
+
+    fresh = []
+    for notification in notifications:
+        key = (notification.user_id, notification.dedupe_key)
+        if key in seen:
+            continue
+        seen.add(key)
+        fresh.append(notification)
+
+    if not fresh:
+        return []
+
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(fresh, batch_size=500)
+        _count_created(created)
+
+    # websocket pushes only once the rows are committed
+    transaction.on_commit(lambda: _after_create(created))
+
+    return created
+
+
+def notify_users(
+        users,
+        *,
+        company=None,
+        title,
+        message,
+        notification_type="info",
+        module="",
+        object_id=None,
+        dedupe_window=DEDUPE_WINDOW,
+):
+    """
+    Fan one notification out to many users in one INSERT.
+    Without `company`, each row uses the recipient's own company,
+    or failing that the company of the request being served.
+    """
+    company_id = company.pk if company is not None else None
+    current_company_id = get_current_company_id()
+    dedupe_key = make_dedupe_key(module, object_id, title, message)
+
+    return send_notifications(
+        (
+            Notification(
+                user_id=user.pk,
+                company_id=company_id or user.company_id or current_company_id,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                module=module,
+                object_id=object_id,
+                dedupe_key=dedupe_key,
+            )
+            for user in users
+            if user is not None
+        ),
+        dedupe_window=dedupe_window,
+    )
+
+
 def notify_user(
   *,
   user,
@@ -11,8 +315,8 @@ def notify_user(
   module="",
   object_id=None,
 ):
-    Notification.objects.Create(
-        user=user,
+    notify_users(
+        [user],
         company=company,
         title=title,
         message=message,
@@ -25,25 +329,75 @@ def notify_user(
 def notify_role(
         *,
         role,
-        company,
+        company=None,
         title,
         message,
         module="",
         object_id=None
 ):
+    """
+    Without `company`, notifies the role in the current request's company.
+    """
+    company_id = company.pk if company is not None else get_current_company_id()
+    if company_id is None:
+        return
+
     users= User.objects.filter(
         role=role,
-        company=company,
+        company_id=company_id,
         is_active=True
+    ).only("id", "company_id")
+
+    notify_users(
+        users,
+        company=company,
+        title=title,
+        message=message,
+        module=module,
+        object_id=object_id,
     )
 
-    for user in users:
-        notify_user(
 
-            user=user,
-            company=company,
-            title=title,
-            message=message,
-            module=module,
-            object_id=object_id,
-        )
\ No newline at end of file
+def archive_read_notifications(*, older_than_days=ARCHIVE_AFTER_DAYS,
+                               batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move read notifications older than `older_than_days` into
+    ArchivedNotification, one batch per transaction so the inbox
+    table is never locked for long. Returns the number moved.
+    """
+    cutoff = now() - timedelta(days=older_than_days)
+    moved = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Notification.objects
+                .select_for_update(skip_locked=True)
+                .filter(is_read=True, created_at__lt=cutoff)
+                .order_by("id")[:batch_size]
+            )
+
+            if not batch:
+                return moved
+
+            ArchivedNotification.objects.bulk_create(
+                [
+                    ArchivedNotification(
+                        original_id=n.id,
+                        user_id=n.user_id,
+                        company_id=n.company_id,
+                        title=n.title,
+                        message=n.message,
+                        notification_type=n.notification_type,
+                        module=n.module,
+                        object_id=n.object_id,
+                        created_at=n.created_at,
+                    )
+                    for n in batch
+                ],
+                ignore_conflicts=True,
+            )
+
+            Notification.objects.filter(id__in=[n.id for n in batch]).delete()
+
+        moved += len(batch)
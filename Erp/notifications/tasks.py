@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .services import ARCHIVE_AFTER_DAYS, archive_read_notifications
+
+
+@shared_task
+def archive_notifications(older_than_days=ARCHIVE_AFTER_DAYS):
+    return archive_read_notifications(older_than_days=older_than_days)
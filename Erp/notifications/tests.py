@@ -1,3 +1,58 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from cores.models import Company
+from notifications.models import UnreadCounter
+from notifications.services import (
+    get_unread_count,
+    mark_read,
+    notify_users,
+    reconcile_unread_counters,
+)
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Notify Co")
+        self.user = User.objects.create_user(username="sales", password="x", role="sales", company=self.company)
+
+    def test_counter_follows_sends_and_reads(self):
+        notify_users([self.user], company=self.company, title="one", message="m")
+        notify_users([self.user], company=self.company, title="two", message="m")
+        self.assertEqual(get_unread_count(self.user.pk), 2)
+
+        self.assertEqual(mark_read(self.user.pk), 2)
+        self.assertEqual(get_unread_count(self.user.pk), 0)
+
+    def test_reconcile_repairs_a_drifted_counter(self):
+        notify_users([self.user], company=self.company, title="one", message="m")
+        UnreadCounter.objects.filter(user=self.user).update(count=42)
+
+        self.assertEqual(reconcile_unread_counters(), 1)
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+
+class DedupeTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Dedupe Co")
+        self.user = User.objects.create_user(username="admin", password="x", role="admin", company=self.company)
+
+    def send(self, message, object_id=None):
+        return notify_users(
+            [self.user],
+            company=self.company,
+            title="Period closed automatically",
+            message=message,
+            object_id=object_id,
+        )
+
+    def test_without_object_id_the_message_tells_notifications_apart(self):
+        self.assertEqual(len(self.send("2026-1 was locked")), 1)
+        self.assertEqual(len(self.send("2026-2 was locked")), 1)
+        self.assertEqual(len(self.send("2026-2 was locked")), 0)
+
+    def test_with_object_id_the_title_is_enough(self):
+        self.assertEqual(len(self.send("first", object_id=7)), 1)
+        self.assertEqual(len(self.send("second", object_id=7)), 0)
@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import NotificationViewset
+
+router = DefaultRouter()
+router.register("", NotificationViewset, basename="notifications")
+
+urlpatterns = router.urls
@@ -1,26 +1,62 @@
 from rest_framework import permissions
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from .serializers import NotificationSerializer
 from .models import Notification
+from .pagination import InboxPagination
+from .services import get_unread_count, mark_read as mark_notifications_read
 
 class NotificationViewset(ReadOnlyModelViewSet):
     serializer_class=NotificationSerializer
-    permission_classes=permissions.IsAuthenticated
+    permission_classes=[permissions.IsAuthenticated]
+    pagination_class=InboxPagination
 
     def get_queryset(self):
         user=self.request.user
-        return Notification.objects.filter(
+        queryset = Notification.objects.filter(
             user=user,
             company=user.company
         )
+
+        if self.request.query_params.get("unread") in ("1", "true"):
+            queryset = queryset.filter(is_read=False)
+
+        return queryset
     
     @action(detail=True, methods=["post"])
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
-        return Response({"status": "read"})
+        mark_notifications_read(request.user.id, ids=[notification.id])
+        return Response({
+            "status": "read",
+            "unread_count": get_unread_count(request.user.id),
+        })
+
+    @action(detail=False, methods=["post"])
+    def mark_read_up_to(self, request):
+        """
+        Marks every notification up to and including `id` as read
+        in one UPDATE (what the user has scrolled past).
+        """
+        try:
+            up_to_id = int(request.data.get("id"))
+        except (TypeError, ValueError):
+            raise ValidationError({"id": "A notification id is required."})
+
+        updated = mark_notifications_read(request.user.id, up_to_id=up_to_id)
+        return Response({
+            "updated": updated,
+            "unread_count": get_unread_count(request.user.id),
+        })
+
+    @action(detail=False, methods=["post"])
+    def mark_all_read(self, request):
+        updated = mark_notifications_read(request.user.id)
+        return Response({"updated": updated, "unread_count": 0})
 
+    @action(detail=False, methods=["get"])
+    def unread_count(self, request):
+        return Response({"count": get_unread_count(request.user.id)})
@@ -2,8 +2,10 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.core.exceptions import ValidationError
 from cores.models import Company, Branch
 from cores.querysets import CompanyQuerySet
+from cores.utils.periods import is_period_locked
 
 User = get_user_model()
 
@@ -30,6 +32,10 @@ class RawMaterial(models.Model):
     supervisor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     objects=CompanyQuerySet.as_manager()
 
+    def clean(self):
+        if self.pk and is_period_locked(company=self.company, date=self.date):
+            raise ValidationError("This accounting period is locked.")
+
     def save(self, *args, **kwargs):
         self.total_raw_material = (
             self.maize_kg + self.soya_kg + self.sugar_kg +
@@ -1,12 +1,12 @@
 from rest_framework import serializers
-from core.serializers import RoleAwareSerializer
+from core.serializers import PeriodLockMixin, RoleAwareSerializer
 from .models import RawMaterial, FlourOutput
 
 
 # =====================================================
 # RAW MATERIAL
 # =====================================================
-class RawMaterialSerializer(RoleAwareSerializer):
+class RawMaterialSerializer(PeriodLockMixin, RoleAwareSerializer):
     """
     Raw materials used in production.
     Sensitive cost & supplier data protected by role.
@@ -1,11 +1,10 @@
+import hashlib
 from datetime import datetime, timedelta,date
 
 
 from django.db.models import Sum, Count
 from django.db.models.functions import TruncWeek, TruncMonth, TruncYear
 from django.utils.dateparse import parse_date
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
@@ -25,6 +24,7 @@ from .serializers import (
 )
 
 from accounts.permissions import ModulePermission, AdminDeleteOnly
+from core.async_views import AsyncAPIView, run_cached_queries
 
 
 # =====================================================
@@ -220,15 +220,78 @@ class SalesRegionsView(APIView):
 # DASHBOARD ANALYTICS (CACHED)
 # =====================================================
 
-@method_decorator(cache_page(60 * 15), name="dispatch")
-class AnalyticsView(APIView):
+def analytics_periods(sales, filter_type):
+    if filter_type == "weekly":
+        grouped = sales.annotate(period=TruncWeek("date"))
+        fmt = "%Y-%W"
+    elif filter_type == "yearly":
+        grouped = sales.annotate(period=TruncYear("date"))
+        fmt = "%Y"
+    else:
+        grouped = sales.annotate(period=TruncMonth("date"))
+        fmt = "%Y-%m"
+
+    grouped = (
+        grouped.values("period")
+        .annotate(
+            total_sales=Count("id"),
+            total_revenue=Sum("total_amount"),
+        )
+        .order_by("period")
+    )
+
+    return [
+        {
+            "period": g["period"].strftime(fmt),
+            "total_sales": g["total_sales"],
+            "total_revenue": g["total_revenue"] or 0,
+        }
+        for g in grouped
+    ]
+
+
+def analytics_summary(sales):
+    totals = sales.aggregate(
+        total_sales=Count("id"),
+        total_revenue=Sum("total_amount"),
+    )
+
+    total_sales = totals["total_sales"]
+    total_revenue = totals["total_revenue"] or 0
+
+    return {
+        "total_sales": total_sales,
+        "total_revenue": total_revenue,
+        "avg_sale": round(
+            total_revenue / total_sales, 2
+        ) if total_sales else 0,
+    }
+
+
+def analytics_top_products(sales):
+    return list(
+        sales.values("product__name")
+        .annotate(
+            quantity_sold=Sum("quantity"),
+            revenue=Sum("total_amount"),
+        )
+        .order_by("-revenue")[:5]
+    )
+
+
+ANALYTICS_TIMEOUT = 60 * 15
+
+
+class AnalyticsView(AsyncAPIView):
     """
-    Sales dashboard analytics
+    Sales dashboard analytics, cached per query string.
+    Summary, per-period series and top products are read off the
+    event loop in one thread hop.
     """
     permission_classes = [ModulePermission]
     module_name = "sales"
 
-    def get(self, request):
+    async def get(self, request):
         region = request.GET.get("region")
         sales_rep = request.GET.get("sales_rep")
         filter_type = request.GET.get("filter_type", "monthly")
@@ -252,54 +315,18 @@ class AnalyticsView(APIView):
         if sales_rep:
             sales = sales.filter(salesperson__id=sales_rep)
 
-        if filter_type == "weekly":
-            grouped = sales.annotate(period=TruncWeek("date"))
-            fmt = "%Y-%W"
-        elif filter_type == "yearly":
-            grouped = sales.annotate(period=TruncYear("date"))
-            fmt = "%Y"
-        else:
-            grouped = sales.annotate(period=TruncMonth("date"))
-            fmt = "%Y-%m"
-
-        grouped = (
-            grouped.values("period")
-            .annotate(
-                total_sales=Count("id"),
-                total_revenue=Sum("total_amount"),
-            )
-            .order_by("period")
-        )
-
-        analytics = [
-            {
-                "period": g["period"].strftime(fmt),
-                "total_sales": g["total_sales"],
-                "total_revenue": g["total_revenue"] or 0,
-            }
-            for g in grouped
-        ]
+        key = "sales:analytics:{}".format(hashlib.sha1(request.get_full_path().encode()).hexdigest())
 
-        total_sales = sales.count()
-        total_revenue = sales.aggregate(
-            total=Sum("total_amount")
-        )["total"] or 0
+        summary, analytics, top_products = await run_cached_queries(
+            key,
+            ANALYTICS_TIMEOUT,
+            (analytics_summary, sales),
+            (analytics_periods, sales, filter_type),
+            (analytics_top_products, sales),
+        )
 
         return Response({
-            "summary": {
-                "total_sales": total_sales,
-                "total_revenue": total_revenue,
-                "avg_sale": round(
-                    total_revenue / total_sales, 2
-                ) if total_sales else 0,
-            },
+            "summary": summary,
             "analytics": analytics,
-            "top_products": (
-                sales.values("product__name")
-                .annotate(
-                    quantity_sold=Sum("quantity"),
-                    revenue=Sum("total_amount"),
-                )
-                .order_by("-revenue")[:5]
-            ),
+            "top_products": top_products,
         })
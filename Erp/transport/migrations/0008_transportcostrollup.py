@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    TransportRecord = apps.get_model("transport", "TransportRecord")
+    TransportCostRollup = apps.get_model("transport", "TransportCostRollup")
+
+    rows = (
+        TransportRecord.objects
+        .values("vehicle_id", "date", "company_id", "branch_id", "vehicle__category")
+        .annotate(
+            fuel=Sum("fuel_cost"),
+            service=Sum("service_cost"),
+            count=Count("id"),
+        )
+    )
+
+    TransportCostRollup.objects.bulk_create(
+        [
+            TransportCostRollup(
+                vehicle_id=r["vehicle_id"],
+                date=r["date"],
+                company_id=r["company_id"],
+                branch_id=r["branch_id"],
+                category=r["vehicle__category"],
+                fuel_cost=r["fuel"] or 0,
+                service_cost=r["service"] or 0,
+                record_count=r["count"],
+            )
+            for r in rows
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('transport', '0007_transportrecord_branch_transportrecord_company'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransportCostRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('fuel_cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('service_cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.branch')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.company')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_rollups', to='transport.vehicle')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['company', 'branch', 'date'], name='transport_t_company_eaecf5_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vehicle', 'date'), name='unique_rollup_vehicle_date')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:34
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model("transport", "TransportCostRollup").objects.all().delete()
+
+
+def rebuild_rollups(apps, schema_editor):
+    TransportRecord = apps.get_model("transport", "TransportRecord")
+    TransportCostRollup = apps.get_model("transport", "TransportCostRollup")
+
+    rows = (
+        TransportRecord.objects
+        .values("company_id", "branch_id", "vehicle__category", "date")
+        .annotate(
+            fuel=Sum("fuel_cost"),
+            service=Sum("service_cost"),
+            count=Count("id"),
+        )
+    )
+
+    TransportCostRollup.objects.bulk_create(
+        [
+            TransportCostRollup(
+                company_id=r["company_id"],
+                branch_id=r["branch_id"],
+                category=r["vehicle__category"],
+                date=r["date"],
+                fuel_cost=r["fuel"] or 0,
+                service_cost=r["service"] or 0,
+                record_count=r["count"],
+            )
+            for r in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('transport', '0008_transportcostrollup'),
+    ]
+
+    operations = [
+        # the per-vehicle rows are rebuilt per category below
+        migrations.RunPython(clear_rollups, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='transportcostrollup',
+            name='unique_rollup_vehicle_date',
+        ),
+        migrations.RemoveField(
+            model_name='transportcostrollup',
+            name='vehicle',
+        ),
+        migrations.AddConstraint(
+            model_name='transportcostrollup',
+            constraint=models.UniqueConstraint(fields=('company', 'branch', 'category', 'date'), name='unique_rollup_category_date'),
+        ),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
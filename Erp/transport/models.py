@@ -83,4 +83,38 @@ class TransportRecord(models.Model):
 
     def total_cost(self):
         return (self.fuel_cost or 0) + (self.service_cost or 0)
-    
\ No newline at end of file
+
+
+class TransportCostRollup(models.Model):
+    """
+    Daily fuel & service cost per vehicle category.
+    Kept in sync with TransportRecord and Vehicle by signals and used by
+    the time series endpoint and the cost alerts instead of scanning
+    the records table. Per-vehicle figures come from TransportRecord,
+    which already holds one row per vehicle and day.
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True)
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, null=True, blank=True)
+    category = models.CharField(max_length=50)
+
+    date = models.DateField()
+    fuel_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    service_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    record_count = models.PositiveIntegerField(default=0)
+
+    objects = CompanyQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["company", "branch", "category", "date"],
+                name="unique_rollup_category_date",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["company", "branch", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.date}"
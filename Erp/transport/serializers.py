@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from core.serializers import RoleAwareSerializer
+from core.serializers import PeriodLockMixin, RoleAwareSerializer
 from .models import Vehicle, TransportRecord
 
 
@@ -40,7 +40,7 @@ class VehicleSerializer(RoleAwareSerializer):
 # TRANSPORT RECORD
 # =====================================================
 
-class TransportRecordSerializer(RoleAwareSerializer):
+class TransportRecordSerializer(PeriodLockMixin, RoleAwareSerializer):
     """
     Fuel + service costs per vehicle per day.
     """
@@ -113,3 +113,17 @@ class TransportRecordSerializer(RoleAwareSerializer):
         Always calculated from model method.
         """
         return float(obj.total_cost())
+
+
+# =====================================================
+# QUERY PARAMETERS
+# =====================================================
+
+class TransportQuerySerializer(serializers.Serializer):
+    """
+    Optional filters of the record list and the time series.
+    """
+    vehicle = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.CharField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+
+GRAINS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+GROUP_FIELDS = {
+    "vehicle": "vehicle_id",
+    "category": "category",
+}
+
+
+def period_start(value, grain):
+    if grain == "week":
+        return value - timedelta(days=value.weekday())
+    if grain == "month":
+        return value.replace(day=1)
+    return value
+
+
+def next_period(value, grain):
+    if grain == "week":
+        return value + timedelta(days=7)
+    if grain == "month":
+        if value.month == 12:
+            return value.replace(year=value.year + 1, month=1)
+        return value.replace(month=value.month + 1)
+    return value + timedelta(days=1)
+
+
+def period_index(start_date, end_date, grain):
+    """
+    Every period start between the two dates, so gaps show up as zeros.
+    """
+    periods = []
+    current = period_start(start_date, grain)
+    while current <= end_date:
+        periods.append(current)
+        current = next_period(current, grain)
+    return periods
+
+
+def rolling_mean(values, window):
+    """
+    Trailing mean over `window` periods (shorter at the start of the series).
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return values
+
+    window = max(1, min(window, values.size))
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+
+    ends = np.arange(1, values.size + 1)
+    starts = np.maximum(ends - window, 0)
+
+    return (cumulative[ends] - cumulative[starts]) / (ends - starts)
+
+
+def exponential_smoothing_forecast(values, alpha, horizon):
+    """
+    Simple exponential smoothing, seeded with the first observation.
+    The final level is the weighted sum alpha * (1 - alpha) ** age over
+    the observations, so it is computed in one dot product.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0 or horizon <= 0:
+        return np.zeros(max(horizon, 0))
+
+    ages = np.arange(values.size - 2, -1, -1)
+    weights = alpha * (1 - alpha) ** ages
+    level = weights @ values[1:] + (1 - alpha) ** (values.size - 1) * values[0]
+
+    return np.full(horizon, level)
+
+
+def cost_series(queryset, start_date, end_date, grain="day", group_by="vehicle",
+                window=7, alpha=0.3, horizon=0):
+    """
+    Fuel & service cost series per vehicle or category from
+    TransportCostRollup (or TransportRecord) rows, with rolling mean
+    and forecast.
+    """
+    trunc = GRAINS[grain]
+    group_field = GROUP_FIELDS[group_by]
+
+    rows = (
+        queryset
+        .filter(date__range=[start_date, end_date])
+        .annotate(period=trunc("date"))
+        .values(group_field, "period")
+        .annotate(
+            fuel=Sum("fuel_cost"),
+            service=Sum("service_cost"),
+        )
+        .order_by(group_field, "period")
+    )
+
+    periods = period_index(start_date, end_date, grain)
+    position = {p: i for i, p in enumerate(periods)}
+
+    fuel = {}
+    service = {}
+    for row in rows:
+        key = row[group_field]
+        if key not in fuel:
+            fuel[key] = np.zeros(len(periods))
+            service[key] = np.zeros(len(periods))
+
+        i = position[period_start(row["period"], grain)]
+        fuel[key][i] = float(row["fuel"] or 0)
+        service[key][i] = float(row["service"] or 0)
+
+    forecast_periods = []
+    if periods and horizon > 0:
+        current = periods[-1]
+        for _ in range(horizon):
+            current = next_period(current, grain)
+            forecast_periods.append(current)
+
+    series = []
+    for key in fuel:
+        total = fuel[key] + service[key]
+        series.append({
+            "key": key,
+            "fuel": np.round(fuel[key], 2).tolist(),
+            "service": np.round(service[key], 2).tolist(),
+            "total": np.round(total, 2).tolist(),
+            "rolling_mean": np.round(rolling_mean(total, window), 2).tolist(),
+            "forecast": {
+                "periods": [p.isoformat() for p in forecast_periods],
+                "total": np.round(
+                    exponential_smoothing_forecast(total, alpha, horizon), 2
+                ).tolist(),
+            },
+        })
+
+    return {
+        "periods": [p.isoformat() for p in periods],
+        "series": series,
+    }
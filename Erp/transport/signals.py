@@ -0,0 +1,119 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.db.models import Sum, Count
+from .models import Vehicle, TransportRecord, TransportCostRollup
+
+
+def rollup_key(record):
+    return (record.company_id, record.branch_id, record.vehicle.category, record.date)
+
+
+def update_cost_rollup(company_id, branch_id, category, date):
+    """
+    Recompute the rollup row for one (company, branch, category, date)
+    from TransportRecord. Removes the row when no records are left for
+    that key.
+    """
+    key = {
+        "company_id": company_id,
+        "branch_id": branch_id,
+        "category": category,
+        "date": date,
+    }
+
+    totals = (
+        TransportRecord.objects
+        .filter(
+            company_id=company_id,
+            branch_id=branch_id,
+            vehicle__category=category,
+            date=date,
+        )
+        .aggregate(
+            fuel_cost=Sum("fuel_cost"),
+            service_cost=Sum("service_cost"),
+            record_count=Count("id"),
+        )
+    )
+
+    if not totals["record_count"]:
+        TransportCostRollup.objects.filter(**key).delete()
+        return
+
+    TransportCostRollup.objects.update_or_create(
+        **key,
+        defaults={
+            "fuel_cost": totals["fuel_cost"] or 0,
+            "service_cost": totals["service_cost"] or 0,
+            "record_count": totals["record_count"],
+        },
+    )
+
+
+@receiver(pre_save, sender=TransportRecord)
+def remember_rollup_key(sender, instance, **kwargs):
+    """
+    Keep the previous rollup key so a moved record also
+    refreshes the rollup row it left behind.
+    """
+    instance._previous_rollup_key = None
+
+    if not instance.pk:
+        return
+
+    instance._previous_rollup_key = (
+        TransportRecord.objects
+        .filter(pk=instance.pk)
+        .values_list("company_id", "branch_id", "vehicle__category", "date")
+        .first()
+    )
+
+
+@receiver(post_save, sender=TransportRecord)
+def update_rollup_on_save(sender, instance, **kwargs):
+    key = rollup_key(instance)
+    update_cost_rollup(*key)
+
+    previous = getattr(instance, "_previous_rollup_key", None)
+    if previous and previous != key:
+        update_cost_rollup(*previous)
+
+
+@receiver(post_delete, sender=TransportRecord)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    update_cost_rollup(*rollup_key(instance))
+
+
+@receiver(pre_save, sender=Vehicle)
+def remember_vehicle_category(sender, instance, **kwargs):
+    instance._previous_category = None
+
+    if instance.pk:
+        instance._previous_category = (
+            Vehicle.objects
+            .filter(pk=instance.pk)
+            .values_list("category", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Vehicle)
+def move_rollups_on_category_change(sender, instance, **kwargs):
+    """
+    A recategorised vehicle moves its costs from the rollups of the old
+    category to those of the new one, for every day it has records.
+    """
+    previous = getattr(instance, "_previous_category", None)
+    if previous is None or previous == instance.category:
+        return
+
+    days = (
+        TransportRecord.objects
+        .filter(vehicle_id=instance.pk)
+        .values_list("company_id", "branch_id", "date")
+        .distinct()
+    )
+
+    for company_id, branch_id, date in days:
+        update_cost_rollup(company_id, branch_id, previous, date)
+        update_cost_rollup(company_id, branch_id, instance.category, date)
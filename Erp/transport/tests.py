@@ -1,3 +1,95 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from cores.models import Company
+from transport.models import TransportCostRollup, TransportRecord, Vehicle
+
+
+class TransportTestCase(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Haulage Co")
+        self.admin = User.objects.create_user(username="admin", password="x", role="admin", company=self.company)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        self.lorry = Vehicle.objects.create(name="L1", plate_number="KAA 001", category="lorry", driver_name="d")
+        self.other_lorry = Vehicle.objects.create(name="L2", plate_number="KAA 002", category="lorry", driver_name="d")
+        self.probox = Vehicle.objects.create(name="P1", plate_number="KBB 001", category="probox", driver_name="d")
+
+        for i in range(3):
+            for vehicle in (self.lorry, self.other_lorry, self.probox):
+                TransportRecord.objects.create(
+                    company=self.company,
+                    vehicle=vehicle,
+                    date=date(2026, 1, 5) + timedelta(days=i),
+                    fuel_cost=10,
+                    service_cost=1,
+                )
+
+
+class CostRollupTests(TransportTestCase):
+
+    def rollups(self):
+        return sorted(
+            TransportCostRollup.objects
+            .filter(company=self.company, date=date(2026, 1, 5))
+            .values_list("category", "record_count", "fuel_cost")
+        )
+
+    def test_rolled_up_per_category_and_day(self):
+        self.assertEqual(TransportCostRollup.objects.filter(company=self.company).count(), 6)
+        self.assertEqual(self.rollups(), [("lorry", 2, 20), ("probox", 1, 10)])
+
+    def test_recategorised_vehicle_moves_its_costs(self):
+        self.other_lorry.category = "probox"
+        self.other_lorry.save()
+
+        self.assertEqual(self.rollups(), [("lorry", 1, 10), ("probox", 2, 20)])
+
+    def test_deleted_record_leaves_its_rollup(self):
+        TransportRecord.objects.filter(vehicle=self.probox, date=date(2026, 1, 5)).delete()
+
+        self.assertEqual(self.rollups(), [("lorry", 2, 20)])
+
+
+class TimeseriesTests(TransportTestCase):
+    url = "/api/transport/records/timeseries/"
+    january = {"start_date": "2026-01-01", "end_date": "2026-01-31", "grain": "month"}
+
+    def totals(self, **params):
+        response = self.client.get(self.url, {**self.january, **params}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return {series["label"]: series["total"] for series in response.json()["series"]}
+
+    def test_per_category(self):
+        self.assertEqual(self.totals(group_by="category"), {"Lorry": [66.0], "Probox": [33.0]})
+
+    def test_per_vehicle(self):
+        self.assertEqual(
+            self.totals(group_by="vehicle"),
+            {"KAA 001": [33.0], "KAA 002": [33.0], "KBB 001": [33.0]},
+        )
+
+    def test_category_of_one_vehicle(self):
+        self.assertEqual(self.totals(group_by="category", vehicle=self.lorry.pk), {"Lorry": [33.0]})
+
+
+class BadParameterTests(TransportTestCase):
+
+    def test_non_integer_vehicle(self):
+        for url in ("/api/transport/records/", "/api/transport/records/timeseries/"):
+            response = self.client.get(url, {"vehicle": "abc"}, secure=True)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("vehicle", response.json())
+
+    def test_impossible_dates(self):
+        response = self.client.get("/api/transport/records/", {"start_date": "2026-02-30"}, secure=True)
+        self.assertEqual(response.status_code, 400)
 
-# Create your tests here.
+        response = self.client.get("/api/transport/records/analytics/", {"end_date": "nope"}, secure=True)
+        self.assertEqual(response.status_code, 400)
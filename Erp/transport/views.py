@@ -1,19 +1,19 @@
 from django.db.models import Sum
 from django.db.models.functions import TruncDay, TruncMonth
-from django.utils.dateparse import parse_date
 from django.utils.timezone import now
 from datetime import datetime, timedelta
 
-from django.db.models import Sum, Q 
+from django.db.models import F, Sum, Q 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 
 
 from notifications.services import notify_role
-from .models import Vehicle, TransportRecord
-from .serializers import VehicleSerializer, TransportRecordSerializer
+from .models import Vehicle, TransportRecord, TransportCostRollup
+from .serializers import VehicleSerializer, TransportRecordSerializer, TransportQuerySerializer
+from .services.timeseries import GRAINS, GROUP_FIELDS, cost_series
 from cores.utils.periods import is_period_locked
 from accounts.permissions import (ModulePermission, AdminDeleteOnly,
                                   ApprovalWorkflowPermission,IsownerOrAdmin)
@@ -63,22 +63,18 @@ class TransportRecordViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         qs = TransportRecord.objects.for_user(self.request.user)
 
-        vehicle_id = self.request.query_params.get("vehicle")
-        start = self.request.query_params.get("start_date")
-        end = self.request.query_params.get("end_date")
+        query = TransportQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
 
-        if vehicle_id:
-            qs = qs.filter(vehicle__id=vehicle_id)
+        if "vehicle" in params:
+            qs = qs.filter(vehicle__id=params["vehicle"])
 
-        if start:
-            start_date = parse_date(start)
-            if start_date:
-                qs = qs.filter(date__gte=start_date)
+        if "start_date" in params:
+            qs = qs.filter(date__gte=params["start_date"])
 
-        if end:
-            end_date = parse_date(end)
-            if end_date:
-                qs = qs.filter(date__lte=end_date)
+        if "end_date" in params:
+            qs = qs.filter(date__lte=params["end_date"])
 
         return qs
 
@@ -87,19 +83,14 @@ class TransportRecordViewSet(viewsets.ModelViewSet):
     # -------------------------------
     @action(detail=False, methods=["get"])
     def analytics(self, request):
-        start_param = request.query_params.get("start_date")
-        end_param = request.query_params.get("end_date")
+        query = TransportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
 
         start_date = (
-            parse_date(start_param)
-            if start_param
-            else (datetime.today() - timedelta(days=30)).date()
-        )
-        end_date = (
-            parse_date(end_param)
-            if end_param
-            else datetime.today().date()
+            query.validated_data.get("start_date")
+            or (datetime.today() - timedelta(days=30)).date()
         )
+        end_date = query.validated_data.get("end_date") or datetime.today().date()
 
         records = TransportRecord.objects.for_user(request.user).filter(
             date__range=[start_date, end_date]
@@ -158,10 +149,97 @@ class TransportRecordViewSet(viewsets.ModelViewSet):
             "top_vehicles": top_vehicles,
         })
 
+    # -------------------------------
+    # COST TIME SERIES (READ-ONLY)
+    # -------------------------------
+    @action(detail=False, methods=["get"])
+    def timeseries(self, request):
+        """
+        Fuel & service cost series per vehicle or category,
+        with rolling mean and exponential smoothing forecast.
+        """
+        params = request.query_params
+
+        grain = params.get("grain", "day")
+        group_by = params.get("group_by", "vehicle")
+
+        if grain not in GRAINS:
+            raise ValidationError({"grain": f"Must be one of {', '.join(GRAINS)}"})
+        if group_by not in GROUP_FIELDS:
+            raise ValidationError({"group_by": f"Must be one of {', '.join(GROUP_FIELDS)}"})
+
+        query = TransportQuerySerializer(data=params)
+        query.is_valid(raise_exception=True)
+        filters = query.validated_data
+
+        end_date = filters.get("end_date") or datetime.today().date()
+        start_date = filters.get("start_date") or end_date - timedelta(days=90)
+        if start_date > end_date:
+            raise ValidationError({"end_date": "End date cannot be before start date"})
+
+        try:
+            window = int(params.get("window", 7))
+            horizon = int(params.get("horizon", 4))
+            alpha = float(params.get("alpha", 0.3))
+        except ValueError:
+            raise ValidationError("window, horizon and alpha must be numbers")
+
+        if window < 1 or not 0 <= horizon <= 365 or not 0 < alpha <= 1:
+            raise ValidationError(
+                "window must be >= 1, horizon between 0 and 365, alpha in (0, 1]"
+            )
+
+        if group_by == "vehicle" or "vehicle" in filters:
+            # the records already hold one row per vehicle and day
+            costs = (
+                TransportRecord.objects
+                .for_user(request.user)
+                .annotate(category=F("vehicle__category"))
+            )
+            if "vehicle" in filters:
+                costs = costs.filter(vehicle_id=filters["vehicle"])
+        else:
+            costs = TransportCostRollup.objects.for_user(request.user)
+
+        if filters.get("category"):
+            costs = costs.filter(category=filters["category"])
+
+        data = cost_series(
+            costs,
+            start_date,
+            end_date,
+            grain=grain,
+            group_by=group_by,
+            window=window,
+            alpha=alpha,
+            horizon=horizon,
+        )
+
+        if group_by == "vehicle":
+            plates = dict(
+                Vehicle.objects
+                .filter(id__in=[s["key"] for s in data["series"]])
+                .values_list("id", "plate_number")
+            )
+            for s in data["series"]:
+                s["label"] = plates.get(s["key"], "")
+        else:
+            labels = dict(Vehicle._meta.get_field("category").choices)
+            for s in data["series"]:
+                s["label"] = labels.get(s["key"], s["key"])
+
+        return Response({
+            "grain": grain,
+            "group_by": group_by,
+            "start_date": start_date,
+            "end_date": end_date,
+            **data,
+        })
+
 def initial(self, request, *args, **kwargs):
     super().initial(request, *args, **kwargs)
 
-    if not is_feature_enabled(request.user.company, "transport"):
+    if not is_feature_enabled(request.user.company, "transport", user=request.user):
         raise PermissionDenied("Transport module not enabled for your plan.")
 
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import  Material, DailyInventory, WarehouseAnalytics
+from .models import  Material, DailyInventory, WarehouseAnalytics, StockMovement, StockSnapshot, InventoryDiscrepancy
 
 
 
@@ -34,11 +34,44 @@ class DailyInventoryAdmin(admin.ModelAdmin):
 class WarehouseAnalyticsAdmin(admin.ModelAdmin):
     list_display = (
         "date",
+        "company",
+        "branch",
         "total_raw_in",
         "total_output",
         "total_waste",
         "efficiency_rate",
     )
-    list_filter = ("total_raw_in", "date")
-    search_fields = ("warehouse__categories",)
+    list_filter = ("company", "date")
+    search_fields = ("company__name", "branch__name")
+    ordering = ("-date",)
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("date", "material", "branch", "movement_type", "quantity", "daily_record")
+    list_filter = ("movement_type", "date")
+    search_fields = ("material__name",)
+    ordering = ("-date", "-id")
+
+    # the ledger is append-only
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("date", "material", "branch", "balance")
+    list_filter = ("date",)
+    search_fields = ("material__name",)
+    ordering = ("-date",)
+
+
+@admin.register(InventoryDiscrepancy)
+class InventoryDiscrepancyAdmin(admin.ModelAdmin):
+    list_display = ("date", "material", "branch", "kind", "expected", "actual", "difference", "resolved")
+    list_filter = ("kind", "resolved", "date")
+    search_fields = ("material__name",)
     ordering = ("-date",)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from cores.models import Company
+from warehouse.services.reorder import REORDER_CHUNK_SIZE, raise_reorder_alerts
+
+
+class Command(BaseCommand):
+    help = "Evaluate every company's materials against their reorder points and notify warehouse staff; scheduled daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, default=None, help="Only this company id")
+
+    def handle(self, *args, **options):
+        company_ids = (
+            [options["company"]] if options["company"]
+            else list(Company.objects.order_by("id").values_list("id", flat=True))
+        )
+
+        sent = 0
+        for i in range(0, len(company_ids), REORDER_CHUNK_SIZE):
+            sent += raise_reorder_alerts(company_ids[i:i + REORDER_CHUNK_SIZE])
+
+        self.stdout.write(self.style.SUCCESS(f"{sent} reorder notification(s) sent"))
@@ -8,7 +8,10 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 
-from warehouse.models import Material, DailyInventory, WarehouseAnalytics
+from cores.models import Branch, Company
+from cores.utils.periods import locked_periods
+from warehouse.models import DailyInventory
+from warehouse.services.materials import resolve_material
 
 
 class Command(BaseCommand):
@@ -23,6 +26,8 @@ class Command(BaseCommand):
         parser.add_argument("--sheet", type=str, default=None, help="Import only a specific sheet")
         parser.add_argument("--date", type=str, default=None, help="Manually set date (for single-sheet imports)")
         parser.add_argument("--dry-run", action="store_true", help="Simulate import without saving to DB")
+        parser.add_argument("--company", type=int, default=None, help="Company id the records belong to")
+        parser.add_argument("--branch", type=int, default=None, help="Branch id the records belong to")
 
     # =====================
     # ⚙️ MAIN HANDLER
@@ -34,6 +39,17 @@ class Command(BaseCommand):
         manual_date = options["date"]
         dry_run = options["dry_run"]
 
+        # records (and so WarehouseAnalytics rows) are kept per tenant
+        self.company = self.branch = None
+        if options["company"] is not None:
+            self.company = Company.objects.filter(pk=options["company"]).first()
+            if self.company is None:
+                raise CommandError(f"Company not found: {options['company']}")
+        if options["branch"] is not None:
+            self.branch = Branch.objects.filter(pk=options["branch"], company=self.company).first()
+            if self.branch is None:
+                raise CommandError(f"Branch {options['branch']} not found in that company")
+
         if not os.path.exists(excel_path):
             raise CommandError(f"Excel file not found: {excel_path}")
 
@@ -71,13 +87,25 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.WARNING("⚠️ No 'DATE:' blocks found — processing entire sheet as one"))
                     blocks = [(date, df)]
 
+                # dates of locked accounting periods are left as they are
+                locked = locked_periods((self.company, block_date) for block_date, _ in blocks)
+
                 # Process each block individually
                 for block_date, block_df in blocks:
+                    if (getattr(self.company, "pk", None), block_date.year, block_date.month) in locked:
+                        self.stdout.write(self.style.WARNING(f"🔒 Skipping {block_date}: the accounting period is locked."))
+                        total_summary["skipped"] += 1
+                        continue
+
                     self.stdout.write(self.style.SUCCESS(f"\n🗓 Processing date block: {block_date}"))
 
                     # Replace existing records for that date
                     if not dry_run:
-                        DailyInventory.objects.filter(date=block_date).delete()
+                        DailyInventory.objects.filter(
+                            date=block_date,
+                            company=self.company,
+                            branch=self.branch,
+                        ).delete()
                         self.stdout.write(self.style.WARNING(f"♻️ Existing records for {block_date} cleared before import."))
 
                     sheet_summary = self.process_sheet(block_df, block_date, category, dry_run)
@@ -270,11 +298,7 @@ class Command(BaseCommand):
                         results["skipped"] += 1
                         continue
 
-                    material, _ = Material.objects.get_or_create(
-                        name=material_name,
-                        category=category,
-                        defaults={"unit": "kg"},
-                    )
+                    material_id = resolve_material(material_name, category, defaults={"unit": "kg"})
 
                     inv_data = {
                         "opening_balance": self.safe_decimal(row.get("opening_balance")),
@@ -283,18 +307,22 @@ class Command(BaseCommand):
                         "shift_2": self.safe_decimal(row.get("shift_2")),
                         "shift_3": self.safe_decimal(row.get("shift_3")),
                         "remarks": str(row.get("remarks", "")).strip() or None,
+                        "company": self.company,
+                        "branch": self.branch,
                     }
+                    # kept as reported; reconcile_inventory checks it against the computed closing
+                    if "closing_balance" in df.columns:
+                        inv_data["reported_closing"] = self.safe_decimal(row.get("closing_balance"))
 
                     inv, created = DailyInventory.objects.update_or_create(
-                        material=material,
+                        material_id=material_id,
                         date=date,
                         defaults=inv_data,
                     )
                     results["created" if created else "updated"] += 1
 
-                if not dry_run:
-                    self.update_analytics(date)
-                else:
+                # WarehouseAnalytics follows each saved record through signals
+                if dry_run:
                     raise transaction.TransactionManagementError("Dry-run rollback")
 
         except transaction.TransactionManagementError:
@@ -309,24 +337,3 @@ class Command(BaseCommand):
             )
         )
         return results
-
-    def update_analytics(self, date):
-        inventories = DailyInventory.objects.filter(date=date)
-        total_raw_in = sum(i.raw_in for i in inventories)
-        total_output = sum(i.total_shift_output for i in inventories)
-        total_waste = sum(max(Decimal("0"), i.raw_in - i.total_shift_output) for i in inventories)
-
-        efficiency_rate = Decimal("0")
-        if total_raw_in > 0:
-            efficiency_rate = (total_output / total_raw_in) * 100
-
-        WarehouseAnalytics.objects.update_or_create(
-            date=date,
-            defaults={
-                "total_raw_in": total_raw_in,
-                "total_output": total_output,
-                "total_waste": total_waste,
-                "efficiency_rate": efficiency_rate,
-            },
-        )
-        self.stdout.write(self.style.SUCCESS(f"📊 Analytics updated for {date} ({efficiency_rate:.2f}% efficiency)"))
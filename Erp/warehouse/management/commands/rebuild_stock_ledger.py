@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from cores.models import Company
+from warehouse.services.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = "Re-derive daily inventory balances and repost the stock ledger, e.g. after turning on WAREHOUSE_LEDGER_MODE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, default=None, help="Only this company id")
+
+    def handle(self, *args, **options):
+        company_ids = (
+            [options["company"]] if options["company"]
+            # records without a company form their own ledger
+            else [*Company.objects.values_list("id", flat=True), None]
+        )
+
+        changed = 0
+        for company_id in company_ids:
+            changed += rebuild_ledger(company_id=company_id)
+
+        self.stdout.write(self.style.SUCCESS(f"{changed} daily record(s) rebalanced"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from cores.models import Company
+from warehouse.services.analytics import recompute_analytics
+
+
+class Command(BaseCommand):
+    help = "Rebuild WarehouseAnalytics from the daily inventory records; scheduled nightly."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, default=None, help="Only this company id")
+
+    def handle(self, *args, **options):
+        company_ids = (
+            [options["company"]] if options["company"]
+            # records without a company have their own analytics rows
+            else [*Company.objects.values_list("id", flat=True), None]
+        )
+
+        rows = 0
+        for company_id in company_ids:
+            rows += recompute_analytics(company_id=company_id)
+
+        self.stdout.write(self.style.SUCCESS(f"{rows} analytics row(s) rebuilt"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from warehouse.serializers import ReconcileSerializer
+from warehouse.services.reconciliation import DEFAULT_TOLERANCE, reconcile, summarize
+
+
+class Command(BaseCommand):
+    help = "Check daily inventory for closing and opening mismatches and store them as discrepancies."
+
+    def add_arguments(self, parser):
+        parser.add_argument("start_date", type=str)
+        parser.add_argument("end_date", type=str)
+        parser.add_argument("--company", type=int, default=None, help="Only this company id")
+        parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    def handle(self, *args, **options):
+        arguments = ReconcileSerializer(data={
+            "start_date": options["start_date"],
+            "end_date": options["end_date"],
+            "tolerance": options["tolerance"],
+        })
+        if not arguments.is_valid():
+            raise CommandError(arguments.errors)
+        start = arguments.validated_data["start_date"]
+        end = arguments.validated_data["end_date"]
+
+        filters = {"company_id": options["company"]} if options["company"] else {}
+
+        report = summarize(reconcile(start=start, end=end, tolerance=arguments.validated_data["tolerance"], **filters))
+
+        for kind, stats in report["by_kind"].items():
+            self.stdout.write(f"{kind}: {stats['count']} (largest {stats['largest']})")
+
+        self.stdout.write(self.style.SUCCESS(f"{report['count']} discrepancy(ies) between {start} and {end}"))
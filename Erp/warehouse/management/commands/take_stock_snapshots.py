@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from warehouse.services.ledger import take_snapshots
+
+
+class Command(BaseCommand):
+    help = "Snapshot stock on hand for the month just closed (or --date); scheduled on the 1st of each month."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=str, default=None, help="Snapshot this day instead (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        if not settings.WAREHOUSE_LEDGER_MODE:
+            self.stdout.write(self.style.WARNING("WAREHOUSE_LEDGER_MODE is off; no ledger to snapshot"))
+            return
+
+        if options["date"]:
+            try:
+                on = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("Give --date as YYYY-MM-DD")
+        else:
+            on = date.today().replace(day=1) - timedelta(days=1)
+
+        written = take_snapshots(on)
+        self.stdout.write(self.style.SUCCESS(f"{written} snapshot(s) taken for {on}"))
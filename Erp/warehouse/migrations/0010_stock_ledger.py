@@ -0,0 +1,133 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:26
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_movements(apps, schema_editor):
+    """
+    Post the existing daily records to the ledger, with each day's
+    opening re-derived from the day before (the difference goes to
+    variance) so balances and movements agree. Days in locked periods
+    keep their figures; adjustments carry the ledger to them. Without
+    WAREHOUSE_LEDGER_MODE nothing is posted; rebuild_stock_ledger does
+    this when the mode is turned on.
+    """
+    if not settings.WAREHOUSE_LEDGER_MODE:
+        return
+
+    AccountingPeriod = apps.get_model("cores", "AccountingPeriod")
+    DailyInventory = apps.get_model("warehouse", "DailyInventory")
+    StockMovement = apps.get_model("warehouse", "StockMovement")
+
+    zero = Decimal("0")
+    locked = set(AccountingPeriod.objects.filter(is_locked=True).values_list("company_id", "year", "month"))
+
+    changed, movements = [], []
+    key, balance = None, zero
+
+    def movement(record, movement_type, quantity):
+        movements.append(StockMovement(
+            company_id=record.company_id,
+            branch_id=record.branch_id,
+            material_id=record.material_id,
+            daily_record_id=record.pk,
+            date=record.date,
+            movement_type=movement_type,
+            quantity=quantity,
+        ))
+
+    records = DailyInventory.objects.order_by("material_id", "branch_id", "date")
+    for record in records.iterator(chunk_size=2000):
+        opening = record.opening_balance or zero
+        raw_in = record.raw_in or zero
+        used = (record.shift_1 or zero) + (record.shift_2 or zero) + (record.shift_3 or zero)
+        is_locked = (record.company_id, record.date.year, record.date.month) in locked
+
+        if (record.material_id, record.branch_id) != key:
+            # the earliest day of each (material, branch) opens its ledger
+            key = (record.material_id, record.branch_id)
+            if opening:
+                movement(record, "opening", opening)
+        elif opening != balance:
+            if is_locked:
+                movement(record, "adjustment", opening - balance)
+            else:
+                record.variance = opening - balance
+                opening = balance
+
+        if raw_in:
+            movement(record, "in", raw_in)
+        if used:
+            movement(record, "out", -used)
+        balance = opening + raw_in - used
+
+        if is_locked:
+            if record.closing_balance != balance:
+                movement(record, "adjustment", record.closing_balance - balance)
+                balance = record.closing_balance
+        elif (opening, balance, used) != (record.opening_balance, record.closing_balance, record.total_shift_output):
+            record.opening_balance = opening
+            record.closing_balance = balance
+            record.total_shift_output = used
+            changed.append(record)
+
+        if len(movements) >= 5000:
+            StockMovement.objects.bulk_create(movements)
+            movements = []
+
+    StockMovement.objects.bulk_create(movements)
+    DailyInventory.objects.bulk_update(
+        changed,
+        ["opening_balance", "closing_balance", "total_shift_output", "variance"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('warehouse', '0009_dailyinventory_branch_dailyinventory_company'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('movement_type', models.CharField(choices=[('opening', 'Opening balance'), ('in', 'Stock in'), ('out', 'Stock out'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.branch')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.company')),
+                ('daily_record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='warehouse.dailyinventory')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='warehouse.material')),
+            ],
+            options={
+                'ordering': ['date', 'id'],
+                'indexes': [models.Index(fields=['material', 'branch', 'date'], name='warehouse_s_materia_e1276e_idx'), models.Index(fields=['company', 'date'], name='warehouse_s_company_d692b7_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.branch')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.company')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='warehouse.material')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['company', 'date'], name='warehouse_s_company_5ff23f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('material', 'branch', 'date'), name='unique_snapshot_material_branch_date')],
+            },
+        ),
+        migrations.RunPython(backfill_movements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('warehouse', '0010_stock_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyinventory',
+            index=models.Index(fields=['company', 'branch', 'date'], name='warehouse_d_company_0d5993_idx'),
+        ),
+    ]
@@ -0,0 +1,156 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def rebuild_analytics(apps, schema_editor):
+    """
+    The old rows summed every tenant per date; rebuild them per
+    (company, branch, date) from DailyInventory.
+    """
+    DailyInventory = apps.get_model("warehouse", "DailyInventory")
+    WarehouseAnalytics = apps.get_model("warehouse", "WarehouseAnalytics")
+
+    WarehouseAnalytics.objects.all().delete()
+
+    zero = Decimal("0")
+    rows = {}
+
+    for record in DailyInventory.objects.iterator(chunk_size=2000):
+        key = (record.company_id, record.branch_id, record.date)
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = WarehouseAnalytics(
+                company_id=record.company_id,
+                branch_id=record.branch_id,
+                date=record.date,
+            )
+
+        output = record.total_shift_output or zero
+        raw_in = record.raw_in or zero
+
+        row.total_raw_in += raw_in
+        row.total_output += output
+        row.total_waste += (record.opening_balance or zero) + raw_in - (record.closing_balance or zero)
+        row.total_opening += record.opening_balance or zero
+        row.total_closing += record.closing_balance or zero
+        row.total_shift_1 += record.shift_1 or zero
+        row.total_shift_2 += record.shift_2 or zero
+        row.total_shift_3 += record.shift_3 or zero
+        if raw_in:
+            row.efficiency_sum += (output / raw_in).quantize(Decimal("0.000001"))
+        row.record_count += 1
+
+    for row in rows.values():
+        row.efficiency_rate = row.total_output / row.total_raw_in * 100 if row.total_raw_in else 0
+
+    WarehouseAnalytics.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+def collapse_analytics(apps, schema_editor):
+    """
+    Back to one row per date, as the unique date field requires.
+    """
+    WarehouseAnalytics = apps.get_model("warehouse", "WarehouseAnalytics")
+
+    merged = {}
+    for row in WarehouseAnalytics.objects.order_by("date", "id"):
+        first = merged.get(row.date)
+        if first is None:
+            merged[row.date] = row
+            continue
+
+        first.total_raw_in += row.total_raw_in
+        first.total_output += row.total_output
+        first.total_waste += row.total_waste
+
+    WarehouseAnalytics.objects.all().delete()
+
+    for row in merged.values():
+        row.pk = None
+        row.company_id = row.branch_id = None
+        row.efficiency_rate = row.total_output / row.total_raw_in * 100 if row.total_raw_in else 0
+
+    WarehouseAnalytics.objects.bulk_create(merged.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('warehouse', '0011_dailyinventory_company_branch_date'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='warehouseanalytics',
+            options={'ordering': ['-date']},
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.branch'),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.company'),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='efficiency_sum',
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=18),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='record_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='total_closing',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='total_opening',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='total_shift_1',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='total_shift_2',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='warehouseanalytics',
+            name='total_shift_3',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='warehouseanalytics',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(rebuild_analytics, collapse_analytics),
+        migrations.AddConstraint(
+            model_name='warehouseanalytics',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', False)), fields=('company', 'branch', 'date'), name='unique_analytics_company_branch_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='warehouseanalytics',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', True), ('company__isnull', False)), fields=('company', 'date'), name='unique_analytics_company_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='warehouseanalytics',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', True), ('company__isnull', True)), fields=('date',), name='unique_analytics_unscoped_date'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cores', '0002_accountingperiod'),
+        ('warehouse', '0012_warehouseanalytics_per_tenant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyinventory',
+            name='reported_closing',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True),
+        ),
+        migrations.CreateModel(
+            name='InventoryDiscrepancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('closing', 'Reported closing differs from computed closing'), ('opening', "Opening differs from previous day's closing")], max_length=20)),
+                ('expected', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('actual', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('difference', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('resolved', models.BooleanField(default=False)),
+                ('detected_at', models.DateTimeField(auto_now=True)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.branch')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cores.company')),
+                ('daily_record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='warehouse.dailyinventory')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='warehouse.material')),
+            ],
+            options={
+                'ordering': ['-date', 'material'],
+                'indexes': [models.Index(fields=['company', 'branch', 'date'], name='warehouse_i_company_34fa9a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('daily_record', 'kind'), name='unique_discrepancy_record_kind')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouse', '0013_inventory_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='material',
+            name='lead_time_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='material',
+            name='reorder_point',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True),
+        ),
+    ]
@@ -1,9 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from cores.models import Company,Branch
 from cores.querysets import CompanyQuerySet
+from cores.utils.periods import is_period_locked
 
 user = get_user_model()
 
@@ -73,6 +75,13 @@ class Material(models.Model):
 
     approved_at = models.DateTimeField(null=True, blank=True)
 
+    # alert when stock, less what is consumed over the lead time, falls to this
+    reorder_point = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    lead_time_days = models.PositiveIntegerField(default=0)
+
+    # set explicitly by the conditional .update() calls, which skip auto_now
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         unique_together=('name','category')
         ordering =['name']
@@ -81,6 +90,11 @@ class Material(models.Model):
         return f"{self.name} ({self.get_category_display()})"
 
 
+# a daily record whose stored values of these change has moved to
+# another ledger chain (or place in it)
+LEDGER_KEY_FIELDS = ("company_id", "branch_id", "material_id", "date")
+
+
 class DailyInventory(models.Model):
     """
     Records daily stock levels for a specific material.
@@ -100,6 +114,8 @@ class DailyInventory(models.Model):
 
     total_shift_output = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     closing_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # closing as counted / entered on the sheet, checked by reconciliation
+    reported_closing = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
     variance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
     remarks = models.TextField(blank=True, null=True)
@@ -115,34 +131,248 @@ class DailyInventory(models.Model):
     class Meta:
         unique_together = ("material", "date")
         ordering = ["-date"]
+        indexes = [
+            # tenant-scoped date range reads (analytics, dashboards)
+            models.Index(fields=["company", "branch", "date"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        from .services.analytics import analytics_key, contribution
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_opening_balance = instance.__dict__.get("opening_balance")
+
+        # what the stored row adds to WarehouseAnalytics, for delta updates
+        if len(values) == len(cls._meta.concrete_fields):
+            instance._loaded_analytics = (analytics_key(instance), contribution(instance))
+        return instance
+
+    def clean(self):
+        if self.pk and is_period_locked(company=self.company, date=self.date):
+            raise ValidationError("This accounting period is locked.")
 
     def calculate_totals(self):
+        """
+        (used, closing, variance). In ledger mode variance is how far the
+        opening balance that was entered is from the ledger's opening.
+        """
         used = (self.shift_1 or 0) + (self.shift_2 or 0) + (self.shift_3 or 0)
         closing = (self.opening_balance or 0) + (self.raw_in or 0) - used
-        variance = closing - ((self.opening_balance or 0) + (self.raw_in or 0) - used)
-        return used, closing, variance
+        return used, closing, self.variance or 0
 
     def save(self, *args, **kwargs):
-        used, closing, variance = self.calculate_totals()
-        self.total_shift_output = used
-        self.closing_balance = closing
-        self.variance = variance
-        super().save(*args, **kwargs)
+        if not settings.WAREHOUSE_LEDGER_MODE:
+            used, closing, variance = self.calculate_totals()
+            self.total_shift_output = used
+            self.closing_balance = closing
+            # the analytics signals lock the stored row until the delta is applied
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+            return
+
+        from .services.ledger import post_daily_record, previous_closing, unpost_daily_record
+
+        with transaction.atomic():
+            if not self._state.adding:
+                stored = (
+                    DailyInventory.objects
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values(*LEDGER_KEY_FIELDS)
+                    .first()
+                )
+                if stored is not None and stored != {field: getattr(self, field) for field in LEDGER_KEY_FIELDS}:
+                    # moved: take it out of its old chain before posting it anew
+                    unpost_daily_record(DailyInventory(pk=self.pk, **stored))
+
+            derived = previous_closing(self)
+
+            entered = self.opening_balance or 0
+            if self._state.adding or entered != getattr(self, "_loaded_opening_balance", entered):
+                # first row of a (material, branch) seeds the ledger
+                self.variance = 0 if derived is None else entered - derived
+
+            if derived is not None:
+                self.opening_balance = derived
+
+            used, closing, variance = self.calculate_totals()
+            self.total_shift_output = used
+            self.closing_balance = closing
+            super().save(*args, **kwargs)
+
+            post_daily_record(self, is_first=derived is None)
+
+        self._loaded_opening_balance = self.opening_balance
 
     def __str__(self):
         return f"{self.date} | {self.material.name}"
 
 
+class StockMovement(models.Model):
+    """
+    Append-only stock ledger of a (material, branch). Quantities are
+    signed: receipts positive, usage negative. Corrections are new rows.
+    """
+    MOVEMENT_TYPES = (
+        ("opening", "Opening balance"),
+        ("in", "Stock in"),
+        ("out", "Stock out"),
+        ("adjustment", "Adjustment"),
+    )
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True)
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, null=True, blank=True)
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name="movements")
+
+    date = models.DateField()
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPES)
+    quantity = models.DecimalField(max_digits=14, decimal_places=2)
+
+    daily_record = models.ForeignKey(
+        DailyInventory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="movements",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CompanyQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["date", "id"]
+        indexes = [
+            models.Index(fields=["material", "branch", "date"]),
+            models.Index(fields=["company", "date"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError("Stock movements are append-only; post an adjustment instead.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.date} | {self.material.name} {self.quantity:+}"
+
+
+class StockSnapshot(models.Model):
+    """
+    Stock on hand of a (material, branch) at the end of `date`,
+    taken periodically so balances never replay the whole ledger.
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True)
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, null=True, blank=True)
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name="snapshots")
+
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+
+    objects = CompanyQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["material", "branch", "date"],
+                name="unique_snapshot_material_branch_date",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["company", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} | {self.material.name}: {self.balance}"
+
+
+class InventoryDiscrepancy(models.Model):
+    """
+    A daily record whose figures do not add up, flagged by the
+    reconciliation engine (warehouse/services/reconciliation.py).
+    """
+    KIND_CHOICES = (
+        ("closing", "Reported closing differs from computed closing"),
+        ("opening", "Opening differs from previous day's closing"),
+    )
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True)
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, null=True, blank=True)
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name="discrepancies")
+    daily_record = models.ForeignKey(DailyInventory, on_delete=models.CASCADE, related_name="discrepancies")
+
+    date = models.DateField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    expected = models.DecimalField(max_digits=14, decimal_places=2)
+    actual = models.DecimalField(max_digits=14, decimal_places=2)
+    difference = models.DecimalField(max_digits=14, decimal_places=2)
+
+    resolved = models.BooleanField(default=False)
+    detected_at = models.DateTimeField(auto_now=True)
+
+    objects = CompanyQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-date", "material"]
+        constraints = [
+            models.UniqueConstraint(fields=["daily_record", "kind"], name="unique_discrepancy_record_kind"),
+        ]
+        indexes = [
+            models.Index(fields=["company", "branch", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} | {self.material.name} {self.kind}: {self.difference}"
+
+
 class WarehouseAnalytics(models.Model):
     """
-    Daily aggregated analytics for dashboards and reports.
+    Daily aggregated analytics per (company, branch) for dashboards and
+    reports. Kept current by adding and subtracting each DailyInventory
+    row's contribution (warehouse/services/analytics.py).
     """
-    date = models.DateField(default=timezone.now, unique=True)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, null=True, blank=True)
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, null=True, blank=True)
+
+    date = models.DateField(default=timezone.now)
     total_raw_in = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     total_output = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     total_waste = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     efficiency_rate = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
+    total_opening = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_closing = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_shift_1 = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_shift_2 = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_shift_3 = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # sum of each record's output / raw_in, for the average efficiency
+    efficiency_sum = models.DecimalField(max_digits=18, decimal_places=6, default=0)
+    record_count = models.PositiveIntegerField(default=0)
+
+    objects = CompanyQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            # NULLs never collide in a plain unique constraint, so each
+            # missing-key shape gets its own partial one
+            models.UniqueConstraint(
+                fields=["company", "branch", "date"],
+                condition=models.Q(branch__isnull=False),
+                name="unique_analytics_company_branch_date",
+            ),
+            models.UniqueConstraint(
+                fields=["company", "date"],
+                condition=models.Q(branch__isnull=True, company__isnull=False),
+                name="unique_analytics_company_date",
+            ),
+            models.UniqueConstraint(
+                fields=["date"],
+                condition=models.Q(branch__isnull=True, company__isnull=True),
+                name="unique_analytics_unscoped_date",
+            ),
+        ]
+
     def calculate_efficiency(self):
         if self.total_raw_in==0:
             return 0
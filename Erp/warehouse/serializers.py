@@ -1,6 +1,9 @@
+import math
+
 from rest_framework import serializers
-from core.serializers import RoleAwareSerializer
-from .models import Material, DailyInventory, WarehouseAnalytics
+from core.serializers import PeriodLockMixin, RoleAwareSerializer
+from .models import Material, DailyInventory, WarehouseAnalytics, InventoryDiscrepancy
+from .services.reconciliation import DEFAULT_TOLERANCE
 
 
 # =====================================================
@@ -35,7 +38,7 @@ class MaterialSerializer(RoleAwareSerializer):
 # DAILY INVENTORY
 # =====================================================
 
-class DailyInventorySerializer(RoleAwareSerializer):
+class DailyInventorySerializer(PeriodLockMixin, RoleAwareSerializer):
     """
     Daily stock movements per material.
     """
@@ -60,12 +63,15 @@ class DailyInventorySerializer(RoleAwareSerializer):
             "shift_2",
             "shift_3",
             "closing_balance",
+            "reported_closing",
+            "variance",
             "calculated_closing",
             "created_at",
         ]
 
         read_only_fields = [
             "id",
+            "variance",
             "material_name",
             "calculated_closing",
             "created_at",
@@ -109,7 +115,7 @@ class DailyInventorySerializer(RoleAwareSerializer):
                 "Shift output cannot exceed available stock."
             )
 
-        return attrs
+        return super().validate(attrs)
 
 
 # =====================================================
@@ -133,3 +139,92 @@ class WarehouseAnalyticsSerializer(RoleAwareSerializer):
             "read_only": "__all__",
         }
     }
+
+
+# =====================================================
+# INVENTORY DISCREPANCIES
+# =====================================================
+
+class InventoryDiscrepancySerializer(RoleAwareSerializer):
+    """
+    Discrepancies flagged by reconciliation; only `resolved` is writable.
+    """
+
+    material_name = serializers.CharField(
+        source="material.name",
+        read_only=True
+    )
+
+    class Meta:
+        model = InventoryDiscrepancy
+        fields = [
+            "id",
+            "date",
+            "material",
+            "material_name",
+            "branch",
+            "daily_record",
+            "kind",
+            "expected",
+            "actual",
+            "difference",
+            "resolved",
+            "detected_at",
+        ]
+        read_only_fields = [f for f in fields if f != "resolved"]
+
+    role_field_permissions = {
+        "warehouse": {},
+
+        "*": {
+            "read_only": "__all__",
+        }
+    }
+
+
+# =====================================================
+# LEDGER QUERY
+# =====================================================
+
+class AsOfQuerySerializer(serializers.Serializer):
+    """
+    ?date= of the as-of endpoints; today when left out.
+    """
+
+    date = serializers.DateField(required=False)
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    """
+    Required ?start_date=&end_date=, start first.
+    """
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError({"end_date": "end_date cannot be before start_date"})
+        return attrs
+
+
+class LedgerQuerySerializer(DateRangeQuerySerializer):
+    """
+    Query parameters of the inventory ledger endpoint.
+    """
+
+    material = serializers.IntegerField(min_value=1)
+
+
+class ReconcileSerializer(DateRangeQuerySerializer):
+    """
+    Body of the reconcile action.
+    """
+
+    tolerance = serializers.FloatField(min_value=0, default=DEFAULT_TOLERANCE)
+
+    def validate_tolerance(self, value):
+        # min_value lets NaN through, and inf would flag nothing
+        if not math.isfinite(value):
+            raise serializers.ValidationError("tolerance must be a finite number")
+        return value
@@ -0,0 +1,150 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan
+
+from warehouse.models import DailyInventory, WarehouseAnalytics
+
+ZERO = Decimal("0")
+RATIO_PLACES = Decimal("0.000001")
+
+# WarehouseAnalytics field -> DailyInventory value it sums
+TOTAL_FIELDS = (
+    "total_raw_in",
+    "total_output",
+    "total_waste",
+    "total_opening",
+    "total_closing",
+    "total_shift_1",
+    "total_shift_2",
+    "total_shift_3",
+    "efficiency_sum",
+    "record_count",
+)
+
+
+def _decimal(value):
+    # unsaved instances may still hold the ints/floats they were given
+    if value is None:
+        return ZERO
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def analytics_key(record):
+    return record.company_id, record.branch_id, record.date
+
+
+def contribution(record):
+    """
+    What one DailyInventory row adds to its WarehouseAnalytics row.
+    """
+    opening = _decimal(record.opening_balance)
+    raw_in = _decimal(record.raw_in)
+    closing = _decimal(record.closing_balance)
+    output = _decimal(record.total_shift_output)
+
+    return {
+        "total_raw_in": raw_in,
+        "total_output": output,
+        "total_waste": opening + raw_in - closing,
+        "total_opening": opening,
+        "total_closing": closing,
+        "total_shift_1": _decimal(record.shift_1),
+        "total_shift_2": _decimal(record.shift_2),
+        "total_shift_3": _decimal(record.shift_3),
+        "efficiency_sum": (output / raw_in).quantize(RATIO_PLACES) if raw_in else ZERO,
+        "record_count": 1,
+    }
+
+
+def apply_delta(key, delta):
+    """
+    Add `delta` ({field: amount}) to the analytics row of `key` with one
+    UPDATE, creating the row on first use. Only that tenant's row for
+    that day is touched, so writes of different tenants never contend.
+    """
+    delta = {field: amount for field, amount in delta.items() if amount}
+    if not delta:
+        return
+
+    company_id, branch_id, day = key
+    rows = WarehouseAnalytics.objects.filter(company_id=company_id, branch_id=branch_id, date=day)
+
+    raw_in = F("total_raw_in") + delta.get("total_raw_in", ZERO)
+    output = F("total_output") + delta.get("total_output", ZERO)
+
+    changes = {field: F(field) + amount for field, amount in delta.items()}
+    # SET expressions read the old values, so derive the rate from the new totals here
+    changes["efficiency_rate"] = Case(
+        When(
+            GreaterThan(raw_in, 0),
+            # float division: SQLite would otherwise divide integers
+            then=Cast(output, FloatField()) * 100 / Cast(raw_in, FloatField()),
+        ),
+        default=Value(ZERO),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+    if not rows.update(**changes):
+        WarehouseAnalytics.objects.bulk_create(
+            [WarehouseAnalytics(company_id=company_id, branch_id=branch_id, date=day)],
+            ignore_conflicts=True,
+        )
+        rows.update(**changes)
+
+    if delta.get("record_count", 0) < 0:
+        rows.filter(record_count=0).delete()
+
+
+def record_changed(old_key, old, new_key, new):
+    """
+    Move a row's contribution: `old`/`new` are contribution() dicts, or
+    None when the row did not exist before / does not exist any more.
+    """
+    if old_key == new_key and old is not None and new is not None:
+        apply_delta(new_key, {field: new[field] - old[field] for field in TOTAL_FIELDS})
+        return
+
+    if old is not None:
+        apply_delta(old_key, {field: -old[field] for field in TOTAL_FIELDS})
+    if new is not None:
+        apply_delta(new_key, new)
+
+
+@transaction.atomic
+def recompute_analytics(*, company_id):
+    """
+    Rebuild one company's WarehouseAnalytics rows from its DailyInventory
+    records, replacing whatever the delta updates left there.
+    Returns the number of rows written.
+
+    The company's rows are locked before the records are read: a save
+    that already moved one is waited for and counted, one that comes
+    later applies its delta to the rebuilt row.
+    """
+    list(WarehouseAnalytics.objects.select_for_update().filter(company_id=company_id).values_list("pk", flat=True))
+
+    totals = {}
+    for record in DailyInventory.objects.filter(company_id=company_id).iterator(chunk_size=2000):
+        totals.setdefault(analytics_key(record), Counter()).update(contribution(record))
+
+    WarehouseAnalytics.objects.filter(company_id=company_id).delete()
+    rows = WarehouseAnalytics.objects.bulk_create(
+        [
+            WarehouseAnalytics(
+                company_id=key_company_id,
+                branch_id=branch_id,
+                date=day,
+                efficiency_rate=(
+                    row["total_output"] / row["total_raw_in"] * 100 if row["total_raw_in"] else ZERO
+                ),
+                **{field: row[field] for field in TOTAL_FIELDS},
+            )
+            for (key_company_id, branch_id, day), row in totals.items()
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
@@ -0,0 +1,465 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q, Sum, Window
+
+from cores.models import AccountingPeriod
+from cores.utils.periods import locked_periods
+from warehouse.models import DailyInventory, StockMovement, StockSnapshot
+from warehouse.services.analytics import analytics_key, apply_delta, recompute_analytics
+
+ZERO = Decimal("0")
+
+
+def _key_filter(record):
+    return {"material_id": record.material_id, "branch_id": record.branch_id}
+
+
+def previous_closing(record):
+    """
+    Closing balance of the (material, branch)'s latest day before
+    `record`, or None when `record` is its first day.
+    """
+    return (
+        DailyInventory.objects
+        .filter(date__lt=record.date, **_key_filter(record))
+        # a record moved to a later date may still be stored before it
+        .exclude(pk=record.pk)
+        .order_by("-date")
+        .values_list("closing_balance", flat=True)
+        .first()
+    )
+
+
+def _post(movements):
+    """
+    Append movements and add them to the snapshots taken on or after
+    their dates, so snapshots stay exact without being taken again.
+    """
+    if not movements:
+        return
+
+    StockMovement.objects.bulk_create(movements)
+
+    posted = {}
+    for m in movements:
+        key = (m.company_id, m.material_id, m.branch_id, m.date)
+        posted[key] = posted.get(key, ZERO) + m.quantity
+
+    for company_id in {m.company_id for m in movements}:
+        keys = [key for key in posted if key[0] == company_id]
+        dates = list(
+            StockSnapshot.objects
+            .filter(company_id=company_id, date__gte=min(key[3] for key in keys))
+            .values_list("date", flat=True)
+            .distinct()
+            .order_by()
+        )
+        if not dates:
+            continue
+
+        # snapshots cover every key with history by then, so a missing
+        # row means nothing was on hand before these movements
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(company_id=company_id, material_id=material_id, branch_id=branch_id, date=day, balance=ZERO)
+                for _, material_id, branch_id, movement_date in keys
+                for day in dates
+                if day >= movement_date
+            ],
+            ignore_conflicts=True,
+        )
+        for _, material_id, branch_id, movement_date in keys:
+            StockSnapshot.objects.filter(
+                company_id=company_id,
+                material_id=material_id,
+                branch_id=branch_id,
+                date__gte=movement_date,
+            ).update(balance=F("balance") + posted[(company_id, material_id, branch_id, movement_date)])
+
+
+def sync_movements(record, is_first):
+    """
+    Append whatever movements bring the record's posted totals in line
+    with its current figures. Nothing already posted is rewritten.
+    Only the first day of a (material, branch) carries an opening.
+    """
+    posted = dict(
+        StockMovement.objects
+        .filter(daily_record=record)
+        .values_list("movement_type")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+
+    targets = {
+        "opening": (record.opening_balance or ZERO) if is_first else ZERO,
+        "in": record.raw_in or ZERO,
+        "out": -(record.total_shift_output or ZERO),
+    }
+
+    movements = []
+    for movement_type, target in targets.items():
+        delta = target - posted.get(movement_type, ZERO)
+        if delta:
+            movements.append(StockMovement(
+                company_id=record.company_id,
+                branch_id=record.branch_id,
+                material_id=record.material_id,
+                daily_record=record,
+                date=record.date,
+                movement_type=movement_type,
+                quantity=delta,
+            ))
+
+    _post(movements)
+
+
+def rebalance_after(record, exclude_id=None):
+    """
+    Re-derive opening and closing of every later day of the record's
+    (material, branch) from its closing, using a running sum window.
+    `exclude_id` leaves out a row being moved away.
+    """
+    days = DailyInventory.objects.filter(date__gt=record.date, **_key_filter(record)).exclude(pk=exclude_id)
+
+    # locked first, as FOR UPDATE cannot go with the window: the analytics
+    # deltas below are taken from the values read here
+    if not list(days.select_for_update().values_list("pk", flat=True)):
+        return
+
+    later = list(
+        days
+        .annotate(
+            running=Window(
+                Sum(F("raw_in") - F("total_shift_output")),
+                order_by=F("date").asc(),
+            )
+        )
+        .order_by("date")
+    )
+
+    if not later:
+        return
+
+    # the old first day may have carried the ledger's opening movement
+    if later[0].movements.filter(movement_type="opening").exists():
+        sync_movements(later[0], is_first=False)
+
+    stale = []
+    for day in later:
+        closing = record.closing_balance + day.running
+        opening = closing - (day.raw_in - day.total_shift_output)
+
+        if day.opening_balance != opening or day.closing_balance != closing:
+            delta = {
+                "total_opening": opening - day.opening_balance,
+                "total_closing": closing - day.closing_balance,
+                "total_waste": (opening - day.opening_balance) - (closing - day.closing_balance),
+            }
+            day.opening_balance = opening
+            day.closing_balance = closing
+            stale.append((day, delta))
+
+    # a closed month's figures are final; the caller's transaction rolls back
+    if stale and locked_periods((day.company_id, day.date) for day, _ in stale):
+        raise ValidationError(
+            "This change would alter opening balances in a locked accounting period."
+        )
+
+    DailyInventory.objects.bulk_update(
+        [day for day, _ in stale],
+        ["opening_balance", "closing_balance"],
+        batch_size=500,
+    )
+
+    # bulk_update sends no signals
+    for day, delta in stale:
+        apply_delta(analytics_key(day), delta)
+
+
+def post_daily_record(record, is_first, exclude_id=None):
+    """
+    Ledger side of DailyInventory.save: post the record's movements and
+    roll the change forward into the later days.
+    """
+    sync_movements(record, is_first)
+    rebalance_after(record, exclude_id)
+
+
+def reverse_daily_record(record):
+    """
+    Before a daily record is deleted: post the opposite of everything
+    it posted.
+    """
+    totals = (
+        StockMovement.objects
+        .filter(daily_record=record)
+        .values_list("movement_type")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+
+    _post([
+        StockMovement(
+            company_id=record.company_id,
+            branch_id=record.branch_id,
+            material_id=record.material_id,
+            date=record.date,
+            movement_type="adjustment",
+            quantity=-total,
+        )
+        for _, total in totals
+        if total
+    ])
+
+
+def close_gap(record, exclude_id=None):
+    """
+    After a daily record is deleted: the days after it now follow the
+    previous day, or the next day becomes the (material, branch)'s first.
+    `exclude_id` leaves out a row being moved away.
+    """
+    previous = (
+        DailyInventory.objects
+        .filter(date__lt=record.date, **_key_filter(record))
+        .exclude(pk=exclude_id)
+        .order_by("-date")
+        .first()
+    )
+    if previous is not None:
+        rebalance_after(previous, exclude_id)
+        return
+
+    following = (
+        DailyInventory.objects
+        .filter(date__gt=record.date, **_key_filter(record))
+        .exclude(pk=exclude_id)
+        .order_by("date")
+        .first()
+    )
+    if following is not None:
+        post_daily_record(following, is_first=True, exclude_id=exclude_id)
+
+
+def unpost_daily_record(old):
+    """
+    A daily record moved to another company, (material, branch) or
+    date; `old` holds its previous key. Reverse what it posted there,
+    detach those movements from it and close the gap it leaves, so the
+    record can be posted afresh under its new key.
+    """
+    reverse_daily_record(old)
+    StockMovement.objects.filter(daily_record_id=old.pk).update(daily_record=None)
+    close_gap(old, exclude_id=old.pk)
+
+
+def _movement(record, movement_type, quantity):
+    return StockMovement(
+        company_id=record.company_id,
+        branch_id=record.branch_id,
+        material_id=record.material_id,
+        daily_record=record,
+        date=record.date,
+        movement_type=movement_type,
+        quantity=quantity,
+    )
+
+
+@transaction.atomic
+def rebuild_ledger(*, company_id):
+    """
+    Re-derive the opening and closing of every daily record of a company
+    from the day before it and repost its StockMovement ledger from the
+    records, e.g. when WAREHOUSE_LEDGER_MODE is turned on for existing
+    data. An opening that differs from the derived one moves into
+    variance. Days in locked periods keep their figures; adjustments
+    carry the ledger to their opening and closing instead.
+
+    Returns the number of records whose balances changed.
+    """
+    locked = set(
+        AccountingPeriod.objects
+        .filter(company_id=company_id, is_locked=True)
+        .values_list("year", "month")
+    )
+
+    changed, movements = [], []
+    key, balance = None, ZERO
+
+    records = DailyInventory.objects.filter(company_id=company_id).order_by("material_id", "branch_id", "date")
+    for record in records.iterator(chunk_size=2000):
+        opening = record.opening_balance or ZERO
+        used = record.calculate_totals()[0]
+        is_locked = (record.date.year, record.date.month) in locked
+
+        if (record.material_id, record.branch_id) != key:
+            # the first day of a (material, branch) opens its ledger
+            key = (record.material_id, record.branch_id)
+            if opening:
+                movements.append(_movement(record, "opening", opening))
+        elif opening != balance:
+            if is_locked:
+                movements.append(_movement(record, "adjustment", opening - balance))
+            else:
+                record.variance = opening - balance
+                opening = balance
+
+        if record.raw_in:
+            movements.append(_movement(record, "in", record.raw_in))
+        if used:
+            movements.append(_movement(record, "out", -used))
+        balance = opening + (record.raw_in or ZERO) - used
+
+        if is_locked:
+            if record.closing_balance != balance:
+                movements.append(_movement(record, "adjustment", record.closing_balance - balance))
+                balance = record.closing_balance
+        elif (opening, balance, used) != (record.opening_balance, record.closing_balance, record.total_shift_output):
+            record.opening_balance = opening
+            record.closing_balance = balance
+            record.total_shift_output = used
+            changed.append(record)
+
+    DailyInventory.objects.bulk_update(
+        changed,
+        ["opening_balance", "closing_balance", "total_shift_output", "variance"],
+        batch_size=500,
+    )
+
+    StockSnapshot.objects.filter(company_id=company_id).delete()
+    StockMovement.objects.filter(company_id=company_id).delete()
+    StockMovement.objects.bulk_create(movements, batch_size=2000)
+
+    recompute_analytics(company_id=company_id)
+    return len(changed)
+
+
+def _stock_as_of(on, filters):
+    """
+    {(material_id, branch_id): [company_id, balance]}, see balances_as_of.
+    """
+    stock = {}
+    since = {}
+    # company -> earliest snapshot used; snapshots are taken per company
+    # for every key at once, so older movements are all accounted for
+    cutoffs = {}
+
+    snapshots = (
+        StockSnapshot.objects
+        .filter(date__lte=on, **filters)
+        .order_by("material_id", "branch_id", "-date")
+        .values_list("material_id", "branch_id", "company_id", "date", "balance")
+    )
+    for material_id, branch_id, company_id, snapshot_date, balance in snapshots:
+        key = (material_id, branch_id)
+        if key not in since:
+            since[key] = snapshot_date
+            stock[key] = [company_id, balance]
+            cutoffs[company_id] = min(snapshot_date, cutoffs.get(company_id, snapshot_date))
+
+    movements = StockMovement.objects.filter(date__lte=on, **filters)
+    if cutoffs:
+        after_snapshots = ~Q(company_id__in=[c for c in cutoffs if c is not None])
+        if None in cutoffs:
+            after_snapshots &= Q(company_id__isnull=False)
+        for company_id, cutoff in cutoffs.items():
+            after_snapshots |= Q(company_id=company_id, date__gt=cutoff)
+        movements = movements.filter(after_snapshots)
+
+    daily = (
+        movements
+        .values_list("material_id", "branch_id", "company_id", "date")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+    for material_id, branch_id, company_id, movement_date, total in daily:
+        key = (material_id, branch_id)
+        if key in since and movement_date <= since[key]:
+            continue
+        entry = stock.setdefault(key, [company_id, ZERO])
+        entry[1] += total
+
+    return stock
+
+
+def balances_as_of(on, **filters):
+    """
+    {(material_id, branch_id): stock on hand at the end of `on`}.
+
+    Starts from each key's latest snapshot on or before `on` and adds
+    only the movements after it, so the cost depends on the snapshot
+    interval, not on how much history there is. `filters` narrow the
+    keys (company_id=..., material_id=..., branch_id=...).
+    """
+    return {key: balance for key, (_, balance) in _stock_as_of(on, filters).items()}
+
+
+def stock_as_of(*, material_id, branch_id, on, **filters):
+    return balances_as_of(on, material_id=material_id, branch_id=branch_id, **filters).get(
+        (material_id, branch_id), ZERO
+    )
+
+
+def ledger_entries(*, material_id, branch_id, start, end, **filters):
+    """
+    Movements of one (material, branch) in [start, end], each with the
+    running balance after it, plus the opening balance of the window.
+    """
+    opening = stock_as_of(
+        material_id=material_id,
+        branch_id=branch_id,
+        on=start - timedelta(days=1),
+        **filters,
+    )
+
+    rows = (
+        StockMovement.objects
+        .filter(material_id=material_id, branch_id=branch_id, date__range=(start, end), **filters)
+        .annotate(
+            running=Window(
+                Sum("quantity"),
+                order_by=[F("date").asc(), F("id").asc()],
+            )
+        )
+        .order_by("date", "id")
+        .values("id", "date", "movement_type", "quantity", "running")
+    )
+
+    entries = [
+        {**row, "balance": opening + row.pop("running")}
+        for row in rows
+    ]
+    return opening, entries
+
+
+def take_snapshots(on, company_ids=None):
+    """
+    Snapshot every (material, branch) with stock history at the end of
+    `on`, built from the previous snapshots plus the movements since.
+    Replaces snapshots already taken for that date.
+    Returns the number written.
+    """
+    filters = {"company_id__in": company_ids} if company_ids is not None else {}
+
+    stock = _stock_as_of(on, filters)
+
+    with transaction.atomic():
+        StockSnapshot.objects.filter(date=on, **filters).delete()
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(
+                    company_id=company_id,
+                    material_id=material_id,
+                    branch_id=branch_id,
+                    date=on,
+                    balance=balance,
+                )
+                for (material_id, branch_id), (company_id, balance) in stock.items()
+            ],
+            batch_size=1000,
+        )
+
+    return len(stock)
@@ -0,0 +1,122 @@
+import time
+from functools import lru_cache
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from cores.utils.cache import cache_is_shared
+from warehouse.models import Material
+
+VERSION_KEY = "warehouse:materials:version"
+
+# a loaded catalog is reloaded after this long even without a bump,
+# which bounds what a change that skipped invalidate_materials can cost
+CATALOG_TTL = 60 * 5
+
+# how often a process re-reads the catalog version; between checks a
+# lookup costs no query at all
+VERSION_CHECK_INTERVAL = 10
+
+CATALOG_FIELDS = ("id", "name", "category", "unit", "status", "reorder_point", "lead_time_days")
+
+
+def _table_version():
+    """
+    Version read from the table itself: changes whenever a material is
+    added, deleted or saved.
+    """
+    stats = Material.objects.aggregate(count=Count("id"), changed=Max("updated_at"))
+    changed = stats["changed"].timestamp() if stats["changed"] else 0
+    return "{}-{}".format(stats["count"], int(changed * 1000000))
+
+
+def _read_version():
+    if not cache_is_shared():
+        # a bump in a process-local cache would not reach the other workers
+        return _table_version()
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # time based, so a lost version key never brings back an old catalog
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+# (version, monotonic time it was read) for this process
+_checked_version = (None, float("-inf"))
+
+
+def catalog_version():
+    """
+    Current catalog version, read at most every VERSION_CHECK_INTERVAL
+    seconds per process.
+    """
+    global _checked_version
+
+    version, checked_at = _checked_version
+    now = time.monotonic()
+    if now - checked_at >= VERSION_CHECK_INTERVAL:
+        version = _read_version()
+        _checked_version = (version, now)
+    return version
+
+
+def invalidate_materials():
+    """
+    A material was created, changed, approved or deleted: this process
+    reloads the catalog on its next lookup, the others once their
+    version check is due.
+    """
+    global _checked_version
+
+    _checked_version = (None, float("-inf"))
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), None)
+
+
+@lru_cache(maxsize=4)
+def _load_catalog(version, period):
+    """
+    (by_id, by_key) for one catalog version: id -> material values,
+    (name, category) -> id. One query; each process keeps its own copy
+    for at most CATALOG_TTL (`period` is the TTL window).
+    """
+    by_id = {row["id"]: MappingProxyType(row) for row in Material.objects.values(*CATALOG_FIELDS)}
+    by_key = {(row["name"], row["category"]): material_id for material_id, row in by_id.items()}
+    return MappingProxyType(by_id), MappingProxyType(by_key)
+
+
+def material_catalog():
+    return _load_catalog(catalog_version(), int(time.time() // CATALOG_TTL))
+
+
+def get_material(material_id):
+    """
+    Cached values of one material, or None.
+    """
+    by_id, _ = material_catalog()
+    return by_id.get(material_id)
+
+
+def material_names(ids):
+    by_id, _ = material_catalog()
+    return {material_id: by_id[material_id]["name"] for material_id in ids if material_id in by_id}
+
+
+def resolve_material(name, category, *, defaults=None):
+    """
+    Id of the material named `name` in `category`, created with
+    `defaults` if it does not exist. Known materials cost no query
+    between version checks.
+    """
+    _, by_key = material_catalog()
+    material_id = by_key.get((name, category))
+    if material_id is not None:
+        return material_id
+
+    material, _ = Material.objects.get_or_create(name=name, category=category, defaults=defaults or {})
+    return material.pk
@@ -0,0 +1,219 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.lookups import IsNull
+
+from warehouse.models import DailyInventory, InventoryDiscrepancy
+
+DEFAULT_TOLERANCE = 0.01
+
+COLUMNS = [
+    "id", "company_id", "branch_id", "material_id", "date",
+    "opening_balance", "raw_in", "total_shift_output",
+    "closing_balance", "reported_closing", "variance",
+]
+AMOUNTS = [
+    "opening_balance", "raw_in", "total_shift_output",
+    "closing_balance", "reported_closing", "variance",
+]
+
+
+def load_frame(start, end, **filters):
+    """
+    One query for the range, plus one for the closing just before the
+    range of each (material, branch) whose first day in it has history.
+    """
+    records = (
+        DailyInventory.objects
+        .filter(date__range=(start, end), **filters)
+        .order_by("material_id", "branch_id", "date")
+        .values_list(*COLUMNS)
+    )
+
+    frame = pd.DataFrame.from_records(list(records), columns=COLUMNS)
+    if frame.empty:
+        frame["previous_closing"] = pd.Series(dtype=float)
+        return frame
+
+    frame[AMOUNTS] = frame[AMOUNTS].astype(float)
+
+    # branch_id may be None (company-level records); keep those rows in
+    # their own group per company
+    frame["company_key"] = frame["company_id"].fillna(-1)
+    frame["branch_key"] = frame["branch_id"].fillna(-1)
+    group = frame.groupby(["company_key", "material_id", "branch_key"], sort=False)
+
+    frame["previous_closing"] = group["closing_balance"].shift(1)
+
+    first_ids = frame.loc[group.cumcount() == 0, "id"].tolist()
+    before = dict(
+        DailyInventory.objects
+        .filter(id__in=first_ids)
+        .annotate(previous=Subquery(
+            DailyInventory.objects
+            .filter(
+                # a plain branch_id=OuterRef(...) never matches NULL
+                Q(branch_id=OuterRef("branch_id")) | Q(IsNull(F("branch_id"), True), IsNull(OuterRef("branch_id"), True)),
+                company_id=OuterRef("company_id"),
+                material_id=OuterRef("material_id"),
+                date__lt=OuterRef("date"),
+            )
+            .order_by("-date")
+            .values("closing_balance")[:1]
+        ))
+        .values_list("id", "previous")
+    )
+
+    first = frame["id"].isin(first_ids)
+    frame.loc[first, "previous_closing"] = (
+        frame.loc[first, "id"].map(before).astype(float)
+    )
+
+    return frame.drop(columns=["company_key", "branch_key"])
+
+
+def find_discrepancies(frame, tolerance=DEFAULT_TOLERANCE):
+    """
+    Vectorized checks over the frame from load_frame:
+
+    - closing: the reported closing against opening + raw_in - shifts
+    - opening: the opening against the previous day's closing. In
+      ledger mode the opening is derived and the gap to what was entered
+      is kept in `variance`, so that is added in; outside ledger mode
+      variance is 0.
+
+    Returns a frame with one row per discrepancy.
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=["id", "kind", "expected", "actual", "difference"])
+
+    computed = frame["opening_balance"] + frame["raw_in"] - frame["total_shift_output"]
+    closing_gap = frame["reported_closing"] - computed
+
+    entered_opening = frame["opening_balance"] + frame["variance"]
+    opening_gap = entered_opening - frame["previous_closing"]
+
+    checks = [
+        ("closing", computed, frame["reported_closing"], closing_gap),
+        ("opening", frame["previous_closing"], entered_opening, opening_gap),
+    ]
+
+    found = []
+    for kind, expected, actual, gap in checks:
+        # NaN (nothing reported / no previous day) never compares greater
+        flagged = np.abs(gap.to_numpy()) > tolerance
+        found.append(pd.DataFrame({
+            "id": frame["id"][flagged],
+            "company_id": frame["company_id"][flagged],
+            "branch_id": frame["branch_id"][flagged],
+            "material_id": frame["material_id"][flagged],
+            "date": frame["date"][flagged],
+            "kind": kind,
+            "expected": expected[flagged].round(2),
+            "actual": actual[flagged].round(2),
+            "difference": gap[flagged].round(2),
+        }))
+
+    return pd.concat(found, ignore_index=True)
+
+
+def _decimal(value):
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def reconcile(*, start, end, tolerance=DEFAULT_TOLERANCE, **filters):
+    """
+    Check every daily record in [start, end] (narrowed by `filters`,
+    e.g. company_id / branch_id), store what is flagged as
+    InventoryDiscrepancy rows and drop unresolved ones that no longer
+    apply. Returns the discrepancies frame.
+    """
+    frame = load_frame(start, end, **filters)
+    found = find_discrepancies(frame, tolerance)
+
+    rows = [
+        InventoryDiscrepancy(
+            company_id=None if pd.isna(row.company_id) else int(row.company_id),
+            branch_id=None if pd.isna(row.branch_id) else int(row.branch_id),
+            material_id=int(row.material_id),
+            daily_record_id=int(row.id),
+            date=row.date,
+            kind=row.kind,
+            expected=_decimal(row.expected),
+            actual=_decimal(row.actual),
+            difference=_decimal(row.difference),
+        )
+        for row in found.itertuples(index=False)
+    ]
+
+    with transaction.atomic():
+        # a resolved discrepancy stays resolved only while its figures hold
+        resolved = {
+            (record_id, kind): figures
+            for record_id, kind, *figures in (
+                InventoryDiscrepancy.objects
+                .filter(daily_record_id__in=[row.daily_record_id for row in rows], resolved=True)
+                .values_list("daily_record_id", "kind", "expected", "actual", "difference")
+            )
+        }
+        for row in rows:
+            row.resolved = resolved.get((row.daily_record_id, row.kind)) == [row.expected, row.actual, row.difference]
+
+        stale = InventoryDiscrepancy.objects.filter(
+            daily_record_id__in=frame["id"].tolist() if not frame.empty else [],
+            resolved=False,
+        )
+        for kind in ("closing", "opening"):
+            stale = stale.exclude(
+                kind=kind,
+                daily_record_id__in=found.loc[found["kind"] == kind, "id"].tolist(),
+            )
+        stale.delete()
+
+        InventoryDiscrepancy.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["daily_record", "kind"],
+            update_fields=["expected", "actual", "difference", "resolved", "detected_at"],
+        )
+
+    return found
+
+
+def summarize(found):
+    """
+    JSON-friendly report of a reconcile() result.
+    """
+    if found.empty:
+        return {"count": 0, "by_kind": {}, "discrepancies": []}
+
+    by_kind = (
+        found.groupby("kind")["difference"]
+        .agg(count="count", total="sum", largest=lambda gap: gap.abs().max())
+        .round(2)
+    )
+
+    return {
+        "count": int(len(found)),
+        "by_kind": {
+            kind: {key: (int(value) if key == "count" else float(value)) for key, value in stats.items()}
+            for kind, stats in by_kind.to_dict("index").items()
+        },
+        "discrepancies": [
+            {
+                "daily_record": int(row.id),
+                "material": int(row.material_id),
+                "branch": None if pd.isna(row.branch_id) else int(row.branch_id),
+                "date": row.date,
+                "kind": row.kind,
+                "expected": float(row.expected),
+                "actual": float(row.actual),
+                "difference": float(row.difference),
+            }
+            for row in found.sort_values(["date", "material_id"]).itertuples(index=False)
+        ],
+    }
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.utils.timezone import now
+
+from accounts.models import User
+from notifications.models import Notification
+from notifications.services import make_dedupe_key, send_notifications
+from warehouse.models import DailyInventory
+
+# days of history the consumption rate is averaged over
+CONSUMPTION_WINDOW_DAYS = 28
+
+# the same material / branch is not alerted twice within this window
+REORDER_ALERT_WINDOW = timedelta(hours=24)
+
+# companies evaluated together by one raise_reorder_alerts call
+REORDER_CHUNK_SIZE = 500
+
+COLUMNS = [
+    "company_id", "branch_id", "material_id", "date",
+    "total_shift_output", "closing_balance",
+    "material__name", "material__unit", "material__reorder_point",
+    "material__lead_time_days", "branch__name",
+]
+KEYS = ["company_id", "branch_id", "material_id"]
+
+
+def reorder_status(*, on=None, window_days=CONSUMPTION_WINDOW_DAYS, **filters):
+    """
+    One row per (company, branch, material) with a reorder point and
+    daily records in the `window_days` up to `on`:
+
+    - closing_balance: closing of the latest day in the window
+    - daily_consumption: average total_shift_output over those days
+    - projected: closing less what is consumed over the lead time
+    - needs_reorder: projected at or below the reorder point
+
+    One query for the window; the rest runs on the frame, so the cost
+    grows with the number of records, not with queries per material.
+    `filters` narrow the records (company_id__in=..., branch_id=...).
+    """
+    on = on or now().date()
+
+    records = (
+        DailyInventory.objects
+        .filter(
+            date__range=(on - timedelta(days=window_days - 1), on),
+            material__reorder_point__isnull=False,
+            **filters,
+        )
+        .order_by(*KEYS, "date")
+        .values_list(*COLUMNS)
+    )
+
+    frame = pd.DataFrame.from_records(list(records), columns=COLUMNS)
+    if frame.empty:
+        return frame.reindex(columns=KEYS + [
+            "date", "material_name", "unit", "branch_name", "reorder_point", "lead_time_days",
+            "closing_balance", "daily_consumption", "days_of_cover", "projected", "needs_reorder",
+        ])
+
+    frame[["total_shift_output", "closing_balance", "material__reorder_point"]] = (
+        frame[["total_shift_output", "closing_balance", "material__reorder_point"]].astype(float)
+    )
+
+    status = (
+        frame.groupby(KEYS, sort=False, dropna=False)
+        .agg(
+            date=("date", "last"),
+            material_name=("material__name", "first"),
+            unit=("material__unit", "first"),
+            branch_name=("branch__name", "first"),
+            reorder_point=("material__reorder_point", "first"),
+            lead_time_days=("material__lead_time_days", "first"),
+            closing_balance=("closing_balance", "last"),
+            daily_consumption=("total_shift_output", "mean"),
+        )
+        .reset_index()
+    )
+
+    rate = status["daily_consumption"].to_numpy()
+    closing = status["closing_balance"].to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        status["days_of_cover"] = np.where(rate > 0, np.clip(closing, 0, None) / rate, np.nan)
+
+    status["projected"] = closing - rate * status["lead_time_days"].to_numpy()
+    status["needs_reorder"] = status["projected"].to_numpy() <= status["reorder_point"].to_numpy()
+
+    return status
+
+
+def _optional_int(value):
+    return None if pd.isna(value) else int(value)
+
+
+def _optional_float(value):
+    return None if pd.isna(value) else round(float(value), 2)
+
+
+def status_records(status):
+    """
+    JSON-friendly rows of a reorder_status() frame, lowest cover first.
+    """
+    rows = status.sort_values(["needs_reorder", "days_of_cover"], ascending=[False, True], na_position="last")
+
+    return [
+        {
+            "material": int(row.material_id),
+            "material_name": row.material_name,
+            "unit": row.unit,
+            "branch": _optional_int(row.branch_id),
+            "branch_name": row.branch_name,
+            "date": row.date,
+            "closing_balance": _optional_float(row.closing_balance),
+            "daily_consumption": _optional_float(row.daily_consumption),
+            "days_of_cover": _optional_float(row.days_of_cover),
+            "reorder_point": _optional_float(row.reorder_point),
+            "lead_time_days": int(row.lead_time_days),
+            "needs_reorder": bool(row.needs_reorder),
+        }
+        for row in rows.itertuples(index=False)
+    ]
+
+
+def _reorder_notification(user_id, row):
+    where = f" at {row.branch_name}" if row.branch_name else ""
+    cover = (
+        f"about {row.days_of_cover:.0f} day(s) of cover"
+        if not pd.isna(row.days_of_cover) else "no recent consumption"
+    )
+
+    return Notification(
+        user_id=user_id,
+        company_id=_optional_int(row.company_id),
+        title=f"Reorder {row.material_name}",
+        message=(
+            f"{row.material_name}{where}: {row.closing_balance:.2f} {row.unit} on hand, "
+            f"{cover}; reorder point {row.reorder_point:.2f}."
+        ),
+        notification_type="warning",
+        module="warehouse",
+        object_id=int(row.material_id),
+        # per material and branch, whatever the figures in the message
+        dedupe_key=make_dedupe_key("warehouse", int(row.material_id), f"reorder:{_optional_int(row.branch_id)}"),
+    )
+
+
+def raise_reorder_alerts(company_ids, *, on=None):
+    """
+    Evaluate every material of a batch of companies and notify their
+    warehouse staff of what needs reordering: users with a branch
+    about that branch, users without one about the whole company.
+    Repeats within REORDER_ALERT_WINDOW are dropped.
+
+    Returns the number of notifications sent.
+    """
+    company_ids = list(company_ids)
+    if not company_ids:
+        return 0
+
+    status = reorder_status(on=on, company_id__in=company_ids)
+    low = status[status["needs_reorder"].astype(bool)] if not status.empty else status
+    if low.empty:
+        return 0
+
+    recipients = {}
+    for user_id, company_id, branch_id in (
+        User.objects
+        .filter(role="warehouse", is_active=True, company_id__in={int(c) for c in low["company_id"]})
+        .values_list("id", "company_id", "branch_id")
+    ):
+        recipients.setdefault(company_id, []).append((user_id, branch_id))
+
+    notifications = [
+        _reorder_notification(user_id, row)
+        for row in low.itertuples(index=False)
+        for user_id, branch_id in recipients.get(_optional_int(row.company_id), ())
+        if branch_id is None or branch_id == _optional_int(row.branch_id)
+    ]
+
+    return len(send_notifications(notifications, dedupe_window=REORDER_ALERT_WINDOW))
@@ -1,54 +1,71 @@
-from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from django.db.models import Sum
-from .models import DailyInventory, WarehouseAnalytics
+from .models import DailyInventory, Material
+from .services.analytics import analytics_key, contribution, record_changed
+from .services.ledger import close_gap, reverse_daily_record
+from .services.materials import invalidate_materials
 
 
-def update_warehouse_analytics( date,):
+def _stored_analytics(instance):
     """
-    Helper function to update or create WarehouseAnalytics for a given warehouse and date.
+    (key, contribution) of the row as stored, None if it is not stored.
+    Read under a row lock held until the save or delete commits, so
+    concurrent edits of one row apply their deltas one after another.
     """
-    # Get all inventory entries for that warehouse & date
-    records = DailyInventory.objects.filter( date=date,)
-
-    # Aggregate totals
-    totals = records.aggregate(
-        total_raw_in=Sum("raw_in") or 0,
-        total_output=Sum("shift_1") + Sum("shift_2") + Sum("shift_3"),
-        total_waste=Sum("opening_balance") + Sum("raw_in") - Sum("closing_balance"),
-    )
-
-    # Handle None values safely
-    total_raw_in = totals["total_raw_in"] or 0
-    total_output = totals["total_output"] or 0
-    total_waste = totals["total_waste"] or 0
-
-    # Update or create analytics record
-    analytics, created = WarehouseAnalytics.objects.update_or_create(
-        
-        date=date,
-        defaults={
-            "total_raw_in": total_raw_in,
-            "total_output": total_output,
-            "total_waste": total_waste,
-        },
-    )
-
-    # Efficiency is auto-calculated in model.save()
-    analytics.save()
+    if instance.pk is None:
+        return None
+
+    stored = DailyInventory.objects.select_for_update().filter(pk=instance.pk).first()
+    return stored._loaded_analytics if stored is not None else None
+
+
+@receiver(pre_save, sender=DailyInventory)
+def remember_analytics_contribution(sender, instance, **kwargs):
+    instance._analytics_before = None if instance._state.adding else _stored_analytics(instance)
 
 
 @receiver(post_save, sender=DailyInventory)
 def update_analytics_on_save(sender, instance, **kwargs):
     """
-    Trigger analytics update whenever a DailyInventory is created or updated.
+    Move the row's contribution to WarehouseAnalytics by its delta.
     """
-    update_warehouse_analytics( instance.date,)
+    before = getattr(instance, "_analytics_before", None)
+    after = (analytics_key(instance), contribution(instance))
+
+    record_changed(*(before or (None, None)), *after)
+
+    instance._loaded_analytics = after
+
+
+@receiver(pre_delete, sender=DailyInventory)
+def remember_analytics_on_delete(sender, instance, **kwargs):
+    instance._analytics_before = _stored_analytics(instance)
 
 
 @receiver(post_delete, sender=DailyInventory)
 def update_analytics_on_delete(sender, instance, **kwargs):
     """
-    Trigger analytics recalculation when a DailyInventory is deleted.
+    Take the deleted row's contribution back out of WarehouseAnalytics.
     """
-    update_warehouse_analytics( instance.date,)
+    stored = getattr(instance, "_analytics_before", None)
+    if stored is not None:
+        record_changed(*stored, None, None)
+
+
+@receiver(pre_delete, sender=DailyInventory)
+def reverse_ledger_on_delete(sender, instance, **kwargs):
+    if settings.WAREHOUSE_LEDGER_MODE:
+        reverse_daily_record(instance)
+
+
+@receiver(post_delete, sender=DailyInventory)
+def rebalance_ledger_on_delete(sender, instance, **kwargs):
+    if settings.WAREHOUSE_LEDGER_MODE:
+        close_gap(instance)
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+def invalidate_material_catalog(sender, instance, **kwargs):
+    invalidate_materials()
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+from celery import group, shared_task
+
+from cores.models import Company
+from .services.analytics import recompute_analytics
+from .services.ledger import take_snapshots
+from .services.reorder import REORDER_CHUNK_SIZE, raise_reorder_alerts
+
+
+@shared_task
+def snapshot_stock(on=None):
+    """
+    Month-end stock snapshots; run on the 1st for the month just closed.
+    `on` is an ISO date to (re)take a specific day.
+    """
+    if on is None:
+        on = date.today().replace(day=1) - timedelta(days=1)
+    else:
+        on = date.fromisoformat(on)
+
+    return take_snapshots(on)
+
+
+@shared_task
+def recompute_warehouse_analytics():
+    """
+    Nightly: rebuild WarehouseAnalytics from the daily records, so any
+    drift of the per-save delta updates does not outlive a day.
+    """
+    company_ids = [*Company.objects.order_by("id").values_list("id", flat=True), None]
+
+    return sum(recompute_analytics(company_id=company_id) for company_id in company_ids)
+
+
+@shared_task
+def check_reorder_points():
+    """
+    Daily: evaluate every tenant's materials against their reorder points.
+    """
+    company_ids = list(
+        Company.objects.order_by("id").values_list("id", flat=True)
+    )
+
+    chunks = [
+        company_ids[i:i + REORDER_CHUNK_SIZE]
+        for i in range(0, len(company_ids), REORDER_CHUNK_SIZE)
+    ]
+
+    group(
+        check_company_reorder_points.s(chunk) for chunk in chunks
+    ).apply_async()
+
+
+@shared_task
+def check_company_reorder_points(company_ids):
+    return raise_reorder_alerts(company_ids)
@@ -1,3 +1,240 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from cores.models import Branch, Company
+from warehouse.models import DailyInventory, InventoryDiscrepancy, Material, WarehouseAnalytics
+from warehouse.services.analytics import recompute_analytics
+from warehouse.services.ledger import stock_as_of
+
+
+class WarehouseTestCase(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Mill Co")
+        self.branch = Branch.objects.create(company=self.company, name="Main", location="Town")
+        self.admin = User.objects.create_user(username="admin", password="x", role="admin", company=self.company)
+        self.material = Material.objects.create(name="Maize", category="raw_material")
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def record(self, day, opening=0, raw_in=0, shift_1=0, branch=None):
+        return DailyInventory.objects.create(
+            company=self.company,
+            branch=branch,
+            material=self.material,
+            date=day,
+            opening_balance=opening,
+            raw_in=raw_in,
+            shift_1=shift_1,
+        )
+
+    def chain(self, branch):
+        return list(
+            DailyInventory.objects
+            .filter(branch=branch, material=self.material)
+            .order_by("date")
+            .values_list("date", "opening_balance", "closing_balance")
+        )
+
+
+@override_settings(WAREHOUSE_LEDGER_MODE=True)
+class LedgerRebalancingTests(WarehouseTestCase):
+    """
+    In ledger mode openings are the previous day's closing, and every
+    later day is rebalanced when an earlier one changes or moves.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.other = Branch.objects.create(company=self.company, name="Depot", location="City")
+
+        self.record(date(2026, 1, 1), opening=100, shift_1=10, branch=self.branch)        # closes 90
+        self.moved = self.record(date(2026, 1, 2), raw_in=5, shift_1=12, branch=self.branch)  # 83
+        self.record(date(2026, 1, 3), shift_1=16, branch=self.branch)                     # 67
+        self.record(date(2026, 1, 4), opening=50, branch=self.other)
+
+    def test_openings_follow_the_previous_closing(self):
+        self.assertEqual(self.chain(self.branch), [
+            (date(2026, 1, 1), Decimal("100.00"), Decimal("90.00")),
+            (date(2026, 1, 2), Decimal("90.00"), Decimal("83.00")),
+            (date(2026, 1, 3), Decimal("83.00"), Decimal("67.00")),
+        ])
+        self.assertEqual(stock_as_of(material_id=self.material.pk, branch_id=self.branch.pk, on=date(2026, 2, 1)), 67)
+
+    def test_editing_an_earlier_day_rebalances_the_later_ones(self):
+        first = DailyInventory.objects.get(branch=self.branch, date=date(2026, 1, 1))
+        first.shift_1 = Decimal("20")
+        first.save()
+
+        self.assertEqual(
+            [closing for _, _, closing in self.chain(self.branch)],
+            [Decimal("80.00"), Decimal("73.00"), Decimal("57.00")],
+        )
+        self.assertEqual(stock_as_of(material_id=self.material.pk, branch_id=self.branch.pk, on=date(2026, 2, 1)), 57)
+
+    def test_moving_a_day_to_another_branch_rebalances_both(self):
+        moved = DailyInventory.objects.get(pk=self.moved.pk)
+        moved.branch = self.other
+        moved.date = date(2026, 1, 5)
+        moved.save()
+
+        self.assertEqual(self.chain(self.branch), [
+            (date(2026, 1, 1), Decimal("100.00"), Decimal("90.00")),
+            (date(2026, 1, 3), Decimal("90.00"), Decimal("74.00")),
+        ])
+        self.assertEqual(self.chain(self.other), [
+            (date(2026, 1, 4), Decimal("50.00"), Decimal("50.00")),
+            (date(2026, 1, 5), Decimal("50.00"), Decimal("43.00")),
+        ])
+        self.assertEqual(stock_as_of(material_id=self.material.pk, branch_id=self.other.pk, on=date(2026, 2, 1)), 43)
+
+    def test_deleting_a_day_closes_the_gap(self):
+        DailyInventory.objects.get(pk=self.moved.pk).delete()
+
+        self.assertEqual(self.chain(self.branch)[-1], (date(2026, 1, 3), Decimal("90.00"), Decimal("74.00")))
+
+
+class AnalyticsDeltaTests(WarehouseTestCase):
+    """
+    WarehouseAnalytics is kept current by deltas; it must always match
+    a full recompute from the records.
+    """
+
+    def snapshot(self):
+        return list(
+            WarehouseAnalytics.objects
+            .filter(company=self.company)
+            .order_by("date")
+            .values_list("date", "total_raw_in", "total_opening", "total_closing", "record_count")
+        )
+
+    def assert_matches_recompute(self):
+        live = self.snapshot()
+        recompute_analytics(company_id=self.company.pk)
+        self.assertEqual(live, self.snapshot())
+
+    def test_create_edit_and_delete(self):
+        first = self.record(date(2026, 1, 1), opening=10, raw_in=5, branch=self.branch)
+        second = self.record(date(2026, 1, 2), opening=10, raw_in=5, branch=self.branch)
+        self.assert_matches_recompute()
+
+        second.raw_in = Decimal("50")
+        second.save()
+        self.assert_matches_recompute()
+
+        first.delete()
+        self.assert_matches_recompute()
+        self.assertEqual([row[0] for row in self.snapshot()], [date(2026, 1, 2)])
+
+    def test_stale_copy_applies_its_delta_against_the_stored_row(self):
+        record = self.record(date(2026, 1, 1), opening=10, raw_in=5, branch=self.branch)
+        stale = DailyInventory.objects.get(pk=record.pk)
+
+        fresh = DailyInventory.objects.get(pk=record.pk)
+        fresh.raw_in = Decimal("50")
+        fresh.save()
+
+        stale.shift_1 = Decimal("1")
+        stale.save()
+
+        self.assert_matches_recompute()
+
+
+class ReconciliationTests(WarehouseTestCase):
+
+    def reconcile(self, **body):
+        return self.client.post(
+            "/api/warehouse/dailyinventory/reconcile/",
+            {"start_date": "2026-01-02", "end_date": "2026-01-02", **body},
+            format="json",
+            secure=True,
+        )
+
+    def test_opening_mismatch_without_branch_is_found(self):
+        self.record(date(2026, 1, 1), opening=100, shift_1=10)   # closes 90
+        second = self.record(date(2026, 1, 2), opening=80)
+
+        response = self.reconcile()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+        discrepancy = InventoryDiscrepancy.objects.get(daily_record=second, kind="opening")
+        self.assertEqual(discrepancy.difference, Decimal("-10.00"))
+
+    def test_resolved_discrepancy_reopens_only_when_its_figures_change(self):
+        self.record(date(2026, 1, 1), opening=100, shift_1=10)
+        second = self.record(date(2026, 1, 2), opening=80)
+        self.reconcile()
+
+        discrepancy = InventoryDiscrepancy.objects.get(daily_record=second, kind="opening")
+        discrepancy.resolved = True
+        discrepancy.save()
+
+        self.reconcile()
+        discrepancy.refresh_from_db()
+        self.assertTrue(discrepancy.resolved)
+
+        DailyInventory.objects.filter(pk=second.pk).update(opening_balance=50)
+        self.reconcile()
+        discrepancy.refresh_from_db()
+        self.assertFalse(discrepancy.resolved)
+        self.assertEqual(discrepancy.difference, Decimal("-40.00"))
+
+
+class BadParameterTests(WarehouseTestCase):
+    """
+    Malformed query parameters and bodies are a 400, never a 500.
+    """
+
+    def assert_bad_request(self, response, field):
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(field, response.json())
+
+    def test_analytics_range(self):
+        url = "/api/warehouse/inventory/analytics/"
+
+        self.assert_bad_request(self.client.get(url, secure=True), "start_date")
+        self.assert_bad_request(
+            self.client.get(url, {"start_date": "2026-02-30", "end_date": "2026-03-01"}, secure=True),
+            "start_date",
+        )
+        self.assertEqual(
+            self.client.get(url, {"start_date": "2026-03-01", "end_date": "2026-01-01"}, secure=True).status_code,
+            400,
+        )
+
+    def test_reorder_date(self):
+        response = self.client.get("/api/warehouse/dailyinventory/reorder/", {"date": "nope"}, secure=True)
+        self.assert_bad_request(response, "date")
+
+    @override_settings(WAREHOUSE_LEDGER_MODE=True)
+    def test_stock_and_ledger(self):
+        response = self.client.get("/api/warehouse/dailyinventory/stock/", {"date": "2026-13-01"}, secure=True)
+        self.assert_bad_request(response, "date")
+
+        response = self.client.get(
+            "/api/warehouse/dailyinventory/ledger/",
+            {"material": "x", "start_date": "2026-01-01", "end_date": "2026-01-31"},
+            secure=True,
+        )
+        self.assert_bad_request(response, "material")
+
+    def test_stock_without_ledger_mode(self):
+        response = self.client.get("/api/warehouse/dailyinventory/stock/", secure=True)
+        self.assertEqual(response.status_code, 404)
+
+    def test_reconcile_tolerance(self):
+        url = "/api/warehouse/dailyinventory/reconcile/"
+        body = {"start_date": "2026-01-01", "end_date": "2026-01-02"}
+
+        self.assert_bad_request(self.client.post(url, {**body, "tolerance": "nan"}, format="json", secure=True), "tolerance")
+        self.assert_bad_request(self.client.post(url, {**body, "tolerance": -1}, format="json", secure=True), "tolerance")
+        self.assert_bad_request(
+            self.client.post(url, {**body, "start_date": "2027-02-30"}, format="json", secure=True),
+            "start_date",
+        )
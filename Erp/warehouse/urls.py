@@ -1,20 +1,18 @@
 from rest_framework.routers import DefaultRouter
-from django.urls import path
 from .views import(
     MaterialViewSet,
     DailyInventoryViewSet,
     WarehouseAnalyticsViewSet,
-    inventory_analytics
+    InventoryAnalyticsViewSet,
+    InventoryDiscrepancyViewSet,
 )
 router=DefaultRouter()
-\
+
 router.register("materials",MaterialViewSet)
 router.register("warehouseanalytics",WarehouseAnalyticsViewSet)
 router.register("dailyinventory",DailyInventoryViewSet)
+router.register("inventory/analytics",InventoryAnalyticsViewSet,basename="inventory_analytics")
+router.register("inventory/discrepancies",InventoryDiscrepancyViewSet,basename="inventory_discrepancy")
 
 
-urlpatterns =[ path('inventory/analytics/', inventory_analytics, name='inventory_analytics'),
-              
-              ] 
-
-urlpatterns+= router.urls
+urlpatterns = router.urls
@@ -1,15 +1,27 @@
-from django.db.models import (
-    Sum, Avg, F, FloatField, Case, When, Value
-)
-from rest_framework import viewsets, status
+from django.core.exceptions import ValidationError
+from django.db.models import Sum, Avg
+from django.conf import settings
+from rest_framework import mixins, serializers, viewsets, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from rest_framework.decorators import action, api_view
-
-from .models import Material, DailyInventory, WarehouseAnalytics
+from rest_framework.decorators import action
+from django.utils.http import parse_etags
+from django.utils.timezone import now
+
+from .models import Material, DailyInventory, WarehouseAnalytics, InventoryDiscrepancy
+from .services.ledger import balances_as_of, ledger_entries
+from .services.materials import catalog_version, invalidate_materials, material_names
+from .services.reorder import reorder_status, status_records
+from .services.reconciliation import reconcile as reconcile_inventory, summarize
 from .serializers import (
     MaterialSerializer,
     DailyInventorySerializer,
-    WarehouseAnalyticsSerializer
+    WarehouseAnalyticsSerializer,
+    InventoryDiscrepancySerializer,
+    LedgerQuerySerializer,
+    AsOfQuerySerializer,
+    DateRangeQuerySerializer,
+    ReconcileSerializer,
 )
 from notifications.services import notify_role,notify_user
 from accounts.permissions import (ModulePermission,AdminDeleteOnly,IsownerOrAdmin
@@ -18,6 +30,18 @@ from accounts.permissions import (ModulePermission,AdminDeleteOnly,IsownerOrAdmi
 # MATERIALS
 # =====================================================
 
+# a rejected material can be corrected and submitted again
+SUBMITTABLE_STATUSES = ("draft", "rejected")
+
+
+def material_list_etag(request):
+    """
+    Changes with the catalog version, and with the role since the
+    serializer's fields depend on it.
+    """
+    return '"materials-{}-{}"'.format(catalog_version(), getattr(request.user, "role", ""))
+
+
 class MaterialViewSet(viewsets.ModelViewSet):
     """
     Warehouse materials management
@@ -31,25 +55,51 @@ class MaterialViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """
+        The catalog rarely changes: answer 304 while the client's ETag
+        still matches the current catalog version.
+        """
+        etag = material_list_etag(request)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    @action(detail=True, methods=["post"])
     def submit(self, request, pk=None):
         material = self.get_object()
-        if material.created_by != request.user:
+        if material.created_by_id != request.user.pk:
             return Response(status=403)
 
-        material.status = "pending"
-        material.save()
+        # one conditional UPDATE: of concurrent submits only one changes the row
+        submitted = (
+            Material.objects
+            .filter(pk=material.pk, status__in=SUBMITTABLE_STATUSES)
+            .update(status="pending", updated_at=now())
+        )
+        if not submitted:
+            return Response(
+                {"detail": f"Material cannot be submitted while {material.status}"},
+                status=status.HTTP_409_CONFLICT,
+            )
 
+        invalidate_materials()
 
         notify_role(
             role="warehouse",
-            company=record.company,
-            title="warehouse record pending approval",
-            message=f"warehouse record #{record.id} was submitted for approval.",
+            company=request.user.company,
+            title="Material pending approval",
+            message=f"Material '{material.name}' was submitted for approval.",
             module="warehouse",
-            object_id=record.id,
+            object_id=material.pk,
         )
 
-
         return Response({"status": "submitted"})
 
     @action(detail=True, methods=["post"])
@@ -58,25 +108,32 @@ class MaterialViewSet(viewsets.ModelViewSet):
             return Response(status=403)
 
         material = self.get_object()
-        material.status = "approved"
-        material.approved_by = request.user
-        material.approved_at = now()
-        material.save()
+
+        approved = (
+            Material.objects
+            .filter(pk=material.pk, status="pending")
+            .update(status="approved", approved_by=request.user, approved_at=now(), updated_at=now())
+        )
+        if not approved:
+            return Response(
+                {"detail": f"Material cannot be approved while {material.status}"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        invalidate_materials()
 
         notify_user(
-            user=record.created_by,
-            company=record.company,
-            title="warehouse record approved",
-            message=f"Your warehouse record #{record.id} has been approved.",
+            user=material.created_by,
+            company=None,
+            title="Material approved",
+            message=f"Your material '{material.name}' has been approved.",
             notification_type="success",
             module="warehouse",
-            object_id=record.id,
+            object_id=material.pk,
         )
 
-
-
         return Response({"status": "approved"})
-        
+
 
 # =====================================================
 # DAILY INVENTORY
@@ -92,6 +149,25 @@ class DailyInventoryViewSet(viewsets.ModelViewSet):
     permission_classes = [ModulePermission, AdminDeleteOnly]
     module_name = "warehouse"
 
+    # the ledger refuses a change that rebalances days in a locked period
+    def perform_create(self, serializer):
+        try:
+            super().perform_create(serializer)
+        except ValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+
+    def perform_update(self, serializer):
+        try:
+            super().perform_update(serializer)
+        except ValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+
+    def perform_destroy(self, instance):
+        try:
+            super().perform_destroy(instance)
+        except ValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+
     @action(
         detail=False,
         methods=["get"],
@@ -128,6 +204,167 @@ class DailyInventoryViewSet(viewsets.ModelViewSet):
 
         return Response(data)
 
+    def get_ledger_scope(self, request):
+        """
+        Ledger filters for the user, mirroring CompanyQuerySet.for_user:
+        superusers see everything, company admins pick a branch
+        (?branch=), everyone else sees their own branch.
+        """
+        user = request.user
+        branch = request.query_params.get("branch") or None
+        if branch is not None:
+            try:
+                branch = serializers.IntegerField(min_value=1).run_validation(branch)
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({"branch": exc.detail})
+
+        if user.is_superuser:
+            return {"branch_id": branch} if branch else {}
+
+        if user.is_company_admin():
+            scope = {"company_id": user.company_id}
+            if branch:
+                scope["branch_id"] = branch
+            return scope
+
+        return {"company_id": user.company_id, "branch_id": user.branch_id}
+
+    def check_ledger_enabled(self):
+        # without ledger mode nothing is posted, so ledger balances would be wrong
+        if not settings.WAREHOUSE_LEDGER_MODE:
+            raise NotFound("The stock ledger is not enabled.")
+
+    @action(detail=False, methods=["get"])
+    def stock(self, request):
+        """
+        Stock on hand per material and branch at the end of ?date=
+        (default today), from the latest snapshot plus later movements.
+        """
+        self.check_ledger_enabled()
+        query = AsOfQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        on = query.validated_data.get("date") or now().date()
+
+        balances = balances_as_of(on, **self.get_ledger_scope(request))
+        names = material_names({material_id for material_id, _ in balances})
+
+        return Response({
+            "date": on,
+            "stock": [
+                {
+                    "material": material_id,
+                    "material_name": names.get(material_id),
+                    "branch": branch_id,
+                    "balance": balance,
+                }
+                for (material_id, branch_id), balance in sorted(
+                    balances.items(), key=lambda item: (names.get(item[0][0]) or "", item[0][1] or 0)
+                )
+            ],
+        })
+
+    @action(detail=False, methods=["get"])
+    def ledger(self, request):
+        """
+        Movements of one material with running balances.
+        ?material=&start_date=&end_date= are required.
+        """
+        self.check_ledger_enabled()
+        query = LedgerQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        material = query.validated_data["material"]
+        start = query.validated_data["start_date"]
+        end = query.validated_data["end_date"]
+
+        scope = self.get_ledger_scope(request)
+        branch = scope.pop("branch_id", None)
+
+        opening, entries = ledger_entries(
+            material_id=material,
+            branch_id=branch,
+            start=start,
+            end=end,
+            **scope,
+        )
+
+        return Response({
+            "material": material,
+            "branch": branch,
+            "opening_balance": opening,
+            "closing_balance": entries[-1]["balance"] if entries else opening,
+            "entries": entries,
+        })
+
+    @action(detail=False, methods=["get"])
+    def reorder(self, request):
+        """
+        Materials with a reorder point: stock on hand, average daily
+        consumption and days of cover. ?low=true keeps only those at
+        or below their reorder point.
+        """
+        query = AsOfQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        on = query.validated_data.get("date") or now().date()
+
+        status_frame = reorder_status(on=on, **self.get_ledger_scope(request))
+        if request.query_params.get("low", "").lower() == "true" and not status_frame.empty:
+            status_frame = status_frame[status_frame["needs_reorder"].astype(bool)]
+
+        return Response({"date": on, "materials": status_records(status_frame)})
+
+    @action(detail=False, methods=["post"])
+    def reconcile(self, request):
+        """
+        Check {"start_date", "end_date", "tolerance"?} of the user's
+        company / branch for closing and opening mismatches and store
+        them as discrepancies.
+        """
+        body = ReconcileSerializer(data=request.data)
+        body.is_valid(raise_exception=True)
+        start = body.validated_data["start_date"]
+        end = body.validated_data["end_date"]
+        tolerance = body.validated_data["tolerance"]
+
+        found = reconcile_inventory(
+            start=start,
+            end=end,
+            tolerance=tolerance,
+            **self.get_ledger_scope(request),
+        )
+
+        return Response({"start_date": start, "end_date": end, **summarize(found)})
+
+
+# =====================================================
+# RECONCILIATION
+# =====================================================
+
+class InventoryDiscrepancyViewSet(mixins.ListModelMixin,
+                                  mixins.RetrieveModelMixin,
+                                  mixins.UpdateModelMixin,
+                                  viewsets.GenericViewSet):
+    """
+    Discrepancies flagged by reconciliation. PATCH {"resolved": true}
+    once a discrepancy has been explained.
+    """
+    serializer_class = InventoryDiscrepancySerializer
+
+    permission_classes = [ModulePermission]
+    module_name = "warehouse"
+
+    def get_queryset(self):
+        queryset = (
+            InventoryDiscrepancy.objects
+            .for_user(self.request.user)
+            .select_related("material")
+        )
+
+        resolved = self.request.query_params.get("resolved")
+        if resolved is not None:
+            queryset = queryset.filter(resolved=resolved.lower() == "true")
+
+        return queryset
+
 
 # =====================================================
 # WAREHOUSE ANALYTICS (READ-ONLY)
@@ -143,6 +380,9 @@ class WarehouseAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [ModulePermission]
     module_name = "warehouse"
 
+    def get_queryset(self):
+        return WarehouseAnalytics.objects.for_user(self.request.user)
+
     @action(
         detail=False,
         methods=["get"],
@@ -176,50 +416,65 @@ class WarehouseAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 # =====================================================
-# INVENTORY ANALYTICS (FUNCTION-BASED, READ-ONLY)
+# INVENTORY ANALYTICS (READ-ONLY)
 # =====================================================
 
-@api_view(["GET"])
-def inventory_analytics(request):
+class InventoryAnalyticsViewSet(viewsets.ViewSet):
     """
-    Inventory analytics – read-only for all authenticated roles
+    Inventory analytics per day for the user's company / branch, read
+    from the WarehouseAnalytics rollup.
+    ?start_date=&end_date= are required (at most a year apart).
     """
+    permission_classes = [ModulePermission]
+    module_name = "warehouse"
 
-    permission = ModulePermission()
-    permission.module_name = "warehouse"
+    MAX_WINDOW_DAYS = 366
 
-    fake_view = type("View", (), {"module_name": "warehouse"})
+    def get_queryset(self):
+        return WarehouseAnalytics.objects.for_user(self.request.user)
 
-    if not permission.has_permission(request, view=fake_view):
-        return Response(
-            {"detail": "Permission denied"},
-            status=status.HTTP_403_FORBIDDEN
-        )
+    def list(self, request):
+        query = DateRangeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start = query.validated_data["start_date"]
+        end = query.validated_data["end_date"]
 
-    qs = DailyInventory.objects.all()
-
-    data = (
-        qs.values("date")
-        .annotate(
-            total_raw_in=Sum("raw_in"),
-            total_opening_balance=Sum("opening_balance"),
-            total_closing_balance=Sum("closing_balance"),
-            total_shift_1=Sum("shift_1"),
-            total_shift_2=Sum("shift_2"),
-            total_shift_3=Sum("shift_3"),
-            avg_efficiency=Avg(
-                Case(
-                    When(raw_in=0, then=Value(0)),
-                    default=(
-                        F("shift_1") +
-                        F("shift_2") +
-                        F("shift_3")
-                    ) / F("raw_in"),
-                    output_field=FloatField(),
-                )
-            ),
+        if (end - start).days >= self.MAX_WINDOW_DAYS:
+            return Response(
+                {"detail": f"Date range is limited to {self.MAX_WINDOW_DAYS} days"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = (
+            self.get_queryset()
+            .filter(date__range=[start, end])
+            .values("date")
+            .annotate(
+                raw_in=Sum("total_raw_in"),
+                opening=Sum("total_opening"),
+                closing=Sum("total_closing"),
+                shift_1=Sum("total_shift_1"),
+                shift_2=Sum("total_shift_2"),
+                shift_3=Sum("total_shift_3"),
+                ratio_sum=Sum("efficiency_sum"),
+                records=Sum("record_count"),
+            )
+            .order_by("date")
         )
-        .order_by("date")
-    )
 
-    return Response(data)
+        data = [
+            {
+                "date": row["date"],
+                "total_raw_in": row["raw_in"],
+                "total_opening_balance": row["opening"],
+                "total_closing_balance": row["closing"],
+                "total_shift_1": row["shift_1"],
+                "total_shift_2": row["shift_2"],
+                "total_shift_3": row["shift_3"],
+                # average over the day's records of output / raw_in
+                "avg_efficiency": float(row["ratio_sum"]) / row["records"] if row["records"] else 0.0,
+            }
+            for row in rows
+        ]
+
+        return Response(data)